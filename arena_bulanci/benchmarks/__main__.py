@@ -0,0 +1,28 @@
+import argparse
+import sys
+
+from arena_bulanci.benchmarks.suite import run_benchmarks, compare, print_results, load_results, save_results, \
+    DEFAULT_REGRESSION_THRESHOLD
+
+parser = argparse.ArgumentParser(description="Benchmarks of the simulation, serialization, planning and networking.")
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--players", type=int, default=16)
+parser.add_argument("--bullets", type=int, default=32)
+parser.add_argument("--filter", default="*", help="runs only benchmarks matching the pattern (e.g. 'Game.*')")
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--output", help="path where the results are saved (JSON)")
+parser.add_argument("--baseline", help="results to compare against")
+parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+args = parser.parse_args()
+
+benchmark_results = run_benchmarks(args.seed, args.players, args.bullets, name_filter=args.filter, repeat=args.repeat)
+benchmark_comparison = None
+if args.baseline:
+    benchmark_comparison = compare(benchmark_results, load_results(args.baseline), args.threshold)
+
+print_results(benchmark_results, benchmark_comparison)
+if args.output:
+    save_results(benchmark_results, args.output)
+
+if benchmark_comparison and any(c["status"] == "regression" for c in benchmark_comparison.values()):
+    sys.exit(1)
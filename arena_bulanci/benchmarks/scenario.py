@@ -0,0 +1,70 @@
+from typing import List, Dict, Any
+
+from arena_bulanci.bots.bot_base import BotBase
+from arena_bulanci.bots.random_walk_bot import RandomWalkBot
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.game_updates.add_bullet import AddBullet
+from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
+from arena_bulanci.core.game_updates.player_move_request import PlayerMoveRequest
+from arena_bulanci.core.game_updates.player_spawn_request import PlayerSpawnRequest
+from arena_bulanci.core.game_updates.shoot_request import ShootRequest
+from arena_bulanci.core.utils import DIRECTION_DEFINITIONS
+
+
+class Scenario(object):
+    """
+    Reproducible game situation the benchmarks run on: seeded game with player_count players
+    spawned at random positions and bullet_count bullets flying around.
+    The same seed and counts always give exactly the same situation.
+    """
+
+    def __init__(self, seed: int, player_count: int, bullet_count: int):
+        self.seed = seed
+        self.player_count = player_count
+        self.bullet_count = bullet_count
+
+        self.game = Game(seed=seed)
+        self.player_ids = [f"player{i}@benchmark.local" for i in range(player_count)]
+        self.game.accept([PlayerSpawnRequest(player_id, (0, 0, 0)) for player_id in self.player_ids])
+        self.game.step(report_errors=False)
+
+        collision_map = Game.get_collision_map()
+        rng = self.game.rng
+        bullets = []
+        for i in range(bullet_count):
+            position = collision_map.get_reachable_position(rng.randrange(collision_map.reachable_count))
+            direction_coords = rng.choice(DIRECTION_DEFINITIONS)
+            bullets.append(AddBullet(f"benchmark_bullet{i}", position, direction_coords, self.player_ids[0]))
+        self.game.external_step(bullets)
+
+        # positions for path planning and danger queries
+        self.targets = [
+            collision_map.get_reachable_position(rng.randrange(collision_map.reachable_count)) for _ in range(100)
+        ]
+
+        # every player tries to move, every other one also shoots
+        self.requests: List[GameUpdateRequest] = []
+        for i, player_id in enumerate(self.player_ids):
+            self.requests.append(ShootRequest(player_id) if i % 2 else PlayerMoveRequest(player_id))
+
+        with self.game.fork():
+            updates = self.game.simulate_step(self.requests)
+            self.update_group: Dict[str, Any] = {"updates": updates, "tick": self.game.tick}
+
+    def create_bot(self) -> BotBase:
+        """
+        Creates bot controlling the first player, ready to be queried (as if it was in its _play).
+        """
+        bot = RandomWalkBot(seed=self.seed)
+        bot.player_id = self.player_ids[0]
+        bot._game = self.game
+        return bot
+
+    def get_description(self) -> Dict[str, Any]:
+        return {
+            "seed": self.seed,
+            "player_count": self.player_count,
+            "bullet_count": self.bullet_count,
+            "spawned_players": len(self.game.players),
+            "bullets": len(self.game.bullets),
+        }
@@ -0,0 +1,235 @@
+import datetime
+import fnmatch
+import json
+import platform
+import socket
+import statistics
+import time
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from arena_bulanci.benchmarks.scenario import Scenario
+from arena_bulanci.bots.danger_map import DangerMap
+from arena_bulanci.bots.game_plan import GamePlan
+from arena_bulanci.core.config import ARENA_MAP
+from arena_bulanci.core.networking.socket_client import SocketClient
+from arena_bulanci.core.utils import jsondumps, jsonloads
+
+BENCHMARK_FORMAT_VERSION = 1
+DEFAULT_REGRESSION_THRESHOLD = 0.2  # relative slowdown which is reported as a regression
+
+# benchmark is created from a scenario, it returns the measured operation and count of bytes processed by it
+_Benchmark = Callable[[Scenario], Tuple[Callable[[], Any], Optional[int]]]
+BENCHMARKS: Dict[str, _Benchmark] = {}
+
+
+def benchmark(name: str):
+    def register(create: _Benchmark) -> _Benchmark:
+        BENCHMARKS[name] = create
+        return create
+
+    return register
+
+
+@benchmark("Game.step")
+def _game_step(scenario: Scenario):
+    game = scenario.game
+
+    def step():
+        with game.fork():
+            game.accept(scenario.requests)
+            game.step(report_errors=False)
+
+    return step, None
+
+
+@benchmark("Game.copy_without_internal_data")
+def _game_copy(scenario: Scenario):
+    return scenario.game.copy_without_internal_data, None
+
+
+@benchmark("jsondumps(update_groups)")
+def _jsondumps_update_groups(scenario: Scenario):
+    update_groups = [scenario.update_group]
+    return lambda: jsondumps(update_groups), len(jsondumps(update_groups).encode("utf-8"))
+
+
+@benchmark("jsonloads(update_groups)")
+def _jsonloads_update_groups(scenario: Scenario):
+    data = jsondumps([scenario.update_group])
+    return lambda: jsonloads(data), len(data.encode("utf-8"))
+
+
+@benchmark("jsondumps(full_state)")
+def _jsondumps_full_state(scenario: Scenario):
+    full_state = {"tick": scenario.game.tick, "state": scenario.game.copy_without_internal_data()}
+    return lambda: jsondumps(full_state), len(jsondumps(full_state).encode("utf-8"))
+
+
+@benchmark("GamePlan.plan_route_to_targets")
+def _plan_route_to_targets(scenario: Scenario):
+    targets = scenario.targets[:1]
+    return lambda: GamePlan.plan_route_to_targets(targets), None
+
+
+@benchmark("DangerMap.create")
+def _danger_map_create(scenario: Scenario):
+    return lambda: DangerMap.create(scenario.game), None
+
+
+@benchmark("BotBase.ticks_before_bullet_hit x100")
+def _ticks_before_bullet_hit(scenario: Scenario):
+    bot = scenario.create_bot()
+    positions = scenario.targets
+    bot.danger_map  # the map is computed once per tick, queries are measured only
+
+    def query():
+        for position in positions:
+            bot.ticks_before_bullet_hit(position)
+
+    return query, None
+
+
+@benchmark("BotBase.get_shootable_opponents")
+def _get_shootable_opponents(scenario: Scenario):
+    bot = scenario.create_bot()
+
+    def query():
+        bot.tick_cache.invalidate()  # the ray casting is measured, not the tick cache hit
+        return bot.get_shootable_opponents()
+
+    return query, None
+
+
+@benchmark("SocketClient framing")
+def _socket_client_framing(scenario: Scenario):
+    # loopback TCP, the same as between arena and local bots
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    sender = SocketClient()
+    sender.connect(*listener.getsockname())
+    receiver = SocketClient(listener.accept()[0])
+    listener.close()
+    data = jsondumps([scenario.update_group]).encode("utf-8")
+
+    def send_and_read():
+        sender.send_bytes(data)
+        receiver.read_bytes()
+
+    return send_and_read, len(data)
+
+
+def measure(operation: Callable[[], Any], repeat: int = 5, min_time: float = 0.1) -> List[float]:
+    """
+    Measures seconds per call of the operation.
+    The count of calls in each of the repeats is calibrated so that a repeat takes at least min_time.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+
+        number *= 2 if elapsed < min_time / 4 else max(2, int(min_time / max(elapsed, 1e-9) * number) // number)
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        timings.append((time.perf_counter() - start) / number)
+
+    return timings
+
+
+def run_benchmarks(seed: int = 0, player_count: int = 16, bullet_count: int = 32, name_filter: str = "*",
+                   repeat: int = 5, min_time: float = 0.1) -> Dict[str, Any]:
+    """
+    Runs the benchmarks (the ones matching name_filter) on the scenario and returns JSON serializable results.
+    """
+    scenario = Scenario(seed, player_count, bullet_count)
+    results = {}
+    for name, create in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, name_filter):
+            continue
+
+        operation, processed_bytes = create(scenario)
+        timings = measure(operation, repeat=repeat, min_time=min_time)
+        result = {
+            "median_us": statistics.median(timings) * 1e6,
+            "min_us": min(timings) * 1e6,
+            "stdev_us": statistics.stdev(timings) * 1e6 if len(timings) > 1 else 0.0,
+        }
+        if processed_bytes is not None:
+            result["bytes"] = processed_bytes
+            result["mb_per_s"] = processed_bytes / min(timings) / 1e6
+
+        results[name] = result
+
+    return {
+        "version": BENCHMARK_FORMAT_VERSION,
+        "time": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "map_hash": ARENA_MAP.hash,
+        "scenario": scenario.get_description(),
+        "results": results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> Dict[str, Dict[str, Any]]:
+    """
+    Compares median times of the results with the baseline.
+    Ratio above 1 + threshold is a regression, below 1 - threshold an improvement.
+    """
+    if results["scenario"] != baseline["scenario"]:
+        print(f"WARN: Baseline was measured on a different scenario: {baseline['scenario']}")
+
+    comparison = {}
+    for name, result in results["results"].items():
+        baseline_result = baseline["results"].get(name)
+        if baseline_result is None:
+            continue
+
+        ratio = result["median_us"] / baseline_result["median_us"]
+        status = "same"
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+
+        comparison[name] = {"ratio": ratio, "status": status, "baseline_median_us": baseline_result["median_us"]}
+
+    return comparison
+
+
+def print_results(results: Dict[str, Any], comparison: Optional[Dict[str, Dict[str, Any]]] = None):
+    print(f"BENCHMARKS: {results['scenario']}")
+    for name, result in results["results"].items():
+        line = f"\t{name:<40} {result['median_us']:>12.2f}us"
+        if "mb_per_s" in result:
+            line += f" {result['mb_per_s']:>8.1f}MB/s"
+
+        if comparison and name in comparison:
+            line += f"  x{comparison[name]['ratio']:.2f} {comparison[name]['status']}"
+
+        print(line)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        results = json.load(f)
+
+    if results.get("version") != BENCHMARK_FORMAT_VERSION:
+        raise ValueError(f"Unsupported benchmark results version: {results.get('version')}")
+
+    return results
+
+
+def save_results(results: Dict[str, Any], path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
@@ -1,21 +1,27 @@
-import math
-import random
+import time
 from concurrent.futures.thread import ThreadPoolExecutor
 from threading import Event
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Sequence
 
+from arena_bulanci.bots.danger_map import DangerMap
+from arena_bulanci.bots.dodge_plan import DodgePlan, DEFAULT_DODGE_TIME_BUDGET_MS, WAIT_MOVE, ROTATE_MOVE, STEP_MOVE
+from arena_bulanci.bots.firing_map import FiringMap
 from arena_bulanci.bots.game_plan import GamePlan
+from arena_bulanci.bots.move_evaluator import MoveSequenceEvaluation
+from arena_bulanci.core.actions import WAIT_ACTION, create_request
 from arena_bulanci.core.bot_base_low_level import BotBaseLowLevel
-from arena_bulanci.core.config import MAX_FUTURE_UPDATE_REQUESTS, MAX_BULLET_AGE, BULLET_SPEED
+from arena_bulanci.core.config import MAX_FUTURE_UPDATE_REQUESTS
 from arena_bulanci.core.game import Game, OBSTACLE_BOXES
 from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
 from arena_bulanci.core.game_updates.player_move_request import PlayerMoveRequest
 from arena_bulanci.core.game_updates.player_rotation_request import PlayerRotationRequest
 from arena_bulanci.core.game_updates.shoot_request import ShootRequest
+from arena_bulanci.core.observation_encoder import ObservationEncoder
 from arena_bulanci.core.physics.segment import Segment
+from arena_bulanci.core.tick_cache import TickCache
 from arena_bulanci.core.player import Player
 from arena_bulanci.core.utils import distance, DIRECTION_DEFINITIONS, step_from, UP_DIRECTION, DOWN_DIRECTION, \
-    LEFT_DIRECTION, RIGHT_DIRECTION, grid_distance
+    LEFT_DIRECTION, RIGHT_DIRECTION
 
 MAX_CACHED_PLANS = 100
 PLAN_EXECUTOR = ThreadPoolExecutor(max_workers=1)
@@ -46,11 +52,17 @@ class BotBase(BotBaseLowLevel):
     (e.g. sophisticated path planning algorithm which fallbacks to simple navigation strategies before full plan is calculated).
 
     The utility methods should be considered as a reference, how to use `Game` API.
+
+    Thinking longer than think_deadline means that the move misses its tick.
+    Search based bots can implement _play as a generator (anytime computation), which yields whenever
+    the enqueued moves are a complete answer. The generator is stopped at the deadline
+    and the moves enqueued at the last yield are played (use clear_moves before enqueuing a better answer).
     """
 
     def _play(self):
         """
-        The playing logic has to be implemented here
+        The playing logic has to be implemented here.
+        It can be a generator, then every yield marks the enqueued moves as the best answer so far.
         """
         raise NotImplementedError("has to be overridden")
 
@@ -80,15 +92,24 @@ class BotBase(BotBaseLowLevel):
         """
         Player which is controlled by this bot.
         """
-        return self.game.get_player(self.player_id)
+        return self._tick_cache.get(self._game, "my_player", self._get_my_player)
 
     @property
     def opponents(self) -> List[Player]:
         """
         Opponents of this bot.
         """
+        return list(self._tick_cache.get(self._game, "opponents", self._get_opponents))
+
+    def _get_my_player(self) -> Player:
+        return self.game.get_player(self.player_id)
+
+    def _get_opponents(self) -> List[Player]:
         return self.game.opponents_of(self.my_player)
 
+    def _get_can_shoot(self) -> bool:
+        return self.game.can_player_shoot(self.player_id)
+
     @property
     def position(self) -> Tuple[int, int]:
         """
@@ -103,13 +124,43 @@ class BotBase(BotBaseLowLevel):
         """
         return self.my_player.direction
 
+    @property
+    def think_deadline(self) -> float:
+        """
+        Time (as `time.time()`) until which the moves have to be enqueued, so they are played in the next tick.
+        Derived from the tick length and the measured network time (when playing on a remote arena).
+        """
+        return self._think_deadline
+
+    @property
+    def time_left(self) -> float:
+        """
+        Seconds left until think_deadline.
+        """
+        return max(0.0, self._think_deadline - time.time())
+
+    @property
+    def tick_cache(self) -> TickCache:
+        """
+        Cache of values which are valid for the current tick only (see TickCache.get), it can be used by custom bots.
+        State accessors of this class (my_player, opponents, can_shoot, ...) are cached there,
+        so they can be used freely within _play. Hits and misses are counted.
+        """
+        return self._tick_cache
+
+    def clear_moves(self):
+        """
+        Removes all the enqueued moves (e.g. when a better answer was found by an anytime _play).
+        """
+        self._update_requests.clear()
+
     @property
     def can_shoot(self):
         """
         Determine if this bot can shoot in this move.
         This considers both, ammo and cooldown time.
         """
-        return self.game.can_player_shoot(self.player_id)
+        return self._tick_cache.get(self._game, "can_shoot", self._get_can_shoot)
 
     def MOVE_shoot(self):
         """
@@ -182,7 +233,52 @@ class BotBase(BotBaseLowLevel):
         """
         Enqueues a move which rotates to a random direction
         """
-        self.MOVE_rotate(random.randint(0, len(DIRECTION_DEFINITIONS) - 1))
+        self.MOVE_rotate(self._random.randint(0, len(DIRECTION_DEFINITIONS) - 1))
+
+    def MOVE_dodge_bullets(self, time_budget_ms: float = DEFAULT_DODGE_TIME_BUDGET_MS,
+                           max_moves: Optional[int] = None) -> DodgePlan:
+        """
+        Enqueues moves which get the bot out of the way of all the bullets (if it is possible).
+        The moves are found by search over positions, directions and ticks limited by the given time budget.
+        When no safe plan exists (or can't be found in time), moves surviving the most ticks are used.
+
+        Only moves before the first waiting tick are enqueued (waiting can't be enqueued),
+        so calling this in each _play keeps the plan up to date.
+        Returns the whole plan.
+        """
+        plan = DodgePlan.search(self.game, self.my_player, self.danger_map, time_budget_ms=time_budget_ms)
+
+        for i, (move, direction) in enumerate(plan.moves):
+            if move == WAIT_MOVE or (max_moves is not None and i >= max_moves):
+                break
+
+            if move == ROTATE_MOVE:
+                self.MOVE_rotate(direction, skip_if_already_rotated=False)
+            elif move == STEP_MOVE:
+                self.MOVE_step_forward()
+
+        return plan
+
+    def MOVE_actions(self, actions: Sequence[int], max_moves: Optional[int] = None):
+        """
+        Enqueues moves given by action codes (see core.actions), e.g. a sequence chosen by evaluate_move_sequences.
+        Only moves before the first waiting action are enqueued (waiting can't be enqueued).
+        """
+        for i, action in enumerate(actions):
+            if action == WAIT_ACTION or (max_moves is not None and i >= max_moves):
+                break
+
+            self._add_update_request(create_request(self.player_id, action))
+
+    def evaluate_move_sequences(self, sequences: Sequence[Sequence[int]]) -> MoveSequenceEvaluation:
+        """
+        Simulates many candidate sequences of action codes (see core.actions) at once, one action per tick.
+        Survived ticks, final positions and shots landed are reported for every sequence.
+        This is much cheaper than validating requests one by one, so thousands of sequences can be scored per tick.
+
+        NOTE: Opponents are considered static (as in firing_map) and bullets are taken from danger_map.
+        """
+        return MoveSequenceEvaluation.evaluate(self.game, self.my_player, self.danger_map, self.firing_map, sequences)
 
     def will_be_bullet_hit(self, position: Tuple[int, int], from_tick: Optional[int] = None,
                            to_tick: Optional[int] = None):
@@ -203,20 +299,7 @@ class BotBase(BotBaseLowLevel):
         if to_tick is None:
             to_tick = from_tick + 1
 
-        tick_offset = from_tick - self.game.tick
-        trajectory_ticks = to_tick - from_tick
-
-        boxes = self.game.get_player_bounding_boxes(position)
-        for bullet in self.game.bullets:
-            bullet_trajectory = bullet.get_current_trajectory(
-                self.game, trajectory_ticks=trajectory_ticks,
-                tick_offset=tick_offset
-            )
-
-            if bullet_trajectory.intersects(boxes):
-                return True
-
-        return False
+        return self.danger_map.will_be_hit(position, from_tick - self.game.tick, to_tick - self.game.tick)
 
     def ticks_before_bullet_hit(self, position: Tuple[int, int]) -> Optional[int]:
         """
@@ -226,43 +309,41 @@ class BotBase(BotBaseLowLevel):
         NOTE: Permanent obstacles are accounted for only (players, which can block the path are not taken into account)
         """
 
-        boxes = self.game.get_player_bounding_boxes(position)
-        if len(boxes) != 1:
-            raise AssertionError("Method is implemented for a single player bounding box only")
-
-        ticks_to_hit = []
-        player_box = boxes[0]
-        for bullet in self.game.bullets:
-            trajectory = bullet.get_current_trajectory(
-                self.game, trajectory_ticks=MAX_BULLET_AGE,
-            )
+        return self.danger_map.ticks_before_hit(position)
 
-            hit_points = list(trajectory.get_intersection_points(player_box))
-            if not hit_points:
-                # bullet is not hitting the player
-                continue
+    @property
+    def danger_map(self) -> DangerMap:
+        """
+        Hits of all bullets currently present in the game, rasterized for all positions and following ticks.
+        The map is calculated once per tick, which makes it cheap to test many positions.
+        """
+        if self._danger_map is None or self._danger_map.tick != self.game.tick:
+            self._danger_map = DangerMap.create(self.game)
 
-            pre_trajectory = Segment(bullet.start_position, trajectory.start, trajectory.direction_coords)
-            pre_trajectory_hits = self.get_permanent_obstacle_hit_points(pre_trajectory)
-            if pre_trajectory_hits:
-                # bullet would hit some obstacle before getting to the player
-                continue
+        return self._danger_map
 
-            obstacle_hit_points = self.get_permanent_obstacle_hit_points(trajectory)
-            bullet_end_point = min(
-                hit_points + obstacle_hit_points,
-                key=lambda p: grid_distance(bullet.start_position, p)
-            )
+    @property
+    def firing_map(self) -> FiringMap:
+        """
+        Lines of fire between all walkable positions and the opponents, calculated once per tick.
+        Useful for finding positions from which opponents can be shot or where the bot is exposed to them.
+        """
+        if self._firing_map is None or self._firing_map.tick != self.game.tick:
+            self._firing_map = FiringMap.create(self.game, self.player_id)
 
-            if bullet_end_point in hit_points:
-                # hit is on player
-                bullet_travel_distance = distance(trajectory.start, bullet_end_point)
-                ticks_to_hit.append(math.ceil(bullet_travel_distance / BULLET_SPEED))
+        return self._firing_map
 
-        if not ticks_to_hit:
-            return None
+    @property
+    def observation_encoder(self) -> ObservationEncoder:
+        """
+        Tensor representation of the game (e.g. for ML bots), see ObservationEncoder.
+        Once used, the encoder is updated incrementally on every tick.
+        """
+        if self._observation_encoder is None:
+            self._observation_encoder = ObservationEncoder()
+            self._observation_encoder.reset(self.game)
 
-        return min(ticks_to_hit)
+        return self._observation_encoder
 
     def get_permanent_obstacle_hit_points(self, trajectory: Segment) -> List[Tuple[int, int]]:
         """
@@ -279,8 +360,8 @@ class BotBase(BotBaseLowLevel):
         Gets a random point where bot will be able to walk.
         Temporary obstacles (i.e. other players) are not considered.
         """
-        # every spawn point has to be reachable
-        return self.game.find_spawn_point()
+        collision_map = Game.get_collision_map()
+        return collision_map.get_reachable_position(self._random.randrange(collision_map.reachable_count))
 
     def has_free_steps_in(self, direction: int, step_count: int = 1) -> bool:
         """
@@ -312,10 +393,14 @@ class BotBase(BotBaseLowLevel):
         Gets a list of player, direction pairs.
         The players can be shot by a direct bullet when current bot is rotated by the direction.
         """
+        return list(self._tick_cache.get(self._game, "shootable_opponents", self._get_shootable_opponents))
+
+    def _get_shootable_opponents(self) -> List[Tuple[Player, int]]:
         result = []
-        for opponent in self.game.opponents_of(self.my_player):
-            shooting_direction = self.my_player.get_closest_direction_towards(opponent.position)
-            if not self.game.has_clear_bullet_path(self.my_player.as_if_rotated_to(shooting_direction), opponent):
+        my_player = self.my_player
+        for opponent in self.opponents:
+            shooting_direction = my_player.get_closest_direction_towards(opponent.position)
+            if not self.game.has_clear_bullet_path(my_player.as_if_rotated_to(shooting_direction), opponent):
                 continue  # can't hit the opponent
 
             result.append((opponent, shooting_direction))
@@ -327,7 +412,8 @@ class BotBase(BotBaseLowLevel):
         Every move request can be sent together with potential followup requests.
         This will prevent game tick drops due to network lag etc.
 
-        The default strategy is implemented here.
+        The default strategy is implemented here: already enqueued moves are sent,
+        followed by predicted moves (see _predict_next_requests) up to future_request_count.
         Feel free to include your own.
         """
 
@@ -335,21 +421,33 @@ class BotBase(BotBaseLowLevel):
         if self._update_requests:
             future_requests.extend(self._update_requests[0:MAX_FUTURE_UPDATE_REQUESTS])
 
-        last_request = current_request if not future_requests else future_requests[-1]
-        if len(future_requests) < 5 and isinstance(last_request, PlayerMoveRequest):
-            # keep moving in case of temporary tick drops
-            future_requests.extend(
-                [current_request, current_request, current_request, current_request, current_request]
-            )
-
-        if current_request is None:
-            # keep standing still
-            future_requests.extend(
-                [None, None, None, None, None]
-            )
+        missing_count = self.future_request_count - len(future_requests)
+        if missing_count > 0:
+            last_request = current_request if not future_requests else future_requests[-1]
+            future_requests.extend(self._predict_next_requests(last_request, missing_count))
 
         return future_requests
 
+    @property
+    def future_request_count(self) -> int:
+        """
+        Count of future requests which should be sent to hide the network lag.
+        It adapts to the observed roundtrips and skipped ticks (see FutureRequestPolicy).
+        """
+        return self._future_request_policy.future_request_count
+
+    def _predict_next_requests(self, last_request: Optional[GameUpdateRequest],
+                               count: int) -> List[Optional[GameUpdateRequest]]:
+        """
+        Cheap prediction of moves following the last request (used when ticks are skipped because of the lag).
+        The better the prediction, the more skipped ticks are played as the bot intended.
+        By default, moving bot keeps moving and standing bot keeps standing.
+        """
+        if last_request is None or isinstance(last_request, PlayerMoveRequest):
+            return [last_request] * count
+
+        return []
+
     def _simple_move_towards(self, target: Tuple[int, int]):
         d = DIRECTION_DEFINITIONS[self.direction]
         p = self.position
@@ -0,0 +1,159 @@
+import math
+from typing import Tuple, Optional, List
+
+import numpy as np
+
+from arena_bulanci.core.bullet import Bullet
+from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT, PLAYER_BOX_RADIUS, BULLET_SPEED, MAX_BULLET_AGE, \
+    BULLET_RAY_LENGTH
+from arena_bulanci.core.game import Game, OBSTACLE_BOXES
+from arena_bulanci.core.physics.circle_box import CircleBox
+from arena_bulanci.core.physics.segment import Segment
+from arena_bulanci.core.physics.utils import point_to_segment_distance
+from arena_bulanci.core.utils import distance, is_in_map
+
+# bullets are removed after MAX_BULLET_AGE ticks, so no hit can happen later than this
+DANGER_MAP_HORIZON = math.ceil(MAX_BULLET_AGE) + 1
+NO_HIT = np.iinfo(np.int16).max
+
+
+class DangerMap(object):
+    """
+    Rasterization of all live bullets into a (ticks x cells) grid of hits.
+    `hits[k, x, y]` is True when a player standing on (x, y) would be hit in the k-th following game tick.
+    (Permanent obstacles are accounted for, other players are not)
+    """
+
+    def __init__(self, tick: int, horizon: int = DANGER_MAP_HORIZON):
+        self.tick = tick
+        self.horizon = horizon
+        self.hits = np.zeros((horizon, MAP_WIDTH, MAP_HEIGHT), dtype=np.bool_)
+        self.first_hit = np.full((MAP_WIDTH, MAP_HEIGHT), NO_HIT, dtype=np.int16)
+        self.last_hit = np.full((MAP_WIDTH, MAP_HEIGHT), -1, dtype=np.int16)
+
+    @classmethod
+    def create(cls, game: Game, horizon: int = DANGER_MAP_HORIZON) -> 'DangerMap':
+        """
+        Creates DangerMap of all bullets currently present in the game.
+        """
+        danger_map = DangerMap(game.tick, horizon)
+        for bullet in game.bullets:
+            danger_map._add_bullet(game, bullet)
+
+        any_hit = danger_map.hits.any(axis=0)
+        first_hit = danger_map.hits.argmax(axis=0)
+        last_hit = horizon - 1 - danger_map.hits[::-1].argmax(axis=0)
+        danger_map.first_hit = np.where(any_hit, first_hit, NO_HIT).astype(np.int16)
+        danger_map.last_hit = np.where(any_hit, last_hit, -1).astype(np.int16)
+        return danger_map
+
+    def will_be_hit(self, position: Tuple[int, int], from_offset: int = 0, to_offset: Optional[int] = None) -> bool:
+        """
+        Determine if player standing on given position will be hit within game ticks [from_offset, to_offset)
+        counted from the tick of the map.
+        """
+        if to_offset is None:
+            to_offset = from_offset + 1
+
+        if not is_in_map(position):
+            return False
+
+        from_offset = max(0, from_offset)
+        to_offset = max(from_offset, min(self.horizon, to_offset))
+        if to_offset == self.horizon:
+            return bool(self.last_hit[position] >= from_offset)
+
+        return bool(self.hits[from_offset:to_offset, position[0], position[1]].any())
+
+    def ticks_before_hit(self, position: Tuple[int, int]) -> Optional[int]:
+        """
+        Number of ticks before first hit of player standing on given position, None if no hit is expected.
+        """
+        if not is_in_map(position):
+            return None
+
+        first_hit = int(self.first_hit[position])
+        if first_hit == NO_HIT:
+            return None
+
+        return first_hit + 1
+
+    def is_safe_from(self, position: Tuple[int, int], offset: int) -> bool:
+        """
+        Determine if player standing on given position won't be hit since the given tick offset.
+        """
+        if not is_in_map(position):
+            return True
+
+        return bool(self.last_hit[position] < offset)
+
+    def _add_bullet(self, game: Game, bullet: Bullet):
+        along_axis = 0 if bullet.direction_coords[0] else 1
+        direction_sign = bullet.direction_coords[along_axis]
+        along_start = bullet.start_position[along_axis]
+        across = bullet.start_position[1 - along_axis]
+        obstacles = self._get_obstacles_on_path(bullet)
+
+        across_cells = []
+        for across_cell in range(math.floor(across - PLAYER_BOX_RADIUS), math.ceil(across + PLAYER_BOX_RADIUS) + 1):
+            across_distance = abs(across_cell - across)
+            if across_distance >= PLAYER_BOX_RADIUS or not 0 <= across_cell < (MAP_HEIGHT, MAP_WIDTH)[along_axis]:
+                continue
+
+            half_width = math.sqrt(PLAYER_BOX_RADIUS ** 2 - across_distance ** 2)
+            across_cells.append((across_cell, half_width))
+
+        for offset in range(self.horizon):
+            trajectory = bullet.get_current_trajectory(game, tick_offset=offset)
+            travel_start = abs(trajectory.start[along_axis] - along_start)
+            travel_end = travel_start + BULLET_SPEED
+
+            # the same segments as in the game are tested, so the obstacle hits are exactly the same
+            obstacle_hits = [p for box in obstacles for p in trajectory.get_intersection_points(box)]
+            if obstacle_hits:
+                travel_end = travel_start + min(distance(trajectory.start, p) for p in obstacle_hits)
+
+            for across_cell, half_width in across_cells:
+                # the nearest intersection of the trajectory with player's box has to be before the obstacle hit
+                # i.e. either entry point of the box is on the trajectory or trajectory starts inside of the box
+                if travel_end - half_width < travel_start + half_width:
+                    self._mark_hits(offset, along_axis, direction_sign, along_start, across_cell,
+                                    travel_start - half_width, travel_end - half_width)
+                    self._mark_hits(offset, along_axis, direction_sign, along_start, across_cell,
+                                    travel_start + half_width, travel_end + half_width)
+                else:
+                    self._mark_hits(offset, along_axis, direction_sign, along_start, across_cell,
+                                    travel_start - half_width, travel_end + half_width)
+
+            if obstacle_hits or game.tick + offset - bullet.start_tick > MAX_BULLET_AGE:
+                break  # bullet gets removed in this tick
+
+    def _mark_hits(self, offset: int, along_axis: int, direction_sign: int, along_start: float, across_cell: int,
+                   travel_from: float, travel_to: float):
+        if direction_sign > 0:
+            low, high = along_start + travel_from, along_start + travel_to
+        else:
+            low, high = along_start - travel_to, along_start - travel_from
+
+        first_cell = max(0, math.ceil(low))
+        last_cell = min((MAP_WIDTH, MAP_HEIGHT)[along_axis] - 1, math.floor(high))
+        if first_cell > last_cell:
+            return
+
+        if along_axis == 0:
+            self.hits[offset, first_cell:last_cell + 1, across_cell] = True
+        else:
+            self.hits[offset, across_cell, first_cell:last_cell + 1] = True
+
+    @classmethod
+    def _get_obstacles_on_path(cls, bullet: Bullet) -> List[CircleBox]:
+        d = bullet.direction_coords
+        p = bullet.start_position
+        ray = Segment(p, (p[0] + d[0] * BULLET_RAY_LENGTH, p[1] + d[1] * BULLET_RAY_LENGTH), d)
+
+        # small tolerance keeps grazing obstacles, the exact test is done on trajectory segments
+        tolerance = 1e-3
+        return [
+            box for box in OBSTACLE_BOXES
+            if point_to_segment_distance(box.center, ray.start, ray.end) < box.radius + tolerance
+        ]
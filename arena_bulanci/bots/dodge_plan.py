@@ -0,0 +1,143 @@
+import time
+from typing import Tuple, List, Optional, Dict
+
+from arena_bulanci.bots.danger_map import DangerMap
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.player import Player
+from arena_bulanci.core.utils import DIRECTIONS, step_from
+
+WAIT_MOVE = "wait"
+ROTATE_MOVE = "rotate"
+STEP_MOVE = "step"
+
+DEFAULT_DODGE_TIME_BUDGET_MS = 20
+TIME_CHECK_INTERVAL = 128
+
+# state of the search is (position, direction)
+_State = Tuple[Tuple[int, int], int]
+
+
+class DodgePlan(object):
+    """
+    Sequence of moves (one move per tick) which avoids bullets, found by search over (position, direction, tick).
+    """
+
+    def __init__(self):
+        self.moves: List[Tuple[str, Optional[int]]] = []
+        self.survived_ticks: int = 0
+        self.is_safe: bool = False
+        self.is_complete: bool = True
+
+    @classmethod
+    def search(cls, game: Game, player: Player, danger_map: DangerMap, max_ticks: Optional[int] = None,
+               time_budget_ms: float = DEFAULT_DODGE_TIME_BUDGET_MS) -> 'DodgePlan':
+        """
+        Finds the shortest sequence of moves after which the player can stand still without being hit.
+        Breadth first search over ticks is used, so the first safe state found is the earliest one.
+
+        When the time budget or max_ticks is exhausted, the best partial plan is returned
+        (the one surviving most ticks, preferring positions which are hit latest).
+        Other players are treated as static obstacles on their current positions.
+        """
+        deadline = time.perf_counter() + time_budget_ms / 1000.0
+        if max_ticks is None:
+            max_ticks = danger_map.horizon
+
+        walkability_cache: Dict[Tuple[int, int], bool] = {}
+
+        def _can_step_on(position):
+            can_step = walkability_cache.get(position)
+            if can_step is None:
+                can_step = game.can_player_step_on(position, disabled_objects=[player])
+                walkability_cache[position] = can_step
+
+            return can_step
+
+        start_state = (player.position, player.direction)
+        layers: List[Dict[_State, Tuple[Optional[_State], Optional[Tuple[str, Optional[int]]]]]] = [
+            {start_state: (None, None)}
+        ]
+        if danger_map.is_safe_from(player.position, 0):
+            return cls._create_plan(layers, start_state, is_safe=True, is_complete=True)
+
+        expansion_count = 0
+        for offset in range(min(max_ticks, danger_map.horizon)):
+            current_layer = layers[-1]
+            next_layer = {}
+            layers.append(next_layer)
+
+            for state in current_layer:
+                expansion_count += 1
+                if expansion_count % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+                    layers.pop()
+                    return cls._create_partial_plan(layers, danger_map, is_complete=False)
+
+                position, direction = state
+                for move, next_state in cls._get_successors(position, direction, _can_step_on):
+                    if next_state in next_layer:
+                        continue
+
+                    next_position = next_state[0]
+                    if danger_map.hits[offset, next_position[0], next_position[1]]:
+                        continue  # would be hit in this tick
+
+                    next_layer[next_state] = (state, move)
+                    if danger_map.is_safe_from(next_position, offset + 1):
+                        return cls._create_plan(layers, next_state, is_safe=True, is_complete=True)
+
+            if not next_layer:
+                # every move leads to a hit, the previous layer is the best we can do
+                layers.pop()
+                break
+
+        return cls._create_partial_plan(layers, danger_map, is_complete=True)
+
+    @classmethod
+    def _get_successors(cls, position: Tuple[int, int], direction: int, can_step_on):
+        yield (WAIT_MOVE, None), (position, direction)
+
+        next_position = step_from(position, direction)
+        if can_step_on(next_position):
+            yield (STEP_MOVE, None), (next_position, direction)
+
+        for next_direction in DIRECTIONS:
+            if next_direction != direction:
+                yield (ROTATE_MOVE, next_direction), (position, next_direction)
+
+    @classmethod
+    def _create_partial_plan(cls, layers, danger_map: DangerMap, is_complete: bool) -> 'DodgePlan':
+        last_offset = len(layers) - 1
+
+        def _ticks_before_hit(state):
+            position = state[0]
+            future_hits = danger_map.hits[last_offset:, position[0], position[1]]
+            if not future_hits.any():
+                return danger_map.horizon
+
+            return int(future_hits.argmax())
+
+        best_state = max(layers[-1], key=_ticks_before_hit)
+        return cls._create_plan(layers, best_state, is_safe=False, is_complete=is_complete)
+
+    @classmethod
+    def _create_plan(cls, layers, final_state: _State, is_safe: bool, is_complete: bool) -> 'DodgePlan':
+        plan = DodgePlan()
+        plan.is_safe = is_safe
+        plan.is_complete = is_complete
+        plan.survived_ticks = len(layers) - 1
+
+        state = final_state
+        for layer in reversed(layers):
+            previous_state, move = layer[state]
+            if move is None:
+                break
+
+            plan.moves.append(move)
+            state = previous_state
+
+        plan.moves.reverse()
+        return plan
+
+    def __repr__(self):
+        return f"dodge_plan(safe={self.is_safe}, complete={self.is_complete}, survived={self.survived_ticks}): " \
+               f"{self.moves}"
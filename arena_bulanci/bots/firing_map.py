@@ -0,0 +1,174 @@
+import math
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT, PLAYER_BOX_RADIUS, BULLET_RAY_LENGTH
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.physics.static_map import get_static_ray_distances, get_walkable_mask, \
+    get_ray_hit_distances
+from arena_bulanci.core.player import Player, GUN_OFFSET
+from arena_bulanci.core.utils import DIRECTION_DEFINITIONS, is_in_map
+
+NO_TARGET = -1
+
+_XS = np.arange(MAP_WIDTH)
+_YS = np.arange(MAP_HEIGHT)
+
+
+class FiringMap(object):
+    """
+    Lines of fire between all walkable positions and the opponents of a player, calculated for a single tick.
+
+    `targets[direction, x, y]` is index (to `opponents`) of the opponent which would be hit first
+    by a bullet shot from (x, y) in the direction (NO_TARGET if no opponent would be hit).
+
+    `exposure[i, direction, x, y]` is True when a player standing on (x, y) would be hit first
+    by a bullet shot by the i-th opponent in the direction.
+
+    (Permanent obstacles and other opponents are accounted for, opponents are considered static)
+    """
+
+    def __init__(self, tick: int, opponents: List[Player]):
+        self.tick = tick
+        self.opponents = opponents
+
+        direction_count = len(DIRECTION_DEFINITIONS)
+        self.targets = np.full((direction_count, MAP_WIDTH, MAP_HEIGHT), NO_TARGET, dtype=np.int8)
+        self.exposure = np.zeros((len(opponents), direction_count, MAP_WIDTH, MAP_HEIGHT), dtype=np.bool_)
+        self.exposure_count = np.zeros((MAP_WIDTH, MAP_HEIGHT), dtype=np.int16)
+
+    @classmethod
+    def create(cls, game: Game, player_id: str) -> 'FiringMap':
+        """
+        Creates FiringMap of given player against all its alive opponents in the game.
+        """
+        opponents = [opponent for opponent in game._players.values() if opponent.id != player_id]
+        firing_map = FiringMap(game.tick, opponents)
+        firing_map._calculate_targets()
+        firing_map._calculate_exposure()
+        return firing_map
+
+    def get_target(self, position: Tuple[int, int], direction: int) -> Optional[Player]:
+        """
+        Gets opponent which would be hit by a bullet shot from given position and direction.
+        """
+        if not is_in_map(position):
+            return None
+
+        target_index = self.targets[direction, position[0], position[1]]
+        if target_index == NO_TARGET:
+            return None
+
+        return self.opponents[target_index]
+
+    def get_shootable_opponents(self, position: Tuple[int, int]) -> List[Tuple[Player, int]]:
+        """
+        Gets opponent, direction pairs which can be shot from given position.
+        """
+        result = []
+        for direction in range(len(DIRECTION_DEFINITIONS)):
+            target = self.get_target(position, direction)
+            if target is not None:
+                result.append((target, direction))
+
+        return result
+
+    def get_attack_positions(self, opponent: Player) -> List[Tuple[Tuple[int, int], int]]:
+        """
+        Gets position, direction pairs from which the opponent can be shot.
+        """
+        opponent_index = self.opponents.index(opponent)
+        return [((int(x), int(y)), int(d)) for d, x, y in np.argwhere(self.targets == opponent_index)]
+
+    def is_exposed(self, position: Tuple[int, int]) -> bool:
+        """
+        Determine if a player standing on given position could be shot by some opponent
+        (after the opponent rotates if needed).
+        """
+        if not is_in_map(position):
+            return False
+
+        return bool(self.exposure_count[position] > 0)
+
+    def _calculate_targets(self):
+        static_ray_distances = get_static_ray_distances()
+        walkable_mask = get_walkable_mask()
+        for direction, coords in enumerate(DIRECTION_DEFINITIONS):
+            along_axis = 0 if coords[0] else 1
+            sign = coords[along_axis]
+            nearest_hits = np.full((MAP_WIDTH, MAP_HEIGHT), np.inf)
+            nearest_targets = self.targets[direction]
+
+            for i, opponent in enumerate(self.opponents):
+                # only bullets shot from positions near the opponent's axis can hit it
+                area = _get_axis_area(opponent.position, along_axis)
+                along, across = _get_area_coordinates(area, along_axis)
+
+                hit_distances = get_ray_hit_distances(
+                    along + sign * GUN_OFFSET, sign, across - opponent.position[1 - along_axis],
+                    opponent.position[along_axis], PLAYER_BOX_RADIUS, BULLET_RAY_LENGTH - GUN_OFFSET
+                )
+                # players are preferred in case of same distance as obstacles (same as in Game.get_nearest_hit)
+                is_nearer = (hit_distances < nearest_hits[area]) & \
+                            (hit_distances <= static_ray_distances[direction][area])
+                nearest_hits[area] = np.where(is_nearer, hit_distances, nearest_hits[area])
+                nearest_targets[area] = np.where(is_nearer, i, nearest_targets[area])
+
+            nearest_targets[~walkable_mask] = NO_TARGET
+
+    def _calculate_exposure(self):
+        static_ray_distances = get_static_ray_distances()
+        walkable_mask = get_walkable_mask()
+        for i, opponent in enumerate(self.opponents):
+            ox, oy = opponent.position
+            for direction, coords in enumerate(DIRECTION_DEFINITIONS):
+                along_axis = 0 if coords[0] else 1
+                sign = coords[along_axis]
+                ray_start = opponent.position[along_axis] + sign * GUN_OFFSET
+                ray_across = opponent.position[1 - along_axis]
+
+                max_distance = static_ray_distances[direction, ox, oy]
+                for blocking_opponent in self.opponents:
+                    blocking_across = blocking_opponent.position[1 - along_axis] - ray_across
+                    if blocking_opponent is opponent or abs(blocking_across) >= PLAYER_BOX_RADIUS:
+                        continue
+
+                    blocking_distance = get_ray_hit_distances(
+                        ray_start, sign, blocking_across,
+                        blocking_opponent.position[along_axis], PLAYER_BOX_RADIUS, BULLET_RAY_LENGTH - GUN_OFFSET
+                    )
+                    max_distance = min(max_distance, float(blocking_distance))
+
+                area = _get_axis_area(opponent.position, along_axis)
+                along, across = _get_area_coordinates(area, along_axis)
+                hit_distances = get_ray_hit_distances(
+                    ray_start, sign, across - ray_across, along, PLAYER_BOX_RADIUS, BULLET_RAY_LENGTH - GUN_OFFSET
+                )
+                # ties with other opponents are considered as exposed
+                is_exposed = np.isfinite(hit_distances) & (hit_distances <= max_distance)
+                self.exposure[i, direction][area] = is_exposed & walkable_mask[area]
+
+        self.exposure_count = self.exposure.sum(axis=(0, 1), dtype=np.int16)
+
+
+def _get_axis_area(position: Tuple[int, int], along_axis: int) -> Tuple[slice, slice]:
+    across = position[1 - along_axis]
+    across_size = (MAP_HEIGHT, MAP_WIDTH)[along_axis]
+    across_slice = slice(
+        max(0, math.floor(across - PLAYER_BOX_RADIUS)), min(across_size, math.ceil(across + PLAYER_BOX_RADIUS) + 1)
+    )
+
+    if along_axis == 0:
+        return slice(None), across_slice
+    else:
+        return across_slice, slice(None)
+
+
+def _get_area_coordinates(area: Tuple[slice, slice], along_axis: int) -> Tuple[np.ndarray, np.ndarray]:
+    xs = _XS[area[0]][:, np.newaxis]
+    ys = _YS[area[1]][np.newaxis, :]
+    if along_axis == 0:
+        return xs, ys
+    else:
+        return ys, xs
@@ -5,25 +5,22 @@ from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT
 from arena_bulanci.core.game import Game
 from arena_bulanci.core.utils import step_from, rotate_180
 
-_UNREACHABLE_POSITIONS = set(Game.get_positions_unreachable_for_players())
 
 class GamePlan(object):
     def __init__(self):
         self.board: Dict[Tuple[int, int], Optional[PlanItem]] = {}
-        for unreachable in Game.get_positions_unreachable_for_players():
-            self.board[unreachable] = None
-
         self._worklist = None
         self._handled = None
 
     @classmethod
     def available_positions_around(cls, position: Tuple[int, int], radius: int) -> List[Tuple[int, int]]:
+        walkable_positions = Game.get_collision_map().walkable_positions
         result = []
         for x in range(max(0, position[0] - radius), min(MAP_WIDTH, position[0] + radius + 1)):
             for y in range(max(0, position[1] - radius), min(MAP_HEIGHT, position[1] + radius + 1)):
                 new_position = x, y
 
-                if new_position in _UNREACHABLE_POSITIONS:
+                if new_position not in walkable_positions:
                     continue
 
                 result.append(new_position)
@@ -52,6 +49,7 @@ class GamePlan(object):
             stop_position: Optional[Tuple[int, int]] = None
     ) -> 'GamePlan':
 
+        walkable_positions = Game.get_collision_map().walkable_positions
         while self._worklist:
             task = self._worklist.pop(0)
 
@@ -62,6 +60,9 @@ class GamePlan(object):
                 if next_position in self._handled:
                     continue  # already included
 
+                if next_position not in walkable_positions:
+                    continue
+
                 if allowed_positions:
                     if next_position not in allowed_positions:
                         continue
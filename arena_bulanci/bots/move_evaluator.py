@@ -0,0 +1,127 @@
+from typing import Sequence
+
+import numpy as np
+
+from arena_bulanci.bots.danger_map import DangerMap
+from arena_bulanci.bots.firing_map import FiringMap, NO_TARGET
+from arena_bulanci.core.actions import ROTATE_ACTIONS, STEP_ACTION, SHOOT_ACTION, ACTION_COUNT
+from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT, PLAYER_BOX_RADIUS
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.physics.static_map import get_walkable_mask
+from arena_bulanci.core.player import Player
+from arena_bulanci.core.utils import DIRECTION_DEFINITIONS
+
+# cooldown start of a gun which has not shot yet
+_NEVER = np.iinfo(np.int64).min // 2
+
+_DIRECTION_XS = np.array([coords[0] for coords in DIRECTION_DEFINITIONS])
+_DIRECTION_YS = np.array([coords[1] for coords in DIRECTION_DEFINITIONS])
+
+
+class MoveSequenceEvaluation(object):
+    """
+    Outcomes of many candidate move sequences of a player, simulated in lockstep.
+    Each of the arrays has a value for every sequence.
+    """
+
+    def __init__(self, sequence_count: int):
+        self.survived_ticks = np.zeros(sequence_count, dtype=np.int32)
+        self.is_alive = np.ones(sequence_count, dtype=np.bool_)
+        self.final_positions = np.zeros((sequence_count, 2), dtype=np.int32)
+        self.final_directions = np.zeros(sequence_count, dtype=np.int32)
+        self.shots_landed = np.zeros(sequence_count, dtype=np.int32)
+        self.wasted_moves = np.zeros(sequence_count, dtype=np.int32)
+
+    @classmethod
+    def evaluate(cls, game: Game, player: Player, danger_map: DangerMap, firing_map: FiringMap,
+                 sequences: Sequence[Sequence[int]]) -> 'MoveSequenceEvaluation':
+        """
+        Simulates the sequences of actions (see core.actions), one action per tick starting at the current tick.
+        Moves follow the game rules (collisions, ammo, cooldown and reload) but rejected moves are just counted
+        as wasted instead of raising exceptions.
+
+        Bullets are taken from the danger map, opponents are considered static (as in the firing map),
+        so a shot lands when it has a clear line to an opponent.
+        Simulation of a sequence stops at the tick when the player gets hit.
+        """
+        actions = np.asarray(sequences, dtype=np.int64)
+        if actions.ndim != 2:
+            raise ValueError(f"sequences have to be given as a 2D array, but shape was {actions.shape}")
+
+        if actions.size and (actions.min() < 0 or actions.max() >= ACTION_COUNT):
+            raise ValueError("sequences contain unknown actions")
+
+        sequence_count, tick_count = actions.shape
+        evaluation = MoveSequenceEvaluation(sequence_count)
+
+        walkable_mask = cls._get_walkable_mask(game, player)
+        gun = player.gun
+        reload_time = gun.reload_time
+
+        xs = np.full(sequence_count, player.position[0], dtype=np.int64)
+        ys = np.full(sequence_count, player.position[1], dtype=np.int64)
+        directions = np.full(sequence_count, player.direction, dtype=np.int64)
+        ammo_counts = np.full(sequence_count, gun.ammo_count, dtype=np.int64)
+        cooldown_starts = np.full(sequence_count, _NEVER if gun.cooldown_start is None else gun.cooldown_start,
+                                  dtype=np.int64)
+        is_alive = evaluation.is_alive
+
+        for offset in range(tick_count):
+            tick = game.tick + offset
+            tick_actions = np.where(is_alive, actions[:, offset], -1)
+
+            is_rotating = (tick_actions >= ROTATE_ACTIONS[0]) & (tick_actions <= ROTATE_ACTIONS[-1])
+            directions = np.where(is_rotating, tick_actions - ROTATE_ACTIONS[0], directions)
+
+            is_stepping = tick_actions == STEP_ACTION
+            next_xs = xs + _DIRECTION_XS[directions]
+            next_ys = ys + _DIRECTION_YS[directions]
+            is_in_map = (next_xs >= 0) & (next_xs < MAP_WIDTH) & (next_ys >= 0) & (next_ys < MAP_HEIGHT)
+            can_step = is_in_map & walkable_mask[
+                np.clip(next_xs, 0, MAP_WIDTH - 1), np.clip(next_ys, 0, MAP_HEIGHT - 1)
+            ]
+            is_step_done = is_stepping & can_step
+            xs = np.where(is_step_done, next_xs, xs)
+            ys = np.where(is_step_done, next_ys, ys)
+
+            is_shooting = tick_actions == SHOOT_ACTION
+            can_shoot = (ammo_counts > 0) & (cooldown_starts + gun.cooldown_time <= tick)
+            is_shot_done = is_shooting & can_shoot
+            ammo_counts = np.where(is_shot_done, ammo_counts - 1, ammo_counts)
+            cooldown_starts = np.where(is_shot_done, tick, cooldown_starts)
+            is_landed = is_shot_done & (firing_map.targets[directions, xs, ys] != NO_TARGET)
+            evaluation.shots_landed += is_landed
+            evaluation.wasted_moves += (is_stepping & ~can_step) | (is_shooting & ~can_shoot)
+
+            if reload_time is not None:
+                # the same as reload done by game cron
+                can_reload = (ammo_counts == 0) & (cooldown_starts + reload_time <= tick)
+                ammo_counts = np.where(can_reload, gun.full_ammo_count, ammo_counts)
+
+            if offset < danger_map.horizon:
+                is_hit = is_alive & danger_map.hits[offset, xs, ys]
+                is_alive &= ~is_hit
+
+            evaluation.survived_ticks += is_alive
+
+        evaluation.final_positions[:, 0] = xs
+        evaluation.final_positions[:, 1] = ys
+        evaluation.final_directions[:] = directions
+        return evaluation
+
+    @classmethod
+    def _get_walkable_mask(cls, game: Game, player: Player) -> np.ndarray:
+        walkable_mask = get_walkable_mask().copy()
+        xs = np.arange(MAP_WIDTH)[:, np.newaxis]
+        ys = np.arange(MAP_HEIGHT)[np.newaxis, :]
+        for opponent in game.opponents_of(player):
+            # same test as CircleBox.intersects_with_circle
+            ox, oy = opponent.position
+            distances = np.sqrt(np.square(xs - ox) + np.square(ys - oy))
+            walkable_mask &= ~(distances < PLAYER_BOX_RADIUS + PLAYER_BOX_RADIUS)
+
+        return walkable_mask
+
+    def __repr__(self):
+        return f"move_sequence_evaluation({len(self.survived_ticks)} sequences): " \
+               f"alive = {int(self.is_alive.sum())}, shots landed = {int(self.shots_landed.sum())}"
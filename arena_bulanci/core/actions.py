@@ -0,0 +1,71 @@
+from typing import Optional
+
+from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
+from arena_bulanci.core.game_updates.player_move_request import PlayerMoveRequest
+from arena_bulanci.core.game_updates.player_rotation_request import PlayerRotationRequest
+from arena_bulanci.core.game_updates.shoot_request import ShootRequest
+from arena_bulanci.core.utils import DIRECTIONS
+
+# integer codes of the basic moves, handy for batched simulations (one move per tick)
+WAIT_ACTION = 0
+ROTATE_ACTIONS = [1 + direction for direction in DIRECTIONS]  # indexed by direction
+STEP_ACTION = 1 + len(DIRECTIONS)
+SHOOT_ACTION = STEP_ACTION + 1
+ACTION_COUNT = SHOOT_ACTION + 1
+
+
+def rotate_action(direction: int) -> int:
+    return ROTATE_ACTIONS[direction]
+
+
+def is_rotate_action(action: int) -> bool:
+    return ROTATE_ACTIONS[0] <= action <= ROTATE_ACTIONS[-1]
+
+
+def action_direction(action: int) -> int:
+    """
+    Gets direction which the rotate action rotates to.
+    """
+    if not is_rotate_action(action):
+        raise ValueError(f"action {action} is not a rotation")
+
+    return action - ROTATE_ACTIONS[0]
+
+
+def create_request(player_id: str, action: int) -> Optional[GameUpdateRequest]:
+    """
+    Creates request of given action for the player (None for waiting).
+    """
+    action = int(action)
+    if action == WAIT_ACTION:
+        return None
+
+    if is_rotate_action(action):
+        return PlayerRotationRequest(player_id, action_direction(action))
+
+    if action == STEP_ACTION:
+        return PlayerMoveRequest(player_id)
+
+    if action == SHOOT_ACTION:
+        return ShootRequest(player_id)
+
+    raise ValueError(f"unknown action {action}")
+
+
+def get_action(request: Optional[GameUpdateRequest]) -> Optional[int]:
+    """
+    Gets action of given request (None if the request is not a basic move, e.g. spawn).
+    """
+    if request is None:
+        return WAIT_ACTION
+
+    if isinstance(request, PlayerRotationRequest):
+        return rotate_action(request.desired_direction)
+
+    if isinstance(request, PlayerMoveRequest):
+        return STEP_ACTION
+
+    if isinstance(request, ShootRequest):
+        return SHOOT_ACTION
+
+    return None
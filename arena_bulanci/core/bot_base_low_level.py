@@ -1,15 +1,27 @@
+import inspect
+import math
 import random
+import time
 from queue import Queue
 from typing import Tuple, Optional, List, Dict
 
+from arena_bulanci.bots.danger_map import DangerMap
+from arena_bulanci.bots.firing_map import FiringMap
 from arena_bulanci.bots.game_plan import GamePlan
+from arena_bulanci.core.config import TICKS_PER_SECOND
+from arena_bulanci.core.future_request_policy import FutureRequestPolicy
 from arena_bulanci.core.game import Game
 from arena_bulanci.core.game_updates.game_update import GameUpdate
 from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
 from arena_bulanci.core.game_updates.player_spawn_request import PlayerSpawnRequest
 from arena_bulanci.core.game_updates.remove_bullet import RemoveBullet
+from arena_bulanci.core.observation_encoder import ObservationEncoder
+from arena_bulanci.core.tick_cache import TickCache
+from arena_bulanci.core.tick_clock import TickClock
 from arena_bulanci.core.utils import install_kill_on_exception_in_any_thread, jsondumps
 
+THINK_TIME_RESERVE = 0.01  # seconds, time needed to send the request after thinking
+
 
 class BotBaseLowLevel(object):
     """
@@ -17,11 +29,13 @@ class BotBaseLowLevel(object):
     There should not be any need to reed and modify this when writing custom bot.
     """
 
-    def __init__(self, color: Tuple[int, int, int] = None):
+    def __init__(self, color: Tuple[int, int, int] = None, seed: Optional[int] = None):
         self.player_id: Optional[str] = None
+        self._random = random.Random(seed)  # seeded bots make the same random choices every run
+
         self.color: Optional[Tuple[int, int, int]] = color
         if self.color is None:
-            self.color = (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+            self.color = (self._random.randint(0, 255), self._random.randint(0, 255), self._random.randint(0, 255))
 
         self._waits_for_spawn = True
         self._waits_for_kill = False
@@ -32,10 +46,41 @@ class BotBaseLowLevel(object):
         install_kill_on_exception_in_any_thread()
         self._update_request_callback = None
         self._position_plans: Dict[Tuple[int, int], GamePlan] = {}
+        self._danger_map: Optional[DangerMap] = None
+        self._firing_map: Optional[FiringMap] = None
+        self._observation_encoder: Optional[ObservationEncoder] = None
+        self._future_request_policy = FutureRequestPolicy()
+        self._tick_clock = TickClock()
+        self._think_deadline: Optional[float] = None
+        self._tick_cache = TickCache()
+
+    def __getstate__(self):
+        """
+        Bots are pickled when they are started in other processes (see run_local_game_in_processes).
+        The queue and the data derived from the played game are not pickled, they are created again.
+        """
+        state = dict(self.__dict__)
+        for name in ["_incoming_updates", "_update_request_callback", "_game", "_raw_game", "_danger_map",
+                     "_firing_map", "_tick_cache"]:
+            state.pop(name, None)
+
+        state["_position_plans"] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._incoming_updates = Queue()
+        self._update_request_callback = None
+        self._game = None
+        self._danger_map = None
+        self._firing_map = None
+        self._tick_cache = TickCache()
 
     def _play(self):
         """
-        The playing logic has to be implemented here
+        The playing logic has to be implemented here.
+        It can be a generator, then every yield marks the enqueued moves as the best answer so far
+        and the generator is stopped at the think deadline.
         """
         raise NotImplementedError("has to be overridden")
 
@@ -67,8 +112,12 @@ class BotBaseLowLevel(object):
         Pops a single update request.
         """
         self._game = game
+        self._tick_cache.invalidate(game)
+        self._think_deadline = self._get_think_deadline()
 
         self._register_updates(updates)
+        if self._observation_encoder is not None:
+            self._observation_encoder.update(game, updates)
 
         if game.player_is_spawned(self.player_id):
             if self._waits_for_spawn:
@@ -77,7 +126,7 @@ class BotBaseLowLevel(object):
                 self._on_bot_spawned()
 
             if not self._update_requests:
-                self._play()
+                self._run_play()
         else:
             if self._waits_for_kill:
                 self._waits_for_kill = False
@@ -96,6 +145,40 @@ class BotBaseLowLevel(object):
         update.tick = game.tick
         return update
 
+    def _run_play(self):
+        result = self._play()
+        if not inspect.isgenerator(result):
+            return
+
+        # anytime play - the moves enqueued at the last yield before the deadline are used
+        best_requests = None
+        is_finished = True
+        try:
+            for _ in result:
+                best_requests = list(self._update_requests)
+                if time.time() >= self._think_deadline:
+                    is_finished = False
+                    break
+        finally:
+            result.close()
+
+        if not is_finished:
+            self._update_requests[:] = best_requests
+
+    def _get_think_deadline(self) -> float:
+        now = time.time()
+        tick_time = 1.0 / TICKS_PER_SECOND
+        deadline = self._tick_clock.get_deadline()
+        if deadline is None:
+            # the network time is not known (e.g. in local games), so the whole tick is available
+            return now + tick_time - THINK_TIME_RESERVE
+
+        if deadline - THINK_TIME_RESERVE < now:
+            # the updates came too late for the next tick, the request will be played in the following one
+            deadline += math.ceil((now - deadline + THINK_TIME_RESERVE) / tick_time) * tick_time
+
+        return deadline - THINK_TIME_RESERVE
+
     def _spawn_bot(self):
         self._add_update_request(PlayerSpawnRequest(self.player_id, self.color))
 
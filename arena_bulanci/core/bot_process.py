@@ -0,0 +1,108 @@
+import time
+from typing import List, Optional
+
+from arena_bulanci.core.game_updates.game_update import GameUpdate
+from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
+from arena_bulanci.core.shared_game_state import SharedGameState
+
+STOP_TIMEOUT = 1.0  # seconds
+
+
+class BotProcess(object):
+    """
+    Runs a bot in its own process, the bot reads game states from the SharedGameState.
+    Every tick, the process gets updates of the tick and answers with an update request.
+    Bot which thinks too long misses ticks (its late answers are dropped) and thinks about the newest state next time.
+    """
+
+    def __init__(self, bot, state: SharedGameState, context):
+        self.player_id = bot.player_id
+        self.late_request_count = 0
+
+        self._connection, worker_connection = context.Pipe()
+        self._process = context.Process(target=_bot_worker, args=[bot, state.name, state.player_ids, worker_connection],
+                                        daemon=True)
+        self._is_running = False
+
+    def start(self):
+        self._process.start()
+        self._is_running = True
+
+    def request_update(self, tick: int, updates: List[GameUpdate]):
+        """
+        Notifies the bot about the updates which led to the published state of the tick.
+        """
+        if self._is_running:
+            self._connection.send((tick, updates))
+
+    def collect_update_request(self, tick: int, deadline: Optional[float]) -> Optional[GameUpdateRequest]:
+        """
+        Waits until the deadline (or indefinitely for None) for the request answering the tick.
+        """
+        while self._is_running:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            if not self._connection.poll(timeout):
+                self.late_request_count += 1
+                return None
+
+            try:
+                request_tick, request = self._connection.recv()
+            except EOFError:
+                print(f"ERROR: Process of bot {self.player_id} ended")
+                self._is_running = False
+                return None
+
+            if request_tick == tick:
+                return request
+
+            # otherwise, it is a late answer to an older tick
+
+        return None
+
+    def stop(self):
+        if self._is_running:
+            self._is_running = False
+            try:
+                self._connection.send(None)
+            except OSError:
+                pass  # already ended
+
+        self._process.join(STOP_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+def _bot_worker(bot, state_name: str, player_ids: List[str], connection):
+    state = SharedGameState(player_ids, name=state_name)
+    pending_updates = []  # updates of the skipped ticks
+    try:
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+
+            # the bot might have been thinking too long, only the newest state is played (with all the updates)
+            updates = pending_updates + list(message[1])
+            while message is not None and connection.poll():
+                message = connection.recv()
+                if message is not None:
+                    updates.extend(message[1])
+
+            if message is None:
+                break
+
+            try:
+                game = state.read()
+            except TimeoutError:
+                # the tick is skipped (the arena treats it as a late answer), the updates are kept for the next one
+                print(f"WARN: Game state of tick {message[0]} was not readable by bot {bot.player_id}")
+                pending_updates = updates
+                continue
+
+            request = bot.pop_update_request(game, updates)
+            pending_updates = []
+            connection.send((game.tick, request))
+    except EOFError:
+        pass  # the game has ended
+    finally:
+        state.close()
@@ -2,10 +2,12 @@ from typing import Tuple, Optional
 
 from arena_bulanci.core.config import BULLET_SPEED
 from arena_bulanci.core.physics.segment import Segment
-from arena_bulanci.core.utils import DIRECTION_LOOKUP
+from arena_bulanci.core.utils import DIRECTION_LOOKUP, copy_slots
 
 
 class Bullet(object):
+    __slots__ = ("id", "start_tick", "start_position", "direction_coords", "reward_receiver_id")
+
     def __init__(self, id: str, start_tick: int, start_position: Tuple[int, int], direction_coords: Tuple[float, float],
                  reward_receiver_id: str):
         self.id: str = id
@@ -14,6 +16,9 @@ class Bullet(object):
         self.direction_coords = direction_coords
         self.reward_receiver_id = reward_receiver_id
 
+    def __deepcopy__(self, memo):
+        return copy_slots(self, memo)  # all the values are immutable
+
     @property
     def direction(self):
         return DIRECTION_LOOKUP[self.direction_coords]
@@ -26,7 +31,12 @@ class Bullet(object):
             return None
 
         ticks_from_start = trajectory_start_tick - self.start_tick
+        return self.get_trajectory(ticks_from_start, trajectory_ticks)
 
+    def get_trajectory(self, ticks_from_start: int, trajectory_ticks=1) -> Segment:
+        """
+        Gets segment flown by the bullet during trajectory_ticks starting ticks_from_start after it was fired.
+        """
         start = (
             self.start_position[0] + self.direction_coords[0] * ticks_from_start * BULLET_SPEED,
             self.start_position[1] + self.direction_coords[1] * ticks_from_start * BULLET_SPEED
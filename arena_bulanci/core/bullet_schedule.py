@@ -0,0 +1,141 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+from arena_bulanci.core.bullet import Bullet
+from arena_bulanci.core.config import MAX_BULLET_AGE, BULLET_SPEED
+from arena_bulanci.core.physics.circle_box import CircleBox
+from arena_bulanci.core.utils import distance_sqr
+
+# bullets are removed on the first tick they are older than MAX_BULLET_AGE
+REMOVAL_AGE = math.floor(MAX_BULLET_AGE) + 1
+# stale removals (of already removed bullets) are dropped when there are too many of them
+MIN_COMPACTED_REMOVAL_COUNT = 64
+
+
+class BulletImpact(object):
+    """
+    Static part of the bullet lifecycle. Obstacles don't move, so the tick when the bullet hits an obstacle
+    is known already when the bullet is fired.
+    """
+    __slots__ = ("obstacle_tick", "obstacle_distance_sqr", "removal_tick")
+
+    def __init__(self, obstacle_tick: Optional[int], obstacle_distance_sqr: Optional[float], removal_tick: int):
+        self.obstacle_tick = obstacle_tick
+        # distance of the obstacle hit from start of the trajectory tested on obstacle_tick
+        self.obstacle_distance_sqr = obstacle_distance_sqr
+        self.removal_tick = removal_tick
+
+
+class BulletSchedule(object):
+    """
+    Index of the game bullets by their id together with their impacts.
+    Removals of the bullets (on an obstacle hit or because of their age) are kept in a priority queue by tick.
+
+    The schedule is derived from the bullets, so the game keeps it consistent on rollbacks
+    and bullets missing in it (e.g. in deserialized games) are registered lazily.
+    """
+
+    def __init__(self, obstacle_boxes: List[CircleBox]):
+        self._obstacle_boxes = obstacle_boxes
+        self._bullets: Dict[str, Bullet] = {}
+        self._impacts: Dict[str, BulletImpact] = {}
+        self._removals: List[Tuple[int, str]] = []
+
+    def find(self, bullet_id: str) -> Optional[Bullet]:
+        return self._bullets.get(bullet_id)
+
+    def get_impact(self, bullet: Bullet) -> BulletImpact:
+        if self._bullets.get(bullet.id) is not bullet:
+            return self.register(bullet)
+
+        return self._impacts[bullet.id]
+
+    def register(self, bullet: Bullet, impact: Optional[BulletImpact] = None) -> BulletImpact:
+        """
+        Registers the bullet with its impact (which is computed when not given).
+        """
+        if impact is None:
+            impact = self._compute_impact(bullet)
+
+        self._bullets[bullet.id] = bullet
+        self._impacts[bullet.id] = impact
+
+        if len(self._removals) > 2 * len(self._impacts) + MIN_COMPACTED_REMOVAL_COUNT:
+            self._removals = [(impact.removal_tick, bullet_id) for bullet_id, impact in self._impacts.items()]
+            heapq.heapify(self._removals)
+        else:
+            heapq.heappush(self._removals, (impact.removal_tick, bullet.id))
+
+        return impact
+
+    def unregister(self, bullet: Bullet) -> Optional[BulletImpact]:
+        """
+        Unregisters the bullet, returns its impact (for registering the bullet again on a rollback).
+        Its scheduled removal is dropped lazily.
+        """
+        if self._bullets.get(bullet.id) is not bullet:
+            return None
+
+        del self._bullets[bullet.id]
+        return self._impacts.pop(bullet.id)
+
+    def pop_removals(self, tick: int) -> Set[str]:
+        """
+        Pops ids of bullets scheduled to be removed until the tick (inclusive).
+        """
+        result = set()
+        removals = self._removals
+        while removals and removals[0][0] <= tick:
+            removal_tick, bullet_id = heapq.heappop(removals)
+            impact = self._impacts.get(bullet_id)
+            if impact is not None and impact.removal_tick == removal_tick:
+                result.add(bullet_id)
+
+        return result
+
+    def reschedule_removals(self, bullet_ids: Set[str]):
+        """
+        Schedules the popped removals again (used for rolling back the pop).
+        """
+        for bullet_id in bullet_ids:
+            impact = self._impacts.get(bullet_id)
+            if impact is not None:
+                heapq.heappush(self._removals, (impact.removal_tick, bullet_id))
+
+    def _compute_impact(self, bullet: Bullet) -> BulletImpact:
+        removal_tick = bullet.start_tick + REMOVAL_AGE
+
+        # segment i is the trajectory tested on start_tick + i + 1 (the first one is tested also on start_tick)
+        segment_count = REMOVAL_AGE
+        dx, dy = bullet.direction_coords
+        ticks_per_distance_sqr = dx * dx + dy * dy
+        if ticks_per_distance_sqr == 0:
+            return BulletImpact(None, None, removal_tick)
+
+        ray = bullet.get_trajectory(0, segment_count)
+        obstacle_hits: Dict[int, float] = {}  # segment index -> distance of the nearest hit from the segment start
+        for box in self._obstacle_boxes:
+            if not box.may_intersect_segment(ray.start, ray.end):
+                continue
+
+            # only the segments around projection of the box center onto the ray can hit the box
+            center_ticks = ((box.center[0] - ray.start[0]) * dx + (box.center[1] - ray.start[1]) * dy) / \
+                           (ticks_per_distance_sqr * BULLET_SPEED)
+            radius_ticks = box.radius / (math.sqrt(ticks_per_distance_sqr) * BULLET_SPEED)
+            first_index = max(0, math.floor(center_ticks - radius_ticks) - 1)
+            last_index = min(segment_count - 1, math.ceil(center_ticks + radius_ticks) + 1)
+
+            for segment_index in range(first_index, last_index + 1):
+                segment = bullet.get_trajectory(segment_index)
+                for point in segment.get_intersection_points(box):
+                    hit_distance_sqr = distance_sqr(segment.start, point)
+                    if segment_index not in obstacle_hits or hit_distance_sqr < obstacle_hits[segment_index]:
+                        obstacle_hits[segment_index] = hit_distance_sqr
+
+        if not obstacle_hits:
+            return BulletImpact(None, None, removal_tick)
+
+        segment_index = min(obstacle_hits)
+        obstacle_tick = bullet.start_tick + (segment_index + 1 if segment_index else 0)
+        return BulletImpact(obstacle_tick, obstacle_hits[segment_index], obstacle_tick)
@@ -1,9 +1,13 @@
 import os
 
+from arena_bulanci.core.maps.map_package import MapPackage, DEFAULT_MAP
+
 TICKS_PER_SECOND = 15
 MIN_RESPAWN_TICK_COUNT = TICKS_PER_SECOND * 5.0
-MAP_WIDTH = 160
-MAP_HEIGHT = 90
+# map package name (or path to a package directory), see MapPackage
+ARENA_MAP = MapPackage.load(os.getenv("ARENA_BULANCI_MAP", DEFAULT_MAP))
+MAP_WIDTH = ARENA_MAP.width
+MAP_HEIGHT = ARENA_MAP.height
 PLAYER_BOX_RADIUS = 2.01
 MAX_FUTURE_UPDATE_REQUESTS = 50
 
@@ -19,5 +23,9 @@ REMOTE_ARENA_RAW_UPDATES_PORT = 6971
 LOCAL_ARENA_WEB_PORT = 6972
 LOCAL_ARENA_GAME_UPDATES_PORT = 6973
 LOCAL_ARENA_RAW_UPDATES_PORT = 6974
+LOCAL_NETWORK_SIMULATOR_PORT = 6980
 
 REMOTE_ARENA_HOSTNAME = os.getenv("REMOTE_HOSTNAME_OVERRIDE", REMOTE_ARENA_HOSTNAME)
+
+# compiled map data (e.g. collision maps) are cached there
+CACHE_DIR = os.getenv("ARENA_BULANCI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "arena_bulanci"))
@@ -1,23 +1,60 @@
 import datetime
 import gc
+import multiprocessing
+import time
 from collections import defaultdict
+from threading import Thread
 from time import sleep
 from typing import List, Optional
 
 from arena_bulanci.bots.bot_base import BotBase
 from arena_bulanci.bots.jupyter_bot import JupyterBot
+from arena_bulanci.core.bot_process import BotProcess
 from arena_bulanci.core.config import LOCAL_ARENA_GAME_UPDATES_PORT, LOCAL_ARENA_WEB_PORT, TICKS_PER_SECOND, \
-    REMOTE_ARENA_GAME_UPDATES_PORT, REMOTE_ARENA_HOSTNAME, REMOTE_ARENA_WEB_PORT, LOCAL_ARENA_RAW_UPDATES_PORT
+    REMOTE_ARENA_GAME_UPDATES_PORT, REMOTE_ARENA_HOSTNAME, REMOTE_ARENA_WEB_PORT, LOCAL_ARENA_RAW_UPDATES_PORT, \
+    ARENA_MAP, LOCAL_NETWORK_SIMULATOR_PORT
 from arena_bulanci.core.game import Game
 from arena_bulanci.core.game_updates.error import ErrorUpdate
+from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
+from arena_bulanci.core.networking.network_simulator import NetworkConditions, NetworkSimulatorProxy
 from arena_bulanci.core.networking.socket_client import SocketClient
+from arena_bulanci.core.replay import RequestLogRecorder
+from arena_bulanci.core.shared_game_state import SharedGameState
+from arena_bulanci.core.think_statistics import ThinkStatistics, print_think_summary
+from arena_bulanci.core.threaded_bot_runtime import ThreadedBotRuntime
 from arena_bulanci.core.utils import jsondumps, jsonloads, validate_email
 from arena_bulanci.core.web.arena_app import ArenaApp
 
 JUPYTER_BOT: Optional[BotBase] = JupyterBot()
+STATISTICS_REPORT_TICKS = 60 * TICKS_PER_SECOND
+MIN_THINK_TIME = 0.01  # seconds, less time left before the tick deadline is reported before thinking
+REQUEST_COLLECTION_RESERVE = 0.005  # seconds of the tick left for the game step when bots run in processes
+
+# what happens with a request of a bot which overran its think budget in a local game
+OVERRUN_WARN = "warn"  # the request is played, a warning is printed
+OVERRUN_DROP = "drop"  # the request is dropped (as if it came too late to the arena)
+OVERRUN_FUTURE_REQUEST = "future"  # the future request sent with the previous request is played instead
+OVERRUN_POLICIES = [OVERRUN_WARN, OVERRUN_DROP, OVERRUN_FUTURE_REQUEST]
+
+
+def run_local_game(bots: List[BotBase], simulate_real_delay=True, seed: Optional[int] = None,
+                   request_log_path: Optional[str] = None, think_budget: Optional[float] = None,
+                   overrun_policy: str = OVERRUN_WARN, tick_limit: Optional[int] = None):
+    """
+    Runs the bots in a local arena.
+    Seeded games can be recorded to a request log, which allows to replay the match exactly (see core.replay).
+
+    Think times of the bots are measured. The think_budget (in seconds) is enforced by the overrun_policy
+    (see OVERRUN_POLICIES), so slow bots are caught before they miss ticks in the remote arena.
+    Summary of the think times is printed when the game ends (after tick_limit ticks, if given, or on interrupt).
+    """
+    if overrun_policy not in OVERRUN_POLICIES:
+        raise ValueError(f"Unknown overrun policy `{overrun_policy}`, use one of {OVERRUN_POLICIES}")
+
+    game = Game(verbose=False, seed=seed)
+    if request_log_path is not None:
+        RequestLogRecorder(game, request_log_path)
 
-def run_local_game(bots: List[BotBase], simulate_real_delay=True):
-    game = Game(verbose=False)
     app = ArenaApp(game, '127.0.0.1', LOCAL_ARENA_WEB_PORT, LOCAL_ARENA_GAME_UPDATES_PORT, LOCAL_ARENA_RAW_UPDATES_PORT,
                    "Local Arena")
     app.run_async()
@@ -27,39 +64,192 @@ def run_local_game(bots: List[BotBase], simulate_real_delay=True):
         bot.player_id = f"player{i}@mail.domain"
         bot._raw_game = game
 
+    think_statistics = [ThinkStatistics(bot.player_id, think_budget) for bot in bots]
+    future_requests = [[] for _ in bots]
+
     last_updates = None
     last_whole_iteration_duration = None
-    while game.is_running:
-        iteration_start = datetime.datetime.now()
-        bot_updates = []
+    try:
+        while game.is_running and (tick_limit is None or game.tick < tick_limit):
+            iteration_start = datetime.datetime.now()
+            bot_updates = []
+
+            # collect  update requests from bots
+            for i, bot in enumerate(bots):
+                app._connection_stats_handler(bot.player_id, last_whole_iteration_duration, 0)
+                game_copy = game.copy_without_internal_data()
+                think_start = time.perf_counter()
+                update_request = bot.pop_update_request(game_copy, last_updates)
+                think_time = time.perf_counter() - think_start
+
+                if think_statistics[i].register(think_time):
+                    print(f"WARN: {bot.player_id} overran think budget at tick {game.tick}: "
+                          f"{think_time * 1000:.2f}ms, the request is handled by `{overrun_policy}` policy")
+                    if overrun_policy == OVERRUN_DROP:
+                        update_request = None
+                    elif overrun_policy == OVERRUN_FUTURE_REQUEST:
+                        update_request = future_requests[i].pop(0) if future_requests[i] else None
+                elif overrun_policy == OVERRUN_FUTURE_REQUEST:
+                    future_requests[i] = bot.get_future_requests(update_request)
+
+                if update_request:
+                    bot_updates.append(update_request)
+
+            # run game steps
+            game.accept(bot_updates)
+            last_updates = game.step(catch_exceptions=False)
+            iteration_end = datetime.datetime.now()
+
+            iteration_duration = (iteration_end - iteration_start).total_seconds()
+            if simulate_real_delay:
+                # optionally simulate iteration delay
+                desired_iteration_time = 1 / TICKS_PER_SECOND
+                sleep_time = max(0, desired_iteration_time - iteration_duration)
+                sleep(sleep_time)
+
+            last_whole_iteration_duration = (datetime.datetime.now() - iteration_start).total_seconds()
+    finally:
+        print_think_summary(think_statistics)
+
+
+def run_local_game_in_processes(bots: List[BotBase], simulate_real_delay=True, seed: Optional[int] = None,
+                                request_log_path: Optional[str] = None):
+    """
+    Runs the bots in a local arena, every bot in its own process (so the bots think in parallel).
+    The game state is published to the bots through shared memory every tick. With simulate_real_delay,
+    requests are collected only until the tick deadline (late requests are dropped, as in the remote arena),
+    otherwise the game waits for all the bots.
+    NOTE: Bots are passed to the processes by fork (where available), otherwise they are pickled (see BotBaseLowLevel).
+    """
+    game = Game(verbose=False, seed=seed)
+    if request_log_path is not None:
+        RequestLogRecorder(game, request_log_path)
 
-        # collect  update requests from bots
-        for bot in bots:
-            app._connection_stats_handler(bot.player_id, last_whole_iteration_duration, 0)
-            game_copy = game.copy_without_internal_data()
-            update_request = bot.pop_update_request(game_copy, last_updates)
-            if update_request:
-                bot_updates.append(update_request)
+    # made up bot names
+    player_ids = [f"player{i}@mail.domain" for i in range(len(bots))]
+    state = SharedGameState(player_ids)
+    start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(start_method)
+    bot_processes = []
+    for bot, player_id in zip(bots, player_ids):
+        bot.player_id = player_id
+        bot_process = BotProcess(bot, state, context)
+        bot_process.start()  # before the app threads are started, so they are not forked
+        bot_processes.append(bot_process)
 
-        # run game steps
-        game.accept(bot_updates)
-        last_updates = game.step(catch_exceptions=False)
-        iteration_end = datetime.datetime.now()
+    app = ArenaApp(game, '127.0.0.1', LOCAL_ARENA_WEB_PORT, LOCAL_ARENA_GAME_UPDATES_PORT, LOCAL_ARENA_RAW_UPDATES_PORT,
+                   "Local Arena")
+    app.run_async()
 
-        iteration_duration = (iteration_end - iteration_start).total_seconds()
-        if simulate_real_delay:
-            # optionally simulate iteration delay
-            desired_iteration_time = 1 / TICKS_PER_SECOND
-            sleep_time = max(0, desired_iteration_time - iteration_duration)
-            sleep(sleep_time)
+    last_updates = []
+    last_whole_iteration_duration = None
+    try:
+        while game.is_running:
+            iteration_start = time.time()
+            state.publish(game)
+            for bot_process in bot_processes:
+                app._connection_stats_handler(bot_process.player_id, last_whole_iteration_duration, 0)
+                bot_process.request_update(game.tick, last_updates)
+
+            deadline = None
+            if simulate_real_delay:
+                deadline = iteration_start + 1 / TICKS_PER_SECOND - REQUEST_COLLECTION_RESERVE
+
+            bot_updates = []
+            for bot_process in bot_processes:
+                update_request = bot_process.collect_update_request(game.tick, deadline)
+                if update_request:
+                    bot_updates.append(update_request)
+
+            game.accept(bot_updates)
+            last_updates = game.step(catch_exceptions=False)
+            if game.tick % STATISTICS_REPORT_TICKS == 0:
+                late_requests = ", ".join(f"{p.player_id}: {p.late_request_count}" for p in bot_processes)
+                print(f"INFO: Late requests {late_requests}")
+
+            if simulate_real_delay:
+                sleep(max(0.0, 1 / TICKS_PER_SECOND - (time.time() - iteration_start)))
+
+            last_whole_iteration_duration = time.time() - iteration_start
+    finally:
+        for bot_process in bot_processes:
+            bot_process.stop()
+
+        state.close()
+
+
+def run_local_game_over_network(bots: List[BotBase], conditions: NetworkConditions, seed: Optional[int] = None,
+                                statistics_interval: float = 10.0, threaded_thinking: bool = False,
+                                bots_per_connection: int = 1):
+    """
+    Runs the bots in a local arena, connected the same way as to the remote arena,
+    but through a proxy which simulates given network conditions (latency, jitter, bandwidth, stalls).
+    This way, skipped ticks and future requests of the bots can be tuned locally.
+    With bots_per_connection > 1, the bots are multiplexed over shared connections.
+    """
+    game = Game(verbose=False, seed=seed)
+    app = ArenaApp(game, '127.0.0.1', LOCAL_ARENA_WEB_PORT, LOCAL_ARENA_GAME_UPDATES_PORT, LOCAL_ARENA_RAW_UPDATES_PORT,
+                   "Local Arena")
+    app.run_async()
+    app.start_game_worker()
+
+    # raw clients are served on the port following the game updates port
+    proxy = NetworkSimulatorProxy(LOCAL_NETWORK_SIMULATOR_PORT, "127.0.0.1", LOCAL_ARENA_GAME_UPDATES_PORT + 1,
+                                  conditions, seed=seed)
+    proxy.start()
+
+    connection_statistics = {}
+    for i in range(0, len(bots), bots_per_connection):
+        connection_bots = bots[i:i + bots_per_connection]
+        usernames = [f"player{i + j}@mail.domain" for j in range(len(connection_bots))]
+        connection_name = ", ".join(usernames)
+        connection_statistics[connection_name] = defaultdict(int)
+        Thread(target=_run_remote_arena_game, args=[connection_bots, usernames], kwargs={
+            "print_skipped_tick_info": False, "arena_hostname_override": "127.0.0.1",
+            "arena_port_override": proxy.port, "statistics": connection_statistics[connection_name],
+            "threaded_thinking": threaded_thinking
+        }, daemon=True).start()
+
+    while game.is_running:
+        sleep(statistics_interval)
+        for connection_name, statistics in connection_statistics.items():
+            print(f"INFO: {connection_name} {_format_statistics(statistics)}")
 
-        last_whole_iteration_duration = (datetime.datetime.now() - iteration_start).total_seconds()
+
+def _format_statistics(statistics: defaultdict) -> str:
+    ticks = statistics["ticks"] + statistics["skipped_ticks"] + statistics["future_requests_used"]
+    future_request_count = statistics["correct_future_requests"] + statistics["incorrect_future_requests"]
+    hit_rate = statistics["correct_future_requests"] / max(1, future_request_count)
+    return f"ticks: {ticks}, skipped: {statistics['skipped_ticks']}, " \
+           f"future requests correct: {statistics['correct_future_requests']}, " \
+           f"incorrect: {statistics['incorrect_future_requests']} (hit rate {hit_rate * 100:.1f}%), " \
+           f"late updates: {statistics['late_updates']}"
 
 
 def run_remote_arena_game(bot: BotBase, username: str, print_skipped_tick_info: bool = True,
-                          print_think_time: bool = False, arena_hostname_override: str = None):
-    _run_remote_arena_game(bot, username, print_skipped_tick_info=print_skipped_tick_info,
-                           print_think_time=print_think_time, arena_hostname_override=arena_hostname_override)
+                          print_think_time: bool = False, arena_hostname_override: str = None,
+                          arena_port_override: int = None, threaded_thinking: bool = False):
+    """
+    Plays the bot in the remote arena.
+    With threaded_thinking, the bot thinks on its own thread while the network thread replies to every tick on time
+    (with the moves published so far), which suits bots whose _play sometimes takes longer than a tick.
+    """
+    _run_remote_arena_game([bot], [username], print_skipped_tick_info=print_skipped_tick_info,
+                           print_think_time=print_think_time, arena_hostname_override=arena_hostname_override,
+                           arena_port_override=arena_port_override, threaded_thinking=threaded_thinking)
+
+
+def run_multiplexed_remote_arena_game(bots: List[BotBase], usernames: List[str], print_skipped_tick_info: bool = True,
+                                      print_think_time: bool = False, arena_hostname_override: str = None,
+                                      arena_port_override: int = None, threaded_thinking: bool = False):
+    """
+    Plays several bots in the remote arena over a single connection.
+    The updates are decoded and applied only once (to a game shared by the bots, which think one after another)
+    and requests of all the bots are sent in a single message every tick.
+    """
+    _run_remote_arena_game(bots, usernames, print_skipped_tick_info=print_skipped_tick_info,
+                           print_think_time=print_think_time, arena_hostname_override=arena_hostname_override,
+                           arena_port_override=arena_port_override, threaded_thinking=threaded_thinking)
 
 
 def run_remote_arena_game_for_jupyter(arena_hostname, username, screen_size_factor=0.5):
@@ -73,15 +263,19 @@ def run_remote_arena_game_for_jupyter(arena_hostname, username, screen_size_fact
 
 
 
-def _run_remote_arena_game(bot: BotBase, username: str, reconnect=True, print_skipped_tick_info=True,
-                           print_think_time=False, arena_hostname_override: str = None):
-    statistics = defaultdict(int)
+def _run_remote_arena_game(bots: List[BotBase], usernames: List[str], reconnect=True, print_skipped_tick_info=True,
+                           print_think_time=False, arena_hostname_override: str = None,
+                           arena_port_override: int = None, statistics: Optional[defaultdict] = None,
+                           threaded_thinking: bool = False):
+    if statistics is None:
+        statistics = defaultdict(int)
 
     while True:
         try:
             statistics["connection_count"] += 1
-            _raw_play_remote_game(bot, username, statistics, print_skipped_tick_info=print_skipped_tick_info,
-                                  print_think_time=print_think_time, arena_hostname_override=arena_hostname_override)
+            _raw_play_remote_game(bots, usernames, statistics, print_skipped_tick_info=print_skipped_tick_info,
+                                  print_think_time=print_think_time, arena_hostname_override=arena_hostname_override,
+                                  arena_port_override=arena_port_override, threaded_thinking=threaded_thinking)
         except SystemExit:
             print("Exiting.")
             break
@@ -96,33 +290,88 @@ def _run_remote_arena_game(bot: BotBase, username: str, reconnect=True, print_sk
                 break
 
 
-def _raw_play_remote_game(bot: BotBase, username: str, statistics: defaultdict, print_skipped_tick_info=True,
-                          print_think_time=False, arena_hostname_override: str = None):
+def _raw_play_remote_game(bots: List[BotBase], usernames: List[str], statistics: defaultdict,
+                          print_skipped_tick_info=True, print_think_time=False, arena_hostname_override: str = None,
+                          arena_port_override: int = None, threaded_thinking: bool = False):
+    """
+    Plays the bots over a single connection.
+    More bots are multiplexed - the connection carries requests of all their players (keyed by player id).
+    """
+    if len(bots) != len(usernames):
+        raise ValueError("Every bot needs its username")
 
-    bot.player_id = username
-    validate_email(username)
+    for bot, username in zip(bots, usernames):
+        bot.player_id = username
+        validate_email(username)
 
+    is_multiplexed = len(bots) > 1
     client = SocketClient()
 
     hostname = REMOTE_ARENA_HOSTNAME
     if arena_hostname_override:
         hostname = arena_hostname_override
 
-    client.connect(hostname, REMOTE_ARENA_GAME_UPDATES_PORT + 1)
-    client.send_string(jsondumps({
-        "player_id": username, "version": "1.0.5", "bot": (bot.__class__.__module__ + "." + bot.__class__.__qualname__), "root": __file__
-    }))
+    port = REMOTE_ARENA_GAME_UPDATES_PORT + 1
+    if arena_port_override:
+        port = arena_port_override
+
+    client.connect(hostname, port)
+    handshake_send_time = time.time()
+    handshake = {
+        "player_id": usernames[0], "version": "1.0.5",
+        "bot": (bots[0].__class__.__module__ + "." + bots[0].__class__.__qualname__), "root": __file__
+    }
+    if is_multiplexed:
+        handshake["player_ids"] = usernames
+
+    client.send_string(jsondumps(handshake))
     initial_data_str = client.read_string()
-    print(f"Player {username} connected")
+    handshake_receive_time = time.time()
+    print(f"Player {', '.join(usernames)} connected")
     data = jsonloads(initial_data_str)
+    _check_arena_map(data.get("map"))
+
+    clock_sync = data.get("clock_sync")
+    if clock_sync is not None:
+        for bot in bots:
+            bot._tick_clock.synchronize(handshake_send_time, clock_sync["receive_time"], clock_sync["send_time"],
+                                        handshake_receive_time)
+
+        tick_clock = bots[0]._tick_clock
+        print(f"Clock synchronized: offset {tick_clock.offset * 1000:.2f}ms, "
+              f"roundtrip {tick_clock.roundtrip * 1000:.2f}ms")
 
     client.send_string(jsondumps(None))  # send first update empty
 
-    _future_requests = []
     game: Game = data["state"]
     game._tick_subscribers = []
     game._pretick_subscribers = []
-    bot._raw_game = game
+    game._request_subscribers = []
+    for bot in bots:
+        bot._raw_game = game  # the bots share the replica (they think one after another)
+
+    runtimes = [ThreadedBotRuntime(bot) if threaded_thinking else None for bot in bots]
+    try:
+        _play_remote_game_loop(bots, client, game, runtimes, is_multiplexed, statistics, print_skipped_tick_info,
+                               print_think_time)
+    finally:
+        for runtime in runtimes:
+            if runtime is not None:
+                runtime.stop()
+
+
+def _play_remote_game_loop(bots: List[BotBase], client: SocketClient, game: Game,
+                           runtimes: List[Optional[ThreadedBotRuntime]], is_multiplexed: bool,
+                           statistics: defaultdict, print_skipped_tick_info: bool, print_think_time: bool):
+    tick_clock = bots[0]._tick_clock  # all the bots are synchronized the same way
+    player_ids = {bot.player_id for bot in bots}
+    # the arena plays the sent requests one per tick, requests of a late response are skipped for the ticks
+    # played meanwhile by the pending requests of the previous response (see GameUpdateServer)
+    bot_sent_requests: List[List[Optional[GameUpdateRequest]]] = [[None] for _ in bots]
+    bot_pending_requests: List[List[Optional[GameUpdateRequest]]] = [[] for _ in bots]
+    bot_skipped_counts = [0 for _ in bots]  # sent requests skipped by the arena
+    bot_queued_counts = [0 for _ in bots]  # sent_requests[1:queued_count + 1] are still enqueued in the bot
+    sent_time = None
     while game.is_running:
         update_data_str = client.read_string()
         start = datetime.datetime.now()
@@ -133,51 +382,109 @@ def _raw_play_remote_game(bot: BotBase, username: str, statistics: defaultdict,
             raise AssertionError("Connection was ended because of other connection with the same id.")
 
         update_groups = jsonloads(update_data_str)
+        if sent_time is not None:
+            for bot in bots:
+                bot._future_request_policy.register_response((start - sent_time).total_seconds(),
+                                                             len(update_groups))
 
         for update_group in update_groups:
             updates = update_group["updates"]
             for update in updates:
-                if isinstance(update, ErrorUpdate) and update._player_id == bot.player_id:
-                    print("ERROR: ", update.error)
+                if isinstance(update, ErrorUpdate) and update._player_id in player_ids:
+                    prefix = f"{update._player_id}: " if is_multiplexed else ""
+                    print(f"ERROR: {prefix}", update.error)
 
-        is_first = True
+        # the last update group was played with the last response, the previous groups (when the response was late)
+        # with the pending future requests of the previous response
         last_updates = []
-        for update_group in update_groups:
-            if is_first:
+        for i, update_group in enumerate(update_groups):
+            if i == len(update_groups) - 1:
                 statistics["ticks"] += 1
-                is_first = False
+                if statistics["ticks"] % STATISTICS_REPORT_TICKS == 0:
+                    future_request_counts = ", ".join(str(bot.future_request_count) for bot in bots)
+                    print(f"INFO: {_format_statistics(statistics)}, future request count: {future_request_counts}")
             else:
-                if _future_requests:
-                    statistics["future_requests_used"] += 1
-                    future_request = _future_requests.pop(0)
-                    if bot.try_pop_by_future_request(future_request):
+                # ticks are counted per connection (a tick is skipped when any of the multiplexed bots missed it),
+                # the future requests per bot
+                is_skipped = False
+                for j, (sent_requests, pending_requests) in enumerate(zip(bot_sent_requests, bot_pending_requests)):
+                    if not pending_requests:
+                        is_skipped = True
+                        continue
+
+                    # the future request is correct when the bot (knowing more) intended the same for the tick
+                    played_request = pending_requests.pop(0)
+                    intended_index = bot_skipped_counts[j]
+                    intended_request = sent_requests[intended_index] if intended_index < len(sent_requests) else None
+                    bot_skipped_counts[j] += 1
+                    if _is_same_request(played_request, intended_request):
                         statistics["correct_future_requests"] += 1
                     else:
                         statistics["incorrect_future_requests"] += 1
-                else:
+
+                if is_skipped:
                     statistics["skipped_ticks"] += 1
                     if print_skipped_tick_info:
                         print(f"INFO: Skipping tick: {game.tick}")
+                else:
+                    statistics["future_requests_used"] += 1
 
             last_updates.extend(update_group["updates"])
             game.external_step(update_group["updates"])
             if game.tick != update_group["tick"]:
                 raise AssertionError("FATAL ERROR: Tick update was missed")
 
+        for j, (bot, runtime) in enumerate(zip(bots, runtimes)):
+            skipped_count = bot_skipped_counts[j]
+            bot_pending_requests[j] = bot_sent_requests[j][skipped_count + 1:]  # the next one was played last tick
+            if runtime is None:
+                # enqueued requests were either played or replaced by the future requests
+                # (the threaded runtime forgets them by itself)
+                del bot._update_requests[:min(skipped_count, bot_queued_counts[j])]
+
+        next_tick_time = update_groups[-1].get("next_tick_time")
+        for bot in bots:
+            bot._tick_clock.register_next_tick_time(next_tick_time)
+
+        time_left = tick_clock.get_time_left()
+        if time_left is not None:
+            if time_left <= 0:
+                statistics["late_updates"] += 1  # the updates came too late because of the lag (future requests help)
+            elif time_left < MIN_THINK_TIME:
+                print(f"WARN: Only {time_left * 1000:.2f}ms left for thinking before deadline of tick {game.tick + 1}")
+
         before_think_time = datetime.datetime.now()
-        current_update_request = bot.pop_update_request(game, last_updates)
-        _future_requests = bot.get_future_requests(current_update_request)
+        player_requests = {}
+        for i, (bot, runtime) in enumerate(zip(bots, runtimes)):
+            if runtime is not None:
+                update_request = runtime.get_requests(game, last_updates)
+            else:
+                current_update_request = bot.pop_update_request(game, last_updates)
+                bot_queued_counts[i] = len(bot._update_requests)
+                update_request = [current_update_request] + bot.get_future_requests(current_update_request)
+
+            player_requests[bot.player_id] = update_request
+            bot_sent_requests[i] = update_request
+            bot_skipped_counts[i] = 0
 
-        update_request = [current_update_request] + _future_requests
-        update_request_str = jsondumps(update_request)
+        if is_multiplexed:
+            update_request_str = jsondumps(player_requests)
+        else:
+            update_request_str = jsondumps(player_requests[bots[0].player_id])
 
         before_send_time = datetime.datetime.now()
         client.send_string(update_request_str)
         before_gc_time = datetime.datetime.now()
+        sent_time = before_gc_time
         gc.collect(generation=0)
         end = datetime.datetime.now()
         duration = (end - start).total_seconds()
-        if (1.0 / TICKS_PER_SECOND) - duration < 0.02:
+        if time_left is not None:
+            late_time = sent_time.timestamp() - tick_clock.get_deadline()
+            if time_left > 0 and late_time > 0:
+                print(f"WARN: Think time: {duration_format(before_think_time, before_send_time)} missed deadline "
+                      f"of tick {game.tick + 1} by {late_time * 1000:.2f}ms.")
+        elif (1.0 / TICKS_PER_SECOND) - duration < 0.02:
             print(
                 f"WARN: Think time: {duration * 1000:.2f}ms at tick: {game.tick}. Before think: {duration_format(start, before_think_time)}, before send: {duration_format(start, before_send_time)}, before gc: {duration_format(start, before_gc_time)}. ")
 
@@ -185,5 +492,27 @@ def _raw_play_remote_game(bot: BotBase, username: str, statistics: defaultdict,
             print(f"Think time: {duration * 1000:.2f}ms")
 
 
+def _is_same_request(request1: Optional[GameUpdateRequest], request2: Optional[GameUpdateRequest]) -> bool:
+    if request1 is None or request2 is None:
+        return request1 is request2
+
+    # the tick stamps differ for the same request created on different ticks
+    fields1 = {name: value for name, value in vars(request1).items() if name != "tick"}
+    fields2 = {name: value for name, value in vars(request2).items() if name != "tick"}
+    return type(request1) is type(request2) and fields1 == fields2
+
+
+def _check_arena_map(map_description: Optional[dict]):
+    if map_description is None:
+        return  # older arena, which does not send the map
+
+    if map_description.get("hash") != ARENA_MAP.hash:
+        print(
+            f"ERROR: Arena is played on map `{map_description.get('name')}` ({map_description.get('hash')}), "
+            f"but the bot uses {ARENA_MAP}. Set ARENA_BULANCI_MAP environment variable to the arena map package."
+        )
+        raise SystemExit()
+
+
 def duration_format(start, end):
     return f"{(end - start).total_seconds() * 1000:.2f}ms"
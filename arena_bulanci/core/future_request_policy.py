@@ -0,0 +1,43 @@
+import math
+from collections import deque
+
+from arena_bulanci.core.config import TICKS_PER_SECOND, MAX_FUTURE_UPDATE_REQUESTS
+
+DEFAULT_FUTURE_REQUEST_COUNT = 5  # used until there are enough observations
+MIN_FUTURE_REQUEST_COUNT = 2
+OBSERVATION_WINDOW = 30 * TICKS_PER_SECOND  # responses
+
+
+class FutureRequestPolicy(object):
+    """
+    Sizes the queue of future requests (sent in advance, in case the next response is late)
+    from the observed roundtrips and skipped ticks of recent responses.
+
+    The queue covers the longest recent run of skipped ticks plus the 95th percentile of the roundtrip (in ticks),
+    so a single slow response doesn't lose a tick while short queues are sent on fast links.
+    """
+
+    def __init__(self, window: int = OBSERVATION_WINDOW):
+        self._roundtrip_ticks = deque(maxlen=window)
+        self._skipped_tick_runs = deque(maxlen=window)
+        self._future_request_count = DEFAULT_FUTURE_REQUEST_COUNT
+
+    @property
+    def future_request_count(self) -> int:
+        return self._future_request_count
+
+    def register_response(self, roundtrip: float, update_group_count: int):
+        """
+        Registers a response of the arena: time since the requests were sent and count of update groups received
+        (every group above the first one is a tick for which the requests came late).
+        """
+        self._roundtrip_ticks.append(roundtrip * TICKS_PER_SECOND)
+        self._skipped_tick_runs.append(max(0, update_group_count - 1))
+
+        if len(self._roundtrip_ticks) < TICKS_PER_SECOND:
+            return  # not enough observations yet
+
+        roundtrip_ticks = sorted(self._roundtrip_ticks)
+        roundtrip_p95 = roundtrip_ticks[int(0.95 * (len(roundtrip_ticks) - 1))]
+        count = max(self._skipped_tick_runs) + math.ceil(roundtrip_p95) + 1
+        self._future_request_count = min(max(count, MIN_FUTURE_REQUEST_COUNT), MAX_FUTURE_UPDATE_REQUESTS)
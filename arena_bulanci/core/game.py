@@ -1,31 +1,47 @@
 import datetime
+import math
 import random
 import sys
 import traceback
+from contextlib import contextmanager
 from copy import deepcopy
-from typing import Dict, List, Tuple, Iterable, Callable, Optional
+from functools import lru_cache
+from typing import Dict, List, Tuple, Iterable, Callable, Optional, Any
+from weakref import WeakKeyDictionary
 
 from arena_bulanci.core.bullet import Bullet
+from arena_bulanci.core.bullet_schedule import BulletSchedule
 from arena_bulanci.core.collision_exception import CollisionException
-from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT, PLAYER_BOX_RADIUS, MIN_RESPAWN_TICK_COUNT, MAX_BULLET_AGE
+from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT, PLAYER_BOX_RADIUS, MIN_RESPAWN_TICK_COUNT, \
+    CACHE_DIR, ARENA_MAP
 from arena_bulanci.core.game_updates.error import ErrorUpdate
 from arena_bulanci.core.game_updates.game_update import GameUpdate
 from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
 from arena_bulanci.core.game_updates.gun_state_change import GunStateChange
 from arena_bulanci.core.game_updates.player_state_change import PlayerStateChange
 from arena_bulanci.core.game_updates.remove_bullet import RemoveBullet
-from arena_bulanci.core.maps.na_dobrou_noc import get_obstacle_boxes
+from arena_bulanci.core.maps.collision_map import CollisionMap
 from arena_bulanci.core.physics.circle_box import CircleBox
 from arena_bulanci.core.physics.segment import Segment
 from arena_bulanci.core.player import Player
 from arena_bulanci.core.utils import distance_sqr
 
-OBSTACLE_BOXES = list(get_obstacle_boxes())
-_UNREACHABLE_POSITIONS: List[Tuple[int, int]] = []
+OBSTACLE_BOXES = [CircleBox((x, y), radius) for x, y, radius in ARENA_MAP.obstacles]
+_COLLISION_MAP: Optional[CollisionMap] = None
+# schedules are kept aside of the games, so they are neither copied nor serialized with them
+_BULLET_SCHEDULES: 'WeakKeyDictionary[Game, BulletSchedule]' = WeakKeyDictionary()
+
+# random positions tried before all the free positions are enumerated
+SPAWN_SAMPLING_ATTEMPTS = 32
 
 
 class Game(object):
-    def __init__(self, verbose=False):
+    # defaults of the attributes missing in games serialized by older arenas
+    _undo_log: Optional[List[Callable[[], None]]] = None
+    _seed: Optional[int] = None
+    _random: Optional[random.Random] = None
+
+    def __init__(self, verbose=False, seed: Optional[int] = None):
         self._tick = 0
         self._players: Dict[str, Player] = {}
         self._dead_players: Dict[str, Tuple[Player, int]] = {}
@@ -35,6 +51,11 @@ class Game(object):
         self._verbose = verbose
         self._tick_subscribers = []
         self._pretick_subscribers = []
+        self._request_subscribers = []
+        self._undo_log = None
+
+        self._seed = seed
+        self._random = None
 
     @property
     def tick(self) -> int:
@@ -44,6 +65,25 @@ class Game(object):
         """
         return self._tick
 
+    @property
+    def seed(self) -> Optional[int]:
+        """
+        Seed of the game random generator (None if the game is not reproducible).
+        """
+        return self._seed
+
+    @property
+    def rng(self) -> random.Random:
+        """
+        Random generator which has to be used for all random choices of the game rules,
+        so that games with the same seed and requests are played exactly the same.
+        NOTE: Game copies don't share the generator.
+        """
+        if self._random is None:
+            self._random = random.Random(self._seed)
+
+        return self._random
+
     @property
     def is_running(self) -> bool:
         """
@@ -66,11 +106,15 @@ class Game(object):
         return list(self._bullets)
 
     @classmethod
-    def get_player_bounding_boxes(cls, position: Tuple[int, int]) -> List[CircleBox]:
+    def get_player_bounding_boxes(cls, position: Tuple[int, int]) -> Tuple[CircleBox, ...]:
         """
         Get bounding boxes of a player as if he were standing on given position
+        (cached per position, they are queried many times every tick)
         """
-        return [CircleBox(position, PLAYER_BOX_RADIUS)]
+        try:
+            return _get_player_bounding_boxes(position)
+        except TypeError:
+            return (CircleBox(tuple(position), PLAYER_BOX_RADIUS),)  # unhashable position
 
     def get_nearest_hit(self, segment: Segment, extra_obstacles: Optional[List[Tuple]] = None) -> Optional[object]:
         """
@@ -94,14 +138,34 @@ class Game(object):
 
         return min(intersections, key=lambda p: distance_sqr(segment.start, p[0]))[1]
 
+    @classmethod
+    def get_collision_map(cls) -> CollisionMap:
+        """
+        Gets compiled collision data of the map (loaded lazily, from the disk cache if possible)
+        """
+        global _COLLISION_MAP
+
+        if _COLLISION_MAP is None:
+            _COLLISION_MAP = CollisionMap.load_or_build(
+                OBSTACLE_BOXES, MAP_WIDTH, MAP_HEIGHT, PLAYER_BOX_RADIUS, cls.would_player_hit_obstacle_on,
+                cache_dir=CACHE_DIR
+            )
+
+        return _COLLISION_MAP
+
     @classmethod
     def get_positions_unreachable_for_players(cls) -> List[Tuple[int, int]]:
         """
         Gets positions which can't be reached by players (due to permanent obstacles)
         """
-        global _UNREACHABLE_POSITIONS
+        return cls.get_collision_map().get_unwalkable_positions()
 
-        return list(_UNREACHABLE_POSITIONS)
+    @classmethod
+    def is_reachable_for_players(cls, position: Tuple[int, int]) -> bool:
+        """
+        Determine if players can stand on given position (with respect to permanent obstacles)
+        """
+        return cls.get_collision_map().is_walkable(position)
 
     @classmethod
     def would_player_hit_obstacle_on(cls, position: Tuple[int, int]):
@@ -183,16 +247,26 @@ class Game(object):
 
         tick_subscribers = self._tick_subscribers
         pretick_subscribers = self._pretick_subscribers
+        request_subscribers = self._request_subscribers
+        undo_log = self._undo_log
+        rng = self._random
         self._tick_subscribers = None
         self._pretick_subscribers = None
+        self._request_subscribers = None
+        self._undo_log = None
+        self._random = None
         try:
             game_copy = deepcopy(self)
         finally:
             self._tick_subscribers = tick_subscribers
             self._pretick_subscribers = pretick_subscribers
+            self._request_subscribers = request_subscribers
+            self._undo_log = undo_log
+            self._random = rng
 
         game_copy._tick_subscribers = None
         game_copy._pretick_subscribers = None
+        game_copy._request_subscribers = None
         game_copy._verbose = None
         game_copy._update_requests = []
 
@@ -217,26 +291,204 @@ class Game(object):
 
         return self.tick - self._dead_players[player_id][1]
 
-    def find_spawn_point(self) -> Tuple[int, int]:
-        while True:
-            point = (random.randint(0, MAP_WIDTH), random.randint(0, MAP_HEIGHT))
-            if self.can_player_step_on(point):
-                return point
+    def find_spawn_point(self, rng: Optional[random.Random] = None) -> Optional[Tuple[int, int]]:
+        """
+        Finds a random reachable position where a player can be spawned (None if all the positions are occupied).
+        Reachable positions are sampled from the collision map (permanent obstacles are never hit),
+        only the players need to be tested. When sampling fails repeatedly (crowded map),
+        a free position is chosen from all the positions which are not occupied by players.
+        """
+        if rng is None:
+            rng = self.rng
+
+        collision_map = self.get_collision_map()
+        if not collision_map.reachable_count:
+            return None
+
+        for _ in range(SPAWN_SAMPLING_ATTEMPTS):
+            position = collision_map.get_reachable_position(rng.randrange(collision_map.reachable_count))
+            if not self._is_occupied_by_player(position):
+                return position
+
+        free_positions = self._get_free_reachable_positions()
+        if not free_positions:
+            return None
+
+        return rng.choice(free_positions)
+
+    def _is_occupied_by_player(self, position: Tuple[int, int]) -> bool:
+        # same test as in can_player_step_on
+        spawn_box = self.get_player_bounding_boxes(position)
+        for player in self._players.values():
+            for box in self.get_player_bounding_boxes(player.position):
+                if box.intersects(spawn_box):
+                    return True
+
+        return False
+
+    def _get_free_reachable_positions(self) -> List[Tuple[int, int]]:
+        collision_map = self.get_collision_map()
+        occupancy_mask = bytearray(MAP_WIDTH * MAP_HEIGHT)
+        reach = math.ceil(2 * PLAYER_BOX_RADIUS)
+        for player in self._players.values():
+            px, py = player.position
+            player_boxes = self.get_player_bounding_boxes(player.position)
+            for x in range(max(0, px - reach), min(MAP_WIDTH, px + reach + 1)):
+                for y in range(max(0, py - reach), min(MAP_HEIGHT, py + reach + 1)):
+                    if any(box.intersects(player_boxes) for box in self.get_player_bounding_boxes((x, y))):
+                        occupancy_mask[x * MAP_HEIGHT + y] = 1
+
+        return [
+            position for position in collision_map.get_reachable_positions()
+            if not occupancy_mask[position[0] * MAP_HEIGHT + position[1]]
+        ]
+
+    def checkpoint(self) -> int:
+        """
+        Starts recording of all changes done by updates (if not recording already).
+        Returns checkpoint which the game can be rolled back to.
+        """
+        if self._undo_log is None:
+            self._undo_log = []
+
+        checkpoint = len(self._undo_log)
+
+        # random choices have to be the same after the rollback
+        random_state = None if self._random is None else self._random.getstate()
+        self._undo_log.append(lambda: self._restore_random_state(random_state))
+        return checkpoint
+
+    def rollback(self, checkpoint: int):
+        """
+        Reverts all changes done since the checkpoint.
+        Rolling back to the first checkpoint stops the recording.
+        """
+        if self._undo_log is None:
+            raise AssertionError("There is no checkpoint to roll back to")
+
+        while len(self._undo_log) > checkpoint:
+            self._undo_log.pop()()
+
+        if checkpoint == 0:
+            self._undo_log = None
+
+    def commit(self, checkpoint: int):
+        """
+        Keeps all changes done since the checkpoint.
+        Committing the first checkpoint stops the recording, otherwise the changes are still recorded
+        for rolling back to the outer checkpoints.
+        """
+        if self._undo_log is None:
+            raise AssertionError("There is no checkpoint to commit")
+
+        if checkpoint == 0:
+            self._undo_log = None
+
+    @contextmanager
+    def fork(self):
+        """
+        Context in which the game can be changed (e.g. by simulate_step) and which reverts all the changes on exit.
+        This is much cheaper than copying the game for lookahead searches.
+        """
+        checkpoint = self.checkpoint()
+        try:
+            yield self
+        finally:
+            self.rollback(checkpoint)
+
+    def _restore_random_state(self, random_state: Optional[tuple]):
+        if random_state is None:
+            self._random = None
+        else:
+            self.rng.setstate(random_state)
+
+    def _record_undo(self, undo: Callable[[], None]):
+        if self._undo_log is not None:
+            self._undo_log.append(undo)
+
+    def _set_attribute(self, obj: Any, name: str, value: Any):
+        """
+        Sets attribute of a game object, so that the change can be rolled back.
+        """
+        if self._undo_log is not None:
+            if hasattr(obj, name):
+                old_value = getattr(obj, name)
+                self._undo_log.append(lambda: setattr(obj, name, old_value))
+            else:
+                self._undo_log.append(lambda: delattr(obj, name))
+
+        setattr(obj, name, value)
+
+    def _get_bullet_schedule(self) -> BulletSchedule:
+        schedule = _BULLET_SCHEDULES.get(self)
+        if schedule is None:
+            schedule = _BULLET_SCHEDULES[self] = BulletSchedule(OBSTACLE_BOXES)
+
+        return schedule
+
+    def _add_bullet(self, bullet: Bullet):
+        schedule = self._get_bullet_schedule()
+        self._bullets.append(bullet)
+        schedule.register(bullet)
+
+        def _undo_add():
+            self._bullets.pop()
+            schedule.unregister(bullet)
+
+        self._record_undo(_undo_add)
+
+    def _remove_bullet(self, bullet_id: str):
+        schedule = self._get_bullet_schedule()
+        bullets = self._bullets
+        bullet = schedule.find(bullet_id)
+        try:
+            i = bullets.index(bullet)  # bullets are compared by identity
+        except ValueError:
+            # bullets added directly to the list (e.g. by deserialization) are not indexed
+            i = next((i for i, candidate in enumerate(bullets) if candidate.id == bullet_id), None)
+            if i is None:
+                return
+
+            bullet = bullets[i]
+
+        del bullets[i]
+        impact = schedule.unregister(bullet)
+
+        def _undo_remove():
+            bullets.insert(i, bullet)
+            if impact is not None:
+                schedule.register(bullet, impact)
+
+        self._record_undo(_undo_remove)
 
     def _spawn_player(self, player_id: str):
         if player_id in self._dead_players:
-            player, _ = self._dead_players.pop(player_id)
+            dead_index = list(self._dead_players).index(player_id)
+            dead_entry = self._dead_players.pop(player_id)
+            self._record_undo(lambda: _insert_at(self._dead_players, dead_index, player_id, dead_entry))
+
+            player = dead_entry[0]
             if player.gun.ammo_count == 0:
-                player.gun._cooldown_start = self.tick
+                self._set_attribute(player.gun, "_cooldown_start", self.tick)
         else:
             player = Player(player_id)
 
         self._players[player.id] = player
+        self._record_undo(lambda: self._players.pop(player.id))
 
     def _kill_player(self, player_id: str):
-        killed_player = self._players.pop(player_id, None)
-        if killed_player:
-            self._dead_players[player_id] = killed_player, self.tick
+        if player_id not in self._players:
+            return
+
+        player_index = list(self._players).index(player_id)
+        killed_player = self._players.pop(player_id)
+        self._dead_players[player_id] = killed_player, self.tick
+
+        def _undo_kill():
+            self._dead_players.pop(player_id)
+            _insert_at(self._players, player_index, player_id, killed_player)
+
+        self._record_undo(_undo_kill)
 
     def _get_cron_updates(self) -> List[GameUpdate]:
         result = []
@@ -245,21 +497,54 @@ class Game(object):
             if gun.can_reload(self):
                 result.append(GunStateChange(player.id, new_ammo_count=gun.full_ammo_count))
 
-        for bullet in self._bullets:
-            bullet_age = self.tick - bullet.start_tick
-            trajectory = bullet.get_current_trajectory(self)
-            hit = self.get_nearest_hit(trajectory)
+        if not self._bullets:
+            return result
 
-            hit_player_id = None
-            if isinstance(hit, Player):
-                hit_player_id = hit.id
-                result.append(PlayerStateChange(hit_player_id, is_alive=False))
+        # obstacle hits and ages are scheduled, only hits of players are tested every tick
+        # (the same as get_nearest_hit would do, players are preferred in case of same distance as obstacles)
+        schedule = self._get_bullet_schedule()
+        impacts = [schedule.get_impact(bullet) for bullet in self._bullets]
+        removed_bullet_ids = schedule.pop_removals(self.tick)
+        if removed_bullet_ids:
+            self._record_undo(lambda: schedule.reschedule_removals(removed_bullet_ids))
+
+        for bullet, impact in zip(self._bullets, impacts):
+            trajectory = bullet.get_current_trajectory(self)
+            obstacle_distance_sqr = impact.obstacle_distance_sqr if impact.obstacle_tick == self.tick else None
+            hit_player = self._get_nearest_player_hit(trajectory, obstacle_distance_sqr)
 
-            if hit is not None or bullet_age > MAX_BULLET_AGE:
-                result.append(RemoveBullet(bullet.id, hit_player_id, bullet.reward_receiver_id))
+            if hit_player is not None:
+                result.append(PlayerStateChange(hit_player.id, is_alive=False))
+                result.append(RemoveBullet(bullet.id, hit_player.id, bullet.reward_receiver_id))
+            elif bullet.id in removed_bullet_ids:
+                result.append(RemoveBullet(bullet.id, None, bullet.reward_receiver_id))
 
         return result
 
+    def _get_nearest_player_hit(self, segment: Segment, max_distance_sqr: Optional[float]) -> Optional[Player]:
+        """
+        Gets player nearest to the segment start which is hit by the segment (not farther than max_distance_sqr).
+        """
+        start, end = segment.start, segment.end
+        nearest_player = None
+        for player in self._players.values():
+            for box in self.get_player_bounding_boxes(player.position):
+                if not box.may_intersect_segment(start, end):
+                    continue
+
+                for intersection in box.intersection_points_with_segment(start, end):
+                    hit_distance_sqr = distance_sqr(start, intersection)
+                    if nearest_player is None:
+                        is_nearer = max_distance_sqr is None or hit_distance_sqr <= max_distance_sqr
+                    else:
+                        is_nearer = hit_distance_sqr < max_distance_sqr
+
+                    if is_nearer:
+                        nearest_player = player
+                        max_distance_sqr = hit_distance_sqr
+
+        return nearest_player
+
     def get_all_bounding_boxes(self) -> Iterable[Tuple]:
         for player in self._players.values():
             for box in self.get_player_bounding_boxes(player.position):
@@ -274,18 +559,50 @@ class Game(object):
     def subscribe_preticks(self, subscriber: Callable):
         self._pretick_subscribers.append(subscriber)
 
+    def subscribe_requests(self, subscriber: Callable[[List[GameUpdateRequest]], None]):
+        """
+        Subscribes to all requests processed by each step (e.g. for recording of the match).
+        """
+        self._request_subscribers.append(subscriber)
+
     def accept(self, update_requests: List[GameUpdateRequest]):
         self._update_requests.extend(update_requests)
 
-    def step(self, catch_exceptions=True) -> List[GameUpdate]:
+    def step(self, catch_exceptions=True, report_errors=True) -> List[GameUpdate]:
         for pretick_subscriber in self._pretick_subscribers:
             pretick_subscriber()
 
         tick_start = datetime.datetime.now()
-        verified_updates = []
         requests = self._update_requests
         self._update_requests = []
+        for request_subscriber in self._request_subscribers:
+            request_subscriber(requests)
+
+        verified_updates = self._process_tick(requests, catch_exceptions=catch_exceptions, report_errors=report_errors)
+
+        tick_end = datetime.datetime.now()
+        if self._verbose:
+            tick_duration = (tick_end - tick_start).total_seconds() * 1000
+            print(f"TICK {self.tick} {tick_duration:.2f}ms ")
+            for update in verified_updates:
+                print(update)
+
+        for subscriber in self._tick_subscribers:
+            subscriber(verified_updates)
+
+        return verified_updates
+
+    def simulate_step(self, update_requests: List[GameUpdateRequest]) -> List[GameUpdate]:
+        """
+        Steps a hypothetical tick with given requests (including bullet hits, reloads, etc.).
+        Subscribers are not notified and errors are not reported.
+        Use together with fork() or checkpoint()/rollback() to revert the changes.
+        """
+        return self._process_tick(update_requests, catch_exceptions=True, report_errors=False)
 
+    def _process_tick(self, requests: List[GameUpdateRequest], catch_exceptions: bool,
+                      report_errors: bool = True) -> List[GameUpdate]:
+        verified_updates = []
         already_requesting_players = set()
         for update_request in requests:
             player_id = None
@@ -297,7 +614,7 @@ class Game(object):
 
                 updates = update_request.create_updates(self)
             except CollisionException:
-                if self._verbose:
+                if self._verbose and report_errors:
                     print(f"Collision on `{update_request}`")
 
                 continue  # collisions are expected
@@ -308,7 +625,8 @@ class Game(object):
                     if not catch_exceptions:
                         raise e
 
-                    print(msg)
+                    if report_errors:
+                        print(msg)
                 except:
                     print(f"ERROR: {player_id} {repr(e)}")
                     traceback.print_exc()
@@ -323,24 +641,14 @@ class Game(object):
             update.apply_on(self)
             verified_updates.append(update)
 
-        self._tick += 1
-        tick_end = datetime.datetime.now()
-        if self._verbose:
-            tick_duration = (tick_end - tick_start).total_seconds() * 1000
-            print(f"TICK {self.tick} {tick_duration:.2f}ms ")
-            for update in verified_updates:
-                print(update)
-
-        for subscriber in self._tick_subscribers:
-            subscriber(verified_updates)
-
+        self._set_attribute(self, "_tick", self._tick + 1)
         return verified_updates
 
     def external_step(self, updates: List[GameUpdate]):
         for update in updates:
             update.apply_on(self)
 
-        self._tick += 1
+        self._set_attribute(self, "_tick", self._tick + 1)
 
         for subscriber in self._tick_subscribers:
             subscriber(updates)
@@ -354,8 +662,15 @@ class Game(object):
         return True
 
 
-for x in range(MAP_WIDTH):
-    for y in range(MAP_HEIGHT):
-        position = (x, y)
-        if Game.would_player_hit_obstacle_on(position):
-            _UNREACHABLE_POSITIONS.append(position)
+@lru_cache(maxsize=MAP_WIDTH * MAP_HEIGHT)
+def _get_player_bounding_boxes(position: Tuple[int, int]) -> Tuple[CircleBox, ...]:
+    # the boxes are shared by all the callers, so they are immutable
+    return (CircleBox(position, PLAYER_BOX_RADIUS),)
+
+
+def _insert_at(dictionary: Dict[str, Any], index: int, key: str, value: Any):
+    # keeps order of the items, so the game behaves exactly the same after a rollback
+    items = list(dictionary.items())
+    items.insert(index, (key, value))
+    dictionary.clear()
+    dictionary.update(items)
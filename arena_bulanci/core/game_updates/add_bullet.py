@@ -5,6 +5,8 @@ from arena_bulanci.core.game_updates.game_update import GameUpdate
 
 
 class AddBullet(GameUpdate):
+    __slots__ = ("_bullet_id", "_position", "_direction_coords", "_reward_receiver")
+
     def __init__(self, bullet_id: str,
                  position: Tuple[int, int], direction_coords: Tuple[float, float], reward_receiver: str):
         self._bullet_id = bullet_id
@@ -13,7 +15,7 @@ class AddBullet(GameUpdate):
         self._reward_receiver = reward_receiver
 
     def apply_on(self, game: 'Game'):
-        game._bullets.append(Bullet(
+        game._add_bullet(Bullet(
             self._bullet_id, game.tick, self._position, self._direction_coords, reward_receiver_id=self._reward_receiver
         ))
 
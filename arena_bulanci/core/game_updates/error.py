@@ -2,6 +2,8 @@ from arena_bulanci.core.game_updates.game_update import GameUpdate
 
 
 class ErrorUpdate(GameUpdate):
+    __slots__ = ("_player_id", "error")
+
     def __init__(self, player_id, error):
         self._player_id = player_id
         self.error = error
@@ -1,4 +1,6 @@
 class GameUpdate(object):
+    __slots__ = ()  # updates are created in every tick, subclasses declare their slots too
+
     def apply_on(self, game: 'Game'):
         """
         Applies changes to the game, without any validations.
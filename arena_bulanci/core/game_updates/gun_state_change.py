@@ -5,6 +5,8 @@ from arena_bulanci.core.utils import has
 
 
 class GunStateChange(GameUpdate):
+    __slots__ = ("player_id", "_new_ammo_count")
+
     def __init__(self, player_id: str, new_ammo_count: Optional[int] = None):
         self.player_id = player_id
 
@@ -14,9 +16,9 @@ class GunStateChange(GameUpdate):
         if has(self._new_ammo_count):
             player = game.get_player(self.player_id)
             if player.gun.ammo_count > self._new_ammo_count:
-                player.gun._cooldown_start = game.tick
+                game._set_attribute(player.gun, "_cooldown_start", game.tick)
 
-            player.gun.ammo_count = self._new_ammo_count
+            game._set_attribute(player.gun, "ammo_count", self._new_ammo_count)
 
     def __repr__(self):
         result = f"gun_change({self.player_id}):"
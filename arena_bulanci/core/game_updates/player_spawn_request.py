@@ -1,4 +1,3 @@
-import random
 from typing import List, Optional, Tuple
 
 from arena_bulanci.core.game_updates.game_update import GameUpdate
@@ -25,7 +24,10 @@ class PlayerSpawnRequest(PlayerUpdateRequest):
                 raise ValueError(f"color: {c}")
 
         position = game.find_spawn_point()
-        direction = random.choice(range(len(DIRECTION_DEFINITIONS)))
+        if position is None:
+            raise ValueError("There is no free position to spawn the player")
+
+        direction = game.rng.choice(range(len(DIRECTION_DEFINITIONS)))
         return [PlayerStateChange(
             self.player_id,
             new_position=position,
@@ -5,6 +5,8 @@ from arena_bulanci.core.utils import has
 
 
 class PlayerStateChange(GameUpdate):
+    __slots__ = ("player_id", "_new_position", "_new_direction", "_new_color", "_is_alive")
+
     def __init__(self, player_id: str,
                  new_position: Optional[Tuple[int, int]] = None,
                  new_direction: Optional[int] = None,
@@ -31,13 +33,13 @@ class PlayerStateChange(GameUpdate):
 
         player = game.get_player(self.player_id)
         if has(self._new_position):
-            player.position = self._new_position
+            game._set_attribute(player, "position", self._new_position)
 
         if has(self._new_direction):
-            player.direction = self._new_direction
+            game._set_attribute(player, "_direction", self._new_direction)
 
         if has(self._new_color):
-            player.color = self._new_color
+            game._set_attribute(player, "color", self._new_color)
 
     def __repr__(self):
         result = f"change({self.player_id}):"
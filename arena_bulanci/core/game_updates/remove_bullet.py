@@ -4,16 +4,15 @@ from arena_bulanci.core.game_updates.game_update import GameUpdate
 
 
 class RemoveBullet(GameUpdate):
+    __slots__ = ("_bullet_id", "hit_player_id", "reward_receiver_id")
+
     def __init__(self, bullet_id: str, hit_player_id: Optional[str], reward_receiver_id: Optional[str]):
         self._bullet_id = bullet_id
         self.hit_player_id = hit_player_id
         self.reward_receiver_id = reward_receiver_id
 
     def apply_on(self, game: 'Game'):
-        for i in range(len(game._bullets)):
-            if game._bullets[i].id == self._bullet_id:
-                del game._bullets[i]
-                return
+        game._remove_bullet(self._bullet_id)
 
     def __repr__(self):
         return f"remove_bulet: {self._bullet_id}"
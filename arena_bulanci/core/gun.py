@@ -1,7 +1,11 @@
 from typing import Optional
 
+from arena_bulanci.core.utils import copy_slots
+
 
 class Gun(object):
+    __slots__ = ("id", "full_ammo_count", "reload_time", "cooldown_time", "ammo_count", "_cooldown_start")
+
     def __init__(self, id: str, full_ammo_count: int, cooldown_time: int, reload_time: Optional[int]):
         self.id = id
         self.full_ammo_count = full_ammo_count
@@ -11,6 +15,9 @@ class Gun(object):
 
         self._cooldown_start = None
 
+    def __deepcopy__(self, memo):
+        return copy_slots(self, memo)  # all the values are immutable
+
     @property
     def cooldown_start(self):
         return self._cooldown_start
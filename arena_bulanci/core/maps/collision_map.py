@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import sys
+from array import array
+from typing import List, Tuple, Callable, Optional, FrozenSet
+
+from arena_bulanci.core.physics.circle_box import CircleBox
+
+# has to be increased whenever the artifact content or the collision rules change
+COLLISION_MAP_FORMAT_VERSION = 1
+
+
+class CollisionMap(object):
+    """
+    Compiled collision data of a map (with respect to permanent obstacles only):
+    - walkability bitmap of all positions (bit per position, x-major order)
+    - reachable positions, i.e. walkable positions of the largest connected area (where players can spawn)
+      together with index of each reachable position in the list
+
+    Computing the data is expensive, so it is cached on disk (keyed by hash of the map content).
+    """
+
+    def __init__(self, map_hash: str, width: int, height: int, walkable_bits: bytes, reachable_indexes: array):
+        self.map_hash = map_hash
+        self.width = width
+        self.height = height
+
+        self._walkable_bits = walkable_bits
+        self._reachable_indexes = reachable_indexes
+        self._reachable_lookup = None
+        self._walkable_positions: Optional[FrozenSet[Tuple[int, int]]] = None
+
+    @classmethod
+    def compute_hash(cls, obstacle_boxes: List[CircleBox], width: int, height: int, player_radius: float) -> str:
+        content = json.dumps([
+            COLLISION_MAP_FORMAT_VERSION, width, height, player_radius,
+            [[box.center[0], box.center[1], box.radius] for box in obstacle_boxes]
+        ])
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def load_or_build(cls, obstacle_boxes: List[CircleBox], width: int, height: int, player_radius: float,
+                      is_colliding: Callable[[Tuple[int, int]], bool],
+                      cache_dir: Optional[str] = None) -> 'CollisionMap':
+        """
+        Loads the collision map from the disk cache, builds (and caches) it if not available.
+        """
+        map_hash = cls.compute_hash(obstacle_boxes, width, height, player_radius)
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = os.path.join(cache_dir, f"collision_map_{map_hash}.bin")
+            collision_map = cls.load(cache_path, map_hash)
+            if collision_map is not None:
+                return collision_map
+
+        collision_map = cls.build(map_hash, width, height, is_colliding)
+        if cache_path is not None:
+            try:
+                collision_map.save(cache_path)
+            except OSError as e:
+                print(f"INFO: Collision map cache can't be written: {repr(e)}")
+
+        return collision_map
+
+    @classmethod
+    def build(cls, map_hash: str, width: int, height: int,
+              is_colliding: Callable[[Tuple[int, int]], bool]) -> 'CollisionMap':
+        walkable_bits = bytearray((width * height + 7) // 8)
+        for x in range(width):
+            for y in range(height):
+                if not is_colliding((x, y)):
+                    index = x * height + y
+                    walkable_bits[index >> 3] |= 0x80 >> (index & 7)
+
+        collision_map = CollisionMap(map_hash, width, height, bytes(walkable_bits), array("i"))
+        collision_map._reachable_indexes = collision_map._find_largest_area()
+        return collision_map
+
+    @classmethod
+    def load(cls, path: str, map_hash: str) -> Optional['CollisionMap']:
+        """
+        Loads collision map saved by `save`, None is returned if the file is missing or not compatible.
+        """
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline().decode("utf-8"))
+                if header.get("hash") != map_hash or header.get("byteorder") != sys.byteorder:
+                    return None
+
+                width, height = header["width"], header["height"]
+                walkable_bits = f.read((width * height + 7) // 8)
+                reachable_indexes = array("i")
+                reachable_indexes.frombytes(f.read(header["reachable_count"] * reachable_indexes.itemsize))
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if len(reachable_indexes) != header["reachable_count"]:
+            return None  # truncated file
+
+        return CollisionMap(map_hash, width, height, walkable_bits, reachable_indexes)
+
+    def save(self, path: str):
+        header = {
+            "hash": self.map_hash,
+            "width": self.width,
+            "height": self.height,
+            "byteorder": sys.byteorder,
+            "reachable_count": len(self._reachable_indexes),
+        }
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self._walkable_bits)
+            f.write(self._reachable_indexes.tobytes())
+
+        # other processes can load the cache concurrently, so the file is replaced atomically
+        os.replace(tmp_path, path)
+
+    @property
+    def walkable_bits(self) -> bytes:
+        """
+        Walkability bitmap, bit of position (x, y) has index x * height + y (most significant bit first).
+        """
+        return self._walkable_bits
+
+    @property
+    def walkable_positions(self) -> FrozenSet[Tuple[int, int]]:
+        """
+        Set of all walkable positions, intended for hot loops (membership test is faster than is_walkable).
+        """
+        if self._walkable_positions is None:
+            self._walkable_positions = frozenset(
+                (x, y) for x in range(self.width) for y in range(self.height) if self.is_walkable((x, y))
+            )
+
+        return self._walkable_positions
+
+    @property
+    def reachable_count(self) -> int:
+        return len(self._reachable_indexes)
+
+    def is_walkable(self, position: Tuple[int, int]) -> bool:
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+
+        index = x * self.height + y
+        return bool(self._walkable_bits[index >> 3] & (0x80 >> (index & 7)))
+
+    def get_reachable_position(self, reachable_index: int) -> Tuple[int, int]:
+        return divmod(self._reachable_indexes[reachable_index], self.height)
+
+    def get_reachable_index(self, position: Tuple[int, int]) -> Optional[int]:
+        """
+        Gets index of the position in reachable positions (None if the position is not reachable).
+        """
+        if self._reachable_lookup is None:
+            self._reachable_lookup = {index: i for i, index in enumerate(self._reachable_indexes)}
+
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+
+        return self._reachable_lookup.get(x * self.height + y)
+
+    def get_reachable_positions(self) -> List[Tuple[int, int]]:
+        return [divmod(index, self.height) for index in self._reachable_indexes]
+
+    def get_unwalkable_positions(self) -> List[Tuple[int, int]]:
+        return [(x, y) for x in range(self.width) for y in range(self.height) if not self.is_walkable((x, y))]
+
+    def _find_largest_area(self) -> array:
+        visited = set()
+        largest_area = []
+        for start in range(self.width * self.height):
+            if start in visited or not self.is_walkable(divmod(start, self.height)):
+                continue
+
+            area = [start]
+            visited.add(start)
+            for index in area:
+                x, y = divmod(index, self.height)
+                for neighbour in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    neighbour_index = neighbour[0] * self.height + neighbour[1]
+                    if neighbour_index not in visited and self.is_walkable(neighbour):
+                        visited.add(neighbour_index)
+                        area.append(neighbour_index)
+
+            if len(area) > len(largest_area):
+                largest_area = area
+
+        return array("i", sorted(largest_area))
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+from typing import List, Tuple, Optional, Dict, Any
+
+MAPS_DIR = os.path.dirname(os.path.abspath(__file__))
+MAP_DESCRIPTION_FILE = "map.json"
+DEFAULT_MAP = "na_dobrou_noc"
+
+
+class MapPackage(object):
+    """
+    Map stored as a directory with `map.json` description (dimensions, obstacle circles, background images)
+    and the image files. Everything map related (collisions, rendering in the browser) is derived from it.
+    """
+
+    def __init__(self, name: str, width: int, height: int, obstacles: List[Tuple[float, float, float]],
+                 background: Optional[str] = None, background_mask: Optional[str] = None,
+                 directory: Optional[str] = None):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.obstacles = obstacles
+        self.background = background
+        self.background_mask = background_mask
+        self.directory = directory
+
+        self.hash = self._compute_hash()
+
+    @classmethod
+    def load(cls, name_or_path: str) -> 'MapPackage':
+        """
+        Loads map package given by name (of a map shipped in maps directory) or by path to a package directory.
+        """
+        directory = name_or_path
+        if not os.path.isdir(directory):
+            directory = os.path.join(MAPS_DIR, name_or_path)
+
+        description_path = os.path.join(directory, MAP_DESCRIPTION_FILE)
+        if not os.path.isfile(description_path):
+            raise ValueError(f"Map package `{name_or_path}` was not found (expected {description_path})")
+
+        with open(description_path, "r") as f:
+            description = json.load(f)
+
+        return cls.from_description(description, directory)
+
+    @classmethod
+    def from_description(cls, description: Dict[str, Any], directory: Optional[str] = None) -> 'MapPackage':
+        try:
+            obstacles = [(float(x), float(y), float(radius)) for x, y, radius in description["obstacles"]]
+            return MapPackage(
+                description["name"], int(description["width"]), int(description["height"]), obstacles,
+                background=description.get("background"), background_mask=description.get("background_mask"),
+                directory=directory
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid map description: {repr(e)}")
+
+    def get_description(self) -> Dict[str, Any]:
+        """
+        Gets JSON serializable description of the map (as stored in map.json, together with its hash).
+        """
+        return {
+            "name": self.name,
+            "width": self.width,
+            "height": self.height,
+            "background": self.background,
+            "background_mask": self.background_mask,
+            "obstacles": [list(obstacle) for obstacle in self.obstacles],
+            "hash": self.hash,
+        }
+
+    def get_file_path(self, file_name: str) -> Optional[str]:
+        """
+        Gets path of a file (e.g. background image) of the package, None if the file is not part of the package.
+        """
+        if self.directory is None or file_name not in (self.background, self.background_mask):
+            return None
+
+        return os.path.join(self.directory, file_name)
+
+    def _compute_hash(self) -> str:
+        # only the content affecting game rules is hashed (images can differ between clients)
+        content = json.dumps([self.width, self.height, [list(obstacle) for obstacle in self.obstacles]])
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+    def __repr__(self):
+        return f"map({self.name}): {self.width}x{self.height}, obstacles = {len(self.obstacles)}, hash = {self.hash}"
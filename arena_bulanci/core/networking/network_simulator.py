@@ -0,0 +1,181 @@
+import argparse
+import random
+import socket
+import time
+from queue import Queue
+from threading import Thread, Lock
+from typing import Optional
+
+CHUNK_SIZE = 64 * 1024
+
+
+class NetworkConditions(object):
+    """
+    Conditions of a simulated link (the same for both directions).
+    :param latency: one way delay in seconds
+    :param jitter: random extra delay in seconds (uniformly distributed, data is never reordered)
+    :param bandwidth: bytes per second, None for unlimited
+    :param stall_interval: mean time in seconds between stalls of the link, None for no stalls
+    :param stall_duration: time in seconds for which a stalled link delivers nothing
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, bandwidth: Optional[float] = None,
+                 stall_interval: Optional[float] = None, stall_duration: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.stall_interval = stall_interval
+        self.stall_duration = stall_duration
+
+    def __repr__(self):
+        bandwidth = "unlimited" if self.bandwidth is None else f"{self.bandwidth}B/s"
+        stalls = "no stalls" if self.stall_interval is None else \
+            f"stalls = {self.stall_duration * 1000:.0f}ms every {self.stall_interval}s"
+        return f"latency = {self.latency * 1000:.0f}ms, jitter = {self.jitter * 1000:.0f}ms, " \
+               f"bandwidth = {bandwidth}, {stalls}"
+
+
+class _SimulatedLink(object):
+    """
+    Forwards data from source to target socket, delayed according to the network conditions.
+    """
+
+    def __init__(self, source: socket.socket, target: socket.socket, conditions: NetworkConditions,
+                 rng: random.Random):
+        self._source = source
+        self._target = target
+        self._conditions = conditions
+        self._random = rng
+
+        self._chunks = Queue()
+        self._link_free_time = 0.0
+        self._last_delivery_time = 0.0
+        self._next_stall_time = self._sample_next_stall(time.perf_counter())
+
+    def start(self):
+        Thread(target=self._receive_worker, daemon=True).start()
+        Thread(target=self._deliver_worker, daemon=True).start()
+
+    def _receive_worker(self):
+        try:
+            while True:
+                data = self._source.recv(CHUNK_SIZE)
+                if not data:
+                    break
+
+                self._chunks.put((self._get_delivery_time(len(data)), data))
+        except OSError:
+            pass  # connection closed
+
+        self._chunks.put((self._last_delivery_time, None))
+
+    def _deliver_worker(self):
+        try:
+            while True:
+                delivery_time, data = self._chunks.get()
+                delay = delivery_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+                if data is None:
+                    break
+
+                self._target.sendall(data)
+        except OSError:
+            pass  # connection closed
+
+        for s in (self._source, self._target):
+            try:
+                s.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _get_delivery_time(self, size: int) -> float:
+        conditions = self._conditions
+        now = time.perf_counter()
+
+        send_time = max(now, self._link_free_time)
+        if self._next_stall_time is not None and send_time >= self._next_stall_time:
+            send_time += conditions.stall_duration
+            self._next_stall_time = self._sample_next_stall(send_time)
+
+        if conditions.bandwidth:
+            send_time += size / conditions.bandwidth
+
+        self._link_free_time = send_time
+        delivery_time = send_time + conditions.latency + self._random.uniform(0, conditions.jitter)
+
+        # TCP keeps order of the data
+        self._last_delivery_time = max(self._last_delivery_time, delivery_time)
+        return self._last_delivery_time
+
+    def _sample_next_stall(self, now: float) -> Optional[float]:
+        if not self._conditions.stall_interval:
+            return None
+
+        return now + self._random.expovariate(1.0 / self._conditions.stall_interval)
+
+
+class NetworkSimulatorProxy(object):
+    """
+    TCP proxy which simulates given network conditions between clients and the target server.
+    Useful for testing latency hiding (future requests) of bots without a remote arena.
+    """
+
+    def __init__(self, port: int, target_host: str, target_port: int, conditions: NetworkConditions,
+                 seed: Optional[int] = None):
+        self.port = port
+        self._target_host = target_host
+        self._target_port = target_port
+        self._conditions = conditions
+        self._random = random.Random(seed)
+        self._L_random = Lock()
+
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(("127.0.0.1", port))
+        self._listener.listen()
+
+    def start(self):
+        print(f"NETWORK SIMULATOR ON PORT={self.port} -> {self._target_host}:{self._target_port}: {self._conditions}")
+        Thread(target=self._accept_worker, daemon=True).start()
+
+    def _accept_worker(self):
+        while True:
+            client_socket, _ = self._listener.accept()
+            try:
+                server_socket = socket.create_connection((self._target_host, self._target_port))
+            except OSError as e:
+                print(f"WARN: Network simulator can't connect to the target: {repr(e)}")
+                client_socket.close()
+                continue
+
+            for s in (client_socket, server_socket):
+                s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            with self._L_random:
+                uplink_random = random.Random(self._random.random())
+                downlink_random = random.Random(self._random.random())
+
+            _SimulatedLink(client_socket, server_socket, self._conditions, uplink_random).start()
+            _SimulatedLink(server_socket, client_socket, self._conditions, downlink_random).start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Proxy simulating network conditions between bots and an arena.")
+    parser.add_argument("port", type=int, help="port where the bots connect to (see arena_port_override)")
+    parser.add_argument("target", help="host:port of the arena raw updates")
+    parser.add_argument("--latency", type=float, default=0.05, help="one way latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="seconds")
+    parser.add_argument("--bandwidth", type=float, default=None, help="bytes per second")
+    parser.add_argument("--stall-interval", type=float, default=None, help="mean seconds between link stalls")
+    parser.add_argument("--stall-duration", type=float, default=0.3, help="seconds")
+    args = parser.parse_args()
+
+    host, target_port = args.target.rsplit(":", 1)
+    proxy = NetworkSimulatorProxy(args.port, host, int(target_port), NetworkConditions(
+        args.latency, args.jitter, args.bandwidth, args.stall_interval, args.stall_duration
+    ))
+    proxy.start()
+    while True:
+        time.sleep(1)
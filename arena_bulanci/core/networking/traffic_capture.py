@@ -0,0 +1,56 @@
+import json
+import time
+from collections import defaultdict
+from threading import Lock
+from typing import Dict, List, Tuple
+
+TRAFFIC_CAPTURE_FORMAT_VERSION = 1
+
+
+class TrafficCapture(object):
+    """
+    Records request streams of connected clients (one JSON line per received message).
+    Each message is stored together with the client response time, i.e. time since the updates were sent to the client,
+    so the streams can be replayed with the original timing (see load_test).
+    """
+
+    def __init__(self, path: str):
+        self._L_file = Lock()
+        self._start = time.perf_counter()
+        self._file = open(path, "w")
+        self._file.write(json.dumps({"version": TRAFFIC_CAPTURE_FORMAT_VERSION}) + "\n")
+
+    def record(self, player_id: str, tick: int, response_time: float, message: str):
+        line = json.dumps({
+            "time": time.perf_counter() - self._start,
+            "player_id": player_id,
+            "tick": tick,
+            "response_time": response_time,
+            "message": message
+        }) + "\n"
+
+        with self._L_file:
+            if not self._file.closed:
+                self._file.write(line)
+                self._file.flush()
+
+    def close(self):
+        with self._L_file:
+            self._file.close()
+
+
+def load_traffic(path: str) -> Dict[str, List[Tuple[float, str]]]:
+    """
+    Loads captured request streams as player_id -> [(response time, message)].
+    """
+    streams = defaultdict(list)
+    with open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != TRAFFIC_CAPTURE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported traffic capture version: {header.get('version')}")
+
+        for line in f:
+            record = json.loads(line)
+            streams[record["player_id"]].append((record["response_time"], record["message"]))
+
+    return dict(streams)
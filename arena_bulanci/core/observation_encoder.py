@@ -0,0 +1,179 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.game_updates.game_update import GameUpdate
+from arena_bulanci.core.game_updates.gun_state_change import GunStateChange
+from arena_bulanci.core.game_updates.player_state_change import PlayerStateChange
+from arena_bulanci.core.physics.static_map import get_obstacle_mask
+from arena_bulanci.core.player import Player
+from arena_bulanci.core.utils import DIRECTIONS, is_in_map
+
+OBSTACLE_CHANNEL = 0
+PLAYER_CHANNEL = 1
+PLAYER_DIRECTION_CHANNELS = [2 + direction for direction in DIRECTIONS]
+PLAYER_AMMO_CHANNEL = PLAYER_DIRECTION_CHANNELS[-1] + 1
+PLAYER_CAN_SHOOT_CHANNEL = PLAYER_AMMO_CHANNEL + 1
+BULLET_CHANNEL = PLAYER_CAN_SHOOT_CHANNEL + 1
+BULLET_DIRECTION_CHANNELS = [BULLET_CHANNEL + 1 + direction for direction in DIRECTIONS]
+CHANNEL_COUNT = BULLET_DIRECTION_CHANNELS[-1] + 1
+
+# alive, x, y, direction one-hot, ammo, can shoot, remaining cooldown, remaining reload
+PLAYER_FEATURE_COUNT = 3 + len(DIRECTIONS) + 4
+
+# what was drawn for a player: position, direction, ammo, can shoot
+_PlayerDrawing = Tuple[Tuple[int, int], int, float, bool]
+
+
+class ObservationEncoder(object):
+    """
+    Rasterization of a game into a fixed shape (CHANNEL_COUNT, MAP_WIDTH, MAP_HEIGHT) tensor
+    and (PLAYER_FEATURE_COUNT,) feature vectors of players.
+
+    The tensor is kept up to date incrementally from updates of each tick (see update),
+    only moved players and bullets are redrawn.
+    """
+
+    def __init__(self):
+        self.tick: Optional[int] = None
+        self.map = np.zeros((CHANNEL_COUNT, MAP_WIDTH, MAP_HEIGHT), dtype=np.float32)
+        self.map[OBSTACLE_CHANNEL] = get_obstacle_mask()
+
+        self._player_drawings: Dict[str, _PlayerDrawing] = {}
+        self._bullet_drawings: List[Tuple[int, int, int]] = []
+        self._game: Optional[Game] = None
+
+    def reset(self, game: Game):
+        """
+        Redraws everything from the game.
+        """
+        for player_id in list(self._player_drawings):
+            self._erase_player(player_id)
+
+        for player in game._players.values():
+            self._draw_player(game, player)
+
+        self._redraw_bullets(game)
+        self._game = game
+        self.tick = game.tick
+
+    def update(self, game: Game, updates: Optional[List[GameUpdate]]):
+        """
+        Brings the encoder to the state of the game, given the updates of the last tick.
+        Falls back to reset when the updates don't follow the previously encoded tick.
+        """
+        if updates is None or self.tick is None or game.tick != self.tick + 1:
+            self.reset(game)
+            return
+
+        changed_player_ids = set()
+        for update in updates:
+            if isinstance(update, (PlayerStateChange, GunStateChange)):
+                changed_player_ids.add(update.player_id)
+
+        for player in game._players.values():
+            drawing = self._player_drawings.get(player.id)
+            if drawing is not None and drawing[3] != player.gun.can_shoot(game):
+                changed_player_ids.add(player.id)  # cooldown is over
+
+        for player_id in changed_player_ids:
+            self._erase_player(player_id)
+
+        for player_id in changed_player_ids:
+            if game.player_is_spawned(player_id):
+                self._draw_player(game, game.get_player(player_id))
+
+        self._redraw_bullets(game)
+        self._game = game
+        self.tick = game.tick
+
+    def get_player_features(self, player_id: str) -> np.ndarray:
+        """
+        Gets features of the player (zeros for players which are not alive).
+        """
+        features = np.zeros(PLAYER_FEATURE_COUNT, dtype=np.float32)
+        game = self._game
+        if game is None or not game.player_is_spawned(player_id):
+            return features
+
+        player = game.get_player(player_id)
+        gun = player.gun
+        features[0] = 1.0
+        features[1] = player.position[0] / MAP_WIDTH
+        features[2] = player.position[1] / MAP_HEIGHT
+        features[3 + player.direction] = 1.0
+
+        i = 3 + len(DIRECTIONS)
+        features[i] = gun.ammo_count / gun.full_ammo_count
+        features[i + 1] = gun.can_shoot(game)
+        if gun.cooldown_start is not None:
+            elapsed_ticks = game.tick - gun.cooldown_start
+            features[i + 2] = max(0, gun.cooldown_time - elapsed_ticks) / max(1, gun.cooldown_time)
+            if gun.ammo_count == 0 and gun.reload_time is not None:
+                features[i + 3] = max(0, gun.reload_time - elapsed_ticks) / max(1, gun.reload_time)
+
+        return features
+
+    def get_crop(self, player_id: str, radius: int) -> np.ndarray:
+        """
+        Gets (CHANNEL_COUNT, 2 * radius + 1, 2 * radius + 1) egocentric crop of the map centered on the player.
+        Positions outside of the map are considered as obstacles.
+        """
+        size = 2 * radius + 1
+        crop = np.zeros((CHANNEL_COUNT, size, size), dtype=np.float32)
+        crop[OBSTACLE_CHANNEL] = 1.0
+
+        game = self._game
+        if game is None or not game.player_is_spawned(player_id):
+            return crop
+
+        x, y = game.get_player(player_id).position
+        from_x, to_x = max(0, x - radius), min(MAP_WIDTH, x + radius + 1)
+        from_y, to_y = max(0, y - radius), min(MAP_HEIGHT, y + radius + 1)
+        crop_x, crop_y = from_x - (x - radius), from_y - (y - radius)
+        crop[:, crop_x:crop_x + to_x - from_x, crop_y:crop_y + to_y - from_y] = self.map[:, from_x:to_x, from_y:to_y]
+        return crop
+
+    def _draw_player(self, game: Game, player: Player):
+        position = player.position
+        gun = player.gun
+        drawing = (position, player.direction, gun.ammo_count / gun.full_ammo_count, gun.can_shoot(game))
+        self._draw_player_values(drawing, 1.0)
+        self._player_drawings[player.id] = drawing
+
+    def _erase_player(self, player_id: str):
+        drawing = self._player_drawings.pop(player_id, None)
+        if drawing is not None:
+            self._draw_player_values(drawing, 0.0)
+
+    def _draw_player_values(self, drawing: _PlayerDrawing, scale: float):
+        (x, y), direction, ammo, can_shoot = drawing
+        if not is_in_map((x, y)):
+            return
+
+        # players can't overlap, so the values can be simply overwritten (scale 0 erases the drawing)
+        self.map[PLAYER_CHANNEL, x, y] = scale
+        self.map[PLAYER_DIRECTION_CHANNELS[direction], x, y] = scale
+        self.map[PLAYER_AMMO_CHANNEL, x, y] = scale * ammo
+        self.map[PLAYER_CAN_SHOOT_CHANNEL, x, y] = scale * can_shoot
+
+    def _redraw_bullets(self, game: Game):
+        # bullets can overlap, so they are counted
+        for x, y, direction in self._bullet_drawings:
+            self.map[BULLET_CHANNEL, x, y] -= 1.0
+            self.map[BULLET_DIRECTION_CHANNELS[direction], x, y] -= 1.0
+
+        self._bullet_drawings = []
+        for bullet in game.bullets:
+            # the bullet is at the start of the trajectory which will be tested for hits in the next tick
+            start = bullet.get_current_trajectory(game).start
+            position = (int(round(start[0])), int(round(start[1])))
+            if not is_in_map(position):
+                continue
+
+            direction = bullet.direction
+            self.map[BULLET_CHANNEL, position[0], position[1]] += 1.0
+            self.map[BULLET_DIRECTION_CHANNELS[direction], position[0], position[1]] += 1.0
+            self._bullet_drawings.append((position[0], position[1], direction))
@@ -1,17 +1,39 @@
-from typing import Tuple, List
+from typing import Tuple, List, Sequence
 
 from arena_bulanci.core.physics.utils import point_to_segment_distance, segment_with_circle_intersection
 from arena_bulanci.core.utils import distance
 
+# covers rounding errors of the computed intersection points
+BOUNDING_TOLERANCE = 1e-6
+
 
 class CircleBox(object):
+    __slots__ = ("_center", "_radius")
+
     def __init__(self, center: Tuple[float, float], radius: float):
         self._center = center
         self._radius = radius
 
+    @property
+    def center(self) -> Tuple[float, float]:
+        return self._center
+
+    @property
+    def radius(self) -> float:
+        return self._radius
+
     def intersects_with_segment(self, start: Tuple[float, float], end: Tuple[float, float]) -> bool:
         return point_to_segment_distance(self._center, start, end) < self._radius
 
+    def may_intersect_segment(self, start: Tuple[float, float], end: Tuple[float, float]) -> bool:
+        """
+        Cheap bounding rectangle test, False means that the segment surely doesn't intersect the box.
+        """
+        x, y = self._center
+        r = self._radius + BOUNDING_TOLERANCE
+        return min(start[0], end[0]) - r <= x <= max(start[0], end[0]) + r and \
+            min(start[1], end[1]) - r <= y <= max(start[1], end[1]) + r
+
     def intersection_points_with_segment(self, start: Tuple[float, float], end: Tuple[float, float]) \
             -> List[Tuple[float, float]]:
         return segment_with_circle_intersection(start, end, self._center, self._radius)
@@ -19,7 +41,7 @@ class CircleBox(object):
     def intersects_with_circle(self, center, radius):
         return distance(self._center, center) < self._radius + radius
 
-    def intersects(self, boxes: List):
+    def intersects(self, boxes: Sequence):
         for box in boxes:
             if box.intersects_with_circle(self._center, self._radius):
                 return True
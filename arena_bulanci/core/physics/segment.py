@@ -3,6 +3,8 @@ from typing import Tuple, List
 
 
 class Segment(object):
+    __slots__ = ("start", "end", "direction_coords")
+
     def __init__(self, start: Tuple[float, float], end: Tuple[float, float], direction_coords: Tuple[float, float]):
         self.start = start
         self.end = end
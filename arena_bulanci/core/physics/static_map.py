@@ -0,0 +1,104 @@
+from typing import Optional
+
+import numpy as np
+
+from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT, BULLET_RAY_LENGTH
+from arena_bulanci.core.game import Game, OBSTACLE_BOXES
+from arena_bulanci.core.player import GUN_OFFSET, Player
+from arena_bulanci.core.utils import DIRECTION_DEFINITIONS, distance
+
+_STATIC_RAY_DISTANCES: Optional[np.ndarray] = None
+_WALKABLE_MASK: Optional[np.ndarray] = None
+_OBSTACLE_MASK: Optional[np.ndarray] = None
+
+
+def get_walkable_mask() -> np.ndarray:
+    """
+    Gets (MAP_WIDTH, MAP_HEIGHT) mask of positions where players can stand (with respect to permanent obstacles).
+    """
+    global _WALKABLE_MASK
+
+    if _WALKABLE_MASK is None:
+        walkable_bits = np.frombuffer(Game.get_collision_map().walkable_bits, dtype=np.uint8)
+        walkable_mask = np.unpackbits(walkable_bits)[:MAP_WIDTH * MAP_HEIGHT].reshape(MAP_WIDTH, MAP_HEIGHT)
+        walkable_mask = walkable_mask.astype(np.bool_)
+
+        walkable_mask.flags.writeable = False
+        _WALKABLE_MASK = walkable_mask
+
+    return _WALKABLE_MASK
+
+
+def get_obstacle_mask() -> np.ndarray:
+    """
+    Gets (MAP_WIDTH, MAP_HEIGHT) mask of positions covered by permanent obstacles.
+    """
+    global _OBSTACLE_MASK
+
+    if _OBSTACLE_MASK is None:
+        xs, ys = np.meshgrid(np.arange(MAP_WIDTH), np.arange(MAP_HEIGHT), indexing="ij")
+        obstacle_mask = np.zeros((MAP_WIDTH, MAP_HEIGHT), dtype=np.bool_)
+        for box in OBSTACLE_BOXES:
+            obstacle_mask |= np.square(xs - box.center[0]) + np.square(ys - box.center[1]) < box.radius ** 2
+
+        obstacle_mask.flags.writeable = False
+        _OBSTACLE_MASK = obstacle_mask
+
+    return _OBSTACLE_MASK
+
+
+def get_static_ray_distances() -> np.ndarray:
+    """
+    Gets (directions, MAP_WIDTH, MAP_HEIGHT) array of distances which a bullet shot by a player standing
+    on the position travels before hitting a permanent obstacle (inf if no obstacle is hit).
+    The distance is measured from the bullet start (i.e. from the gun).
+    """
+    global _STATIC_RAY_DISTANCES
+
+    if _STATIC_RAY_DISTANCES is None:
+        xs, ys = np.meshgrid(np.arange(MAP_WIDTH), np.arange(MAP_HEIGHT), indexing="ij")
+        ray_distances = np.full((len(DIRECTION_DEFINITIONS), MAP_WIDTH, MAP_HEIGHT), np.inf)
+        for direction, coords in enumerate(DIRECTION_DEFINITIONS):
+            along_axis = 0 if coords[0] else 1
+            along = (xs, ys)[along_axis]
+            across = (xs, ys)[1 - along_axis]
+            sign = coords[along_axis]
+
+            for box in OBSTACLE_BOXES:
+                hit_distances = get_ray_hit_distances(
+                    along + sign * GUN_OFFSET, sign, across - box.center[1 - along_axis],
+                    box.center[along_axis], box.radius, BULLET_RAY_LENGTH - GUN_OFFSET
+                )
+                np.minimum(ray_distances[direction], hit_distances, out=ray_distances[direction])
+
+                # touching rays depend on rounding, so they are evaluated exactly as in the game
+                is_touching = np.abs(np.square(across - box.center[1 - along_axis]) - box.radius ** 2) < 1e-6
+                for x, y in np.argwhere(is_touching):
+                    ray = Player.get_bullet_ray_from((int(x), int(y)), direction)
+                    for point in ray.get_intersection_points(box):
+                        hit_distance = distance(ray.start, point)
+                        ray_distances[direction, x, y] = min(ray_distances[direction, x, y], hit_distance)
+
+        ray_distances.flags.writeable = False
+        _STATIC_RAY_DISTANCES = ray_distances
+
+    return _STATIC_RAY_DISTANCES
+
+
+def get_ray_hit_distances(ray_start, direction_sign, across_distance, circle_center, radius, ray_length):
+    """
+    Vectorized distance of the first intersection of axis aligned rays with circles (inf when there is none).
+    Ray starts and circle centers are given as coordinates on the ray axis,
+    the circle offsets from the ray are given by across_distance.
+    Same as the nearest point of `segment_with_circle_intersection`,
+    i.e. exit point is reported for rays starting inside the circle.
+    """
+    half_chord_sqr = radius ** 2 - np.square(across_distance)
+    half_chord = np.sqrt(np.maximum(half_chord_sqr, 0))
+    center_distance = (circle_center - ray_start) * direction_sign
+
+    entry_distance = center_distance - half_chord
+    hit_distance = np.where(entry_distance >= 0, entry_distance, center_distance + half_chord)
+    # touching rays are not considered as hits
+    is_hit = (half_chord_sqr > 0) & (hit_distance >= 0) & (hit_distance <= ray_length)
+    return np.where(is_hit, hit_distance, np.inf)
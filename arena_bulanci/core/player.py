@@ -1,10 +1,14 @@
-from copy import copy
+from copy import copy, deepcopy
 from typing import Optional, Tuple
 
 from arena_bulanci.core.config import TICKS_PER_SECOND, BULLET_RAY_LENGTH, PLAYER_BOX_RADIUS
 from arena_bulanci.core.gun import Gun
 from arena_bulanci.core.physics.segment import Segment
-from arena_bulanci.core.utils import DIRECTION_DEFINITIONS, closest_direction_towards
+from arena_bulanci.core.utils import DIRECTION_DEFINITIONS, closest_direction_towards, copy_slots
+
+
+# distance of the bullet start from the player position
+GUN_OFFSET = PLAYER_BOX_RADIUS + 1 + 1e-5
 
 
 def create_revolver():
@@ -12,6 +16,9 @@ def create_revolver():
 
 
 class Player(object):
+    # slots keep players compact (the game is copied and serialized every tick), color is set by PlayerStateChange
+    __slots__ = ("id", "position", "_direction", "gun", "color")
+
     def __init__(self, id: str):
         self.id: str = id
         self.position: Optional[Tuple[int, int]] = None
@@ -19,6 +26,12 @@ class Player(object):
 
         self.gun: Gun = create_revolver()
 
+    def __deepcopy__(self, memo):
+        # all the values except the gun are immutable
+        player_copy = copy_slots(self, memo)
+        player_copy.gun = deepcopy(self.gun, memo)
+        return player_copy
+
     @property
     def direction(self):
         return self._direction
@@ -53,17 +66,24 @@ class Player(object):
         return closest_direction_towards(p, o)
 
     def get_bullet_ray(self) -> Segment:
-        p = self.position
-        d = DIRECTION_DEFINITIONS[self.direction]
+        return self.get_bullet_ray_from(self.position, self.direction)
+
+    @classmethod
+    def get_bullet_ray_from(cls, position: Tuple[int, int], direction: int) -> Segment:
+        """
+        Gets ray of a bullet shot by a player standing on given position and direction
+        """
+        p = position
+        d = DIRECTION_DEFINITIONS[direction]
 
-        bullet_start_position = self._add_gun_offset(self.position, d)
+        bullet_start_position = cls._add_gun_offset(p, d)
 
         end = (p[0] + BULLET_RAY_LENGTH * d[0], p[1] + BULLET_RAY_LENGTH * d[1])
         return Segment(bullet_start_position, end, d)
 
-    def _add_gun_offset(self, p, d):
-        r = PLAYER_BOX_RADIUS + 1 + 1e-5
-        return p[0] + d[0] * r, p[1] + d[1] * r
+    @classmethod
+    def _add_gun_offset(cls, p, d):
+        return p[0] + d[0] * GUN_OFFSET, p[1] + d[1] * GUN_OFFSET
 
     def __repr__(self):
         return f"{self.id}: pos = {self.position}, dir = {self.direction}"
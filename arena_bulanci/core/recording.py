@@ -0,0 +1,213 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import List, Optional, Iterator, Tuple
+
+from arena_bulanci.core.config import ARENA_MAP
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.game_updates.game_update import GameUpdate
+from arena_bulanci.core.utils import jsondumps, jsonloads
+
+RECORDING_MAGIC = b"ARENA_BULANCI_RECORDING_1\n"
+DEFAULT_KEYFRAME_INTERVAL = 150  # ticks
+
+UPDATES_RECORD = 0
+KEYFRAME_RECORD = 1
+
+# record is: type, tick, payload length + zlib compressed jsonpickle payload
+_RECORD_HEADER = struct.Struct("<BII")
+# index entry is: tick, record offset, record type
+_INDEX_ENTRY = struct.Struct("<IQB")
+
+
+def get_index_path(path: str) -> str:
+    return path + ".idx"
+
+
+class MatchRecorder(object):
+    """
+    Append-only binary log of a match. Committed updates of every tick are recorded
+    together with full state keyframes (every keyframe_interval ticks), so that any tick can be restored quickly.
+    A tick -> offset index of all records is written next to the log (see MatchRecording).
+    """
+
+    def __init__(self, game: Game, path: str, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL):
+        self._game = game
+        self._keyframe_interval = keyframe_interval
+
+        is_new = not os.path.isfile(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        self._index_file = open(get_index_path(path), "ab")
+        if is_new:
+            self._file.write(RECORDING_MAGIC)
+            self._file.write(json.dumps({"map_hash": ARENA_MAP.hash}).encode("utf-8") + b"\n")
+
+        # the log can be appended after restart of the arena, so it starts with a keyframe
+        self._write_keyframe()
+        game.subscribe_ticks(self._tick_handler)
+
+    def close(self):
+        self._file.close()
+        self._index_file.close()
+
+    def _tick_handler(self, updates: List[GameUpdate]):
+        if self._file.closed:
+            return
+
+        self._write_record(UPDATES_RECORD, self._game.tick, jsondumps(updates))
+        if self._game.tick % self._keyframe_interval == 0:
+            self._write_keyframe()
+
+        self._file.flush()
+        self._index_file.flush()
+
+    def _write_keyframe(self):
+        self._write_record(KEYFRAME_RECORD, self._game.tick, jsondumps(self._game.copy_without_internal_data()))
+
+    def _write_record(self, record_type: int, tick: int, payload: str):
+        data = zlib.compress(payload.encode("utf-8"))
+        offset = self._file.tell()
+        self._file.write(_RECORD_HEADER.pack(record_type, tick, len(data)))
+        self._file.write(data)
+        self._index_file.write(_INDEX_ENTRY.pack(tick, offset, record_type))
+
+
+class MatchRecording(object):
+    """
+    Memory mapped reader of a log written by MatchRecorder.
+    Game state of any recorded tick is restored from the nearest previous keyframe.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(RECORDING_MAGIC)] != RECORDING_MAGIC:
+            raise ValueError(f"{path} is not a match recording")
+
+        header_end = self._data.find(b"\n", len(RECORDING_MAGIC)) + 1
+        header = json.loads(self._data[len(RECORDING_MAGIC):header_end].decode("utf-8"))
+        self.map_hash: str = header["map_hash"]
+        self._records_start = header_end
+
+        self._ticks: List[int] = []
+        self._offsets: List[int] = []
+        self._keyframe_ticks: List[int] = []
+        self._keyframe_offsets: List[int] = []
+        self._load_index(path)
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    @property
+    def first_tick(self) -> Optional[int]:
+        return self._keyframe_ticks[0] if self._keyframe_ticks else None
+
+    @property
+    def last_tick(self) -> Optional[int]:
+        return self._ticks[-1] if self._ticks else None
+
+    def get_state(self, tick: int) -> Game:
+        """
+        Restores game state at given tick (i.e. after updates of the tick were applied).
+        """
+        game = None
+        for game, _ in self.iterate(tick):
+            break
+
+        if game is None:
+            raise ValueError(f"Tick {tick} is not recorded")
+
+        return game
+
+    def iterate(self, from_tick: int) -> Iterator[Tuple[Game, List[GameUpdate]]]:
+        """
+        Iterates game states since the given tick (together with updates which lead to the state).
+        The same game object is updated during the iteration.
+        """
+        keyframe_index = bisect.bisect_right(self._keyframe_ticks, from_tick) - 1
+        if keyframe_index < 0:
+            raise ValueError(f"Tick {from_tick} precedes the recording")
+
+        game = None
+        i = bisect.bisect_left(self._offsets, self._keyframe_offsets[keyframe_index])
+        while i < len(self._offsets):
+            record_type, tick, payload = self._read_record(self._offsets[i])
+            i += 1
+
+            if record_type == KEYFRAME_RECORD:
+                if game is not None and game.tick == tick:
+                    continue  # state is already known
+
+                game = self._create_game(payload)
+                if game.tick >= from_tick:
+                    yield game, []
+                continue
+
+            if game is None:
+                continue
+
+            if tick != game.tick + 1:
+                game = None  # there is a gap in the recording (e.g. arena restart), wait for the next keyframe
+                continue
+
+            updates = jsonloads(payload)
+            game.external_step(updates)
+            if game.tick >= from_tick:
+                yield game, updates
+
+    def _create_game(self, payload: str) -> Game:
+        game: Game = jsonloads(payload)
+        game._tick_subscribers = []
+        game._pretick_subscribers = []
+        game._request_subscribers = []
+        return game
+
+    def _read_record(self, offset: int) -> Tuple[int, int, str]:
+        record_type, tick, length = _RECORD_HEADER.unpack_from(self._data, offset)
+        start = offset + _RECORD_HEADER.size
+        payload = zlib.decompress(self._data[start:start + length]).decode("utf-8")
+        return record_type, tick, payload
+
+    def _load_index(self, path: str):
+        entries = []
+        index_path = get_index_path(path)
+        if os.path.isfile(index_path):
+            with open(index_path, "rb") as f:
+                index_data = f.read()
+
+            entry_count = len(index_data) // _INDEX_ENTRY.size
+            entries = [_INDEX_ENTRY.unpack_from(index_data, i * _INDEX_ENTRY.size) for i in range(entry_count)]
+
+        if not entries or not self._is_complete_record(entries[-1][1]):
+            entries = self._scan_records()  # index is missing or inconsistent with the log
+
+        for tick, offset, record_type in entries:
+            if not self._is_complete_record(offset):
+                break  # the log is being written right now
+
+            self._ticks.append(tick)
+            self._offsets.append(offset)
+            if record_type == KEYFRAME_RECORD:
+                self._keyframe_ticks.append(tick)
+                self._keyframe_offsets.append(offset)
+
+    def _scan_records(self) -> List[Tuple[int, int, int]]:
+        entries = []
+        offset = self._records_start
+        while self._is_complete_record(offset):
+            record_type, tick, length = _RECORD_HEADER.unpack_from(self._data, offset)
+            entries.append((tick, offset, record_type))
+            offset += _RECORD_HEADER.size + length
+
+        return entries
+
+    def _is_complete_record(self, offset: int) -> bool:
+        if offset + _RECORD_HEADER.size > len(self._data):
+            return False
+
+        _, _, length = _RECORD_HEADER.unpack_from(self._data, offset)
+        return offset + _RECORD_HEADER.size + length <= len(self._data)
@@ -0,0 +1,100 @@
+import hashlib
+import json
+from typing import List, Optional, Iterator, Tuple
+
+from arena_bulanci.core.config import ARENA_MAP
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.game_updates.game_update import GameUpdate
+from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
+from arena_bulanci.core.utils import jsondumps, jsonloads
+
+REQUEST_LOG_FORMAT_VERSION = 1
+
+
+def get_updates_digest(updates: List[GameUpdate]) -> str:
+    return hashlib.sha1(jsondumps(updates).encode("utf-8")).hexdigest()
+
+
+class RequestLogRecorder(object):
+    """
+    Records requests processed by every tick of a seeded game (one JSON line per tick),
+    together with digest of the resulting updates.
+    Seeded games are deterministic, so the log is enough to replay the whole match (see replay).
+    """
+
+    def __init__(self, game: Game, path: str):
+        if game.seed is None:
+            raise ValueError("Only seeded games can be replayed")
+
+        if game.tick != 0:
+            raise ValueError("Recording has to start before the first tick")
+
+        self._game = game
+        self._requests: Optional[str] = None
+        self._file = open(path, "w")
+        self._file.write(json.dumps({
+            "version": REQUEST_LOG_FORMAT_VERSION,
+            "seed": game.seed,
+            "map_hash": ARENA_MAP.hash
+        }) + "\n")
+
+        game.subscribe_requests(self._request_handler)
+        game.subscribe_ticks(self._tick_handler)
+
+    def close(self):
+        self._file.close()
+
+    def _request_handler(self, requests: List[GameUpdateRequest]):
+        self._requests = jsondumps(requests)
+
+    def _tick_handler(self, updates: List[GameUpdate]):
+        if self._file.closed:
+            return
+
+        self._file.write(json.dumps({
+            "tick": self._game.tick,
+            "requests": self._requests,
+            "digest": get_updates_digest(updates)
+        }) + "\n")
+        self._file.flush()
+
+
+def replay(path: str, verify: bool = True) -> Iterator[Tuple[Game, List[GameUpdate]]]:
+    """
+    Replays a match recorded by RequestLogRecorder, tick by tick.
+    When verifying, AssertionError is raised as soon as the updates differ from the recorded ones.
+    """
+    with open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != REQUEST_LOG_FORMAT_VERSION:
+            raise ValueError(f"Unsupported request log version: {header.get('version')}")
+
+        if header["map_hash"] != ARENA_MAP.hash:
+            raise ValueError(f"The match was recorded on a different map ({header['map_hash']}), current: {ARENA_MAP}")
+
+        game = Game(seed=header["seed"])
+        for line in f:
+            record = json.loads(line)
+            game.accept(jsonloads(record["requests"]))
+            updates = game.step(report_errors=False)
+
+            if verify:
+                if game.tick != record["tick"]:
+                    raise AssertionError(f"Replay tick {game.tick} does not match recorded tick {record['tick']}")
+
+                if get_updates_digest(updates) != record["digest"]:
+                    raise AssertionError(f"Replay diverged at tick {record['tick']}")
+
+            yield game, updates
+
+
+def verify_replay(path: str) -> int:
+    """
+    Replays the whole recorded match and asserts that the updates are identical to the recorded ones.
+    Returns count of verified ticks.
+    """
+    tick_count = 0
+    for _ in replay(path, verify=True):
+        tick_count += 1
+
+    return tick_count
@@ -0,0 +1,178 @@
+import itertools
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import List, Optional
+
+from arena_bulanci.core.bullet import Bullet
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.player import Player
+
+# sequence (odd while being written), tick, has seed, seed, player count, bullet count
+_HEADER = struct.Struct("<IiBqHH")
+# player index, state, position, direction, ammo count, cooldown start (NO_TICK for None), death tick, has color, color
+_PLAYER = struct.Struct("<HBhhbbiiBBBB")
+# reward receiver index, start tick, start position, direction coords (see DIRECTION_DEFINITIONS)
+_BULLET = struct.Struct("<Hiddbb")
+
+_ALIVE = 1
+_DEAD = 2
+NO_TICK = -(2 ** 31)
+MAX_BULLETS_PER_PLAYER = 16
+READ_TIMEOUT = 0.05  # seconds, the writer might be descheduled while writing (when bots outnumber cores)
+READ_YIELD_ATTEMPTS = 100  # attempts which only yield the CPU before the reader starts to sleep
+READ_RETRY_SLEEP = 0.001  # seconds
+
+
+class SharedGameState(object):
+    """
+    Game state published into shared memory in a compact fixed-size layout, so bot processes can read it
+    without any serialization. Player ids are not stored, players are referenced by index to the player_ids
+    known to all processes.
+
+    The state is written by a single process and read by the others (a sequence lock detects torn reads).
+    """
+
+    def __init__(self, player_ids: List[str], name: Optional[str] = None):
+        self.player_ids = list(player_ids)
+        self._player_indexes = {player_id: i for i, player_id in enumerate(self.player_ids)}
+        self._max_bullets = len(self.player_ids) * MAX_BULLETS_PER_PLAYER
+
+        size = _HEADER.size + len(self.player_ids) * _PLAYER.size + self._max_bullets * _BULLET.size
+        self._is_owner = name is None
+        self._memory = shared_memory.SharedMemory(name=name, create=self._is_owner, size=size)
+        self._sequence = 0
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def publish(self, game: Game):
+        """
+        Writes state of the game (only the owner process can publish).
+        """
+        if not self._is_owner:
+            raise AssertionError("Only the process which created the shared state can publish")
+
+        bullets = game._bullets
+        if len(bullets) > self._max_bullets:
+            raise ValueError(f"Too many bullets to be shared: {len(bullets)}")
+
+        # validated before the write starts, a failed write would leave the sequence odd (unreadable) forever
+        for player_id in itertools.chain(game._players, game._dead_players):
+            if player_id not in self._player_indexes:
+                raise ValueError(f"Player can't be shared: {player_id}")
+
+        receiver_indexes = []
+        for bullet in bullets:
+            if bullet.id != _get_bullet_id(bullet.start_tick, bullet.reward_receiver_id):
+                raise ValueError(f"Bullet id can't be shared: {bullet.id}")
+
+            receiver_indexes.append(self._player_indexes[bullet.reward_receiver_id])
+
+        buffer = self._memory.buf
+        self._sequence += 1  # odd - readers will retry
+        struct.pack_into("<I", buffer, 0, self._sequence)
+
+        offset = _HEADER.size
+        player_count = 0
+        for player in game._players.values():
+            self._pack_player(buffer, offset, player, _ALIVE, NO_TICK)
+            offset += _PLAYER.size
+            player_count += 1
+
+        for player, death_tick in game._dead_players.values():
+            self._pack_player(buffer, offset, player, _DEAD, death_tick)
+            offset += _PLAYER.size
+            player_count += 1
+
+        offset = _HEADER.size + len(self.player_ids) * _PLAYER.size
+        for bullet, receiver_index in zip(bullets, receiver_indexes):
+            _BULLET.pack_into(buffer, offset, receiver_index, bullet.start_tick, bullet.start_position[0],
+                              bullet.start_position[1], bullet.direction_coords[0], bullet.direction_coords[1])
+            offset += _BULLET.size
+
+        seed = game.seed
+        self._sequence += 1
+        _HEADER.pack_into(buffer, 0, self._sequence, game.tick, seed is not None, seed or 0, player_count,
+                          len(bullets))
+
+    def read(self) -> Game:
+        """
+        Reads the last published state as a game (without internal data, like copy_without_internal_data).
+        TimeoutError is raised when the state is being written for longer than READ_TIMEOUT.
+        """
+        buffer = self._memory.buf
+        deadline = time.time() + READ_TIMEOUT
+        attempt = 0
+        while True:
+            sequence = struct.unpack_from("<I", buffer, 0)[0]
+            if sequence % 2 == 0:
+                data = bytes(buffer)
+                if struct.unpack_from("<I", buffer, 0)[0] == sequence:
+                    return self._create_game(data)
+
+            # being written - the writer gets the CPU first, then the reader backs off
+            if time.time() >= deadline:
+                raise TimeoutError("Shared game state was not readable")
+
+            attempt += 1
+            time.sleep(0 if attempt <= READ_YIELD_ATTEMPTS else READ_RETRY_SLEEP)
+
+    def close(self):
+        self._memory.close()
+        if self._is_owner:
+            self._memory.unlink()
+
+    def _pack_player(self, buffer, offset: int, player: Player, state: int, death_tick: int):
+        gun = player.gun
+        cooldown_start = NO_TICK if gun.cooldown_start is None else gun.cooldown_start
+        color = getattr(player, "color", None)  # set by PlayerStateChange
+        _PLAYER.pack_into(buffer, offset, self._player_indexes[player.id], state, player.position[0],
+                          player.position[1], player.direction, gun.ammo_count, cooldown_start, death_tick,
+                          color is not None, *(color or (0, 0, 0)))
+
+    def _create_game(self, data: bytes) -> Game:
+        _, tick, has_seed, seed, player_count, bullet_count = _HEADER.unpack_from(data, 0)
+
+        game = Game(seed=seed if has_seed else None)
+        game._tick = tick
+        game._tick_subscribers = None
+        game._pretick_subscribers = None
+        game._request_subscribers = None
+        game._verbose = None
+
+        offset = _HEADER.size
+        for _ in range(player_count):
+            index, state, x, y, direction, ammo_count, cooldown_start, death_tick, has_color, *color = \
+                _PLAYER.unpack_from(data, offset)
+            offset += _PLAYER.size
+
+            player = Player(self.player_ids[index])
+            player.position = (x, y)
+            player._direction = direction
+            player.gun.ammo_count = ammo_count
+            player.gun._cooldown_start = None if cooldown_start == NO_TICK else cooldown_start
+            if has_color:
+                player.color = tuple(color)
+
+            if state == _ALIVE:
+                game._players[player.id] = player
+            else:
+                game._dead_players[player.id] = player, death_tick
+
+        offset = _HEADER.size + len(self.player_ids) * _PLAYER.size
+        for _ in range(bullet_count):
+            receiver_index, start_tick, x, y, dx, dy = _BULLET.unpack_from(data, offset)
+            offset += _BULLET.size
+
+            receiver_id = self.player_ids[receiver_index]
+            game._bullets.append(Bullet(_get_bullet_id(start_tick, receiver_id), start_tick, (x, y), (dx, dy),
+                                        receiver_id))
+
+        return game
+
+
+def _get_bullet_id(start_tick: int, reward_receiver_id: str) -> str:
+    # the same as in ShootRequest
+    return f"bullet{start_tick}-{reward_receiver_id}"
@@ -0,0 +1,73 @@
+import bisect
+from typing import List, Optional
+
+# upper bounds of the histogram buckets (the last bucket is unbounded)
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+
+
+class ThinkStatistics(object):
+    """
+    Think times of a bot (in a histogram) together with overruns of its think budget.
+    """
+
+    def __init__(self, player_id: str, budget: Optional[float] = None):
+        self.player_id = player_id
+        self.budget = budget
+        self.count = 0
+        self.overrun_count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def register(self, think_time: float) -> bool:
+        """
+        Registers think time in seconds, returns whether the budget was overrun.
+        """
+        self.count += 1
+        self.total_time += think_time
+        self.max_time = max(self.max_time, think_time)
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, think_time * 1000)] += 1
+
+        is_overrun = self.budget is not None and think_time > self.budget
+        if is_overrun:
+            self.overrun_count += 1
+
+        return is_overrun
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / max(1, self.count)
+
+    def get_percentile_bound(self, ratio: float) -> Optional[float]:
+        """
+        Gets upper bound (in ms) of the bucket containing the percentile, None for the unbounded bucket.
+        """
+        rank = ratio * self.count
+        cumulative_count = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram):
+            cumulative_count += count
+            if cumulative_count >= rank:
+                return bound
+
+        return None
+
+    def format_histogram(self) -> str:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return " ".join(f"{label}: {count}" for label, count in zip(labels, self.histogram) if count)
+
+    def __repr__(self):
+        p95 = self.get_percentile_bound(0.95)
+        p95_description = f"<={p95}ms" if p95 is not None else f">{LATENCY_BUCKETS_MS[-1]}ms"
+        result = f"{self.player_id}: {self.count} thinks, mean {self.mean_time * 1000:.2f}ms, " \
+                 f"max {self.max_time * 1000:.2f}ms, p95 {p95_description}"
+        if self.budget is not None:
+            result += f", overruns of {self.budget * 1000:.0f}ms budget: {self.overrun_count}"
+
+        return result
+
+
+def print_think_summary(statistics: List[ThinkStatistics]):
+    print("THINK TIME SUMMARY:")
+    for bot_statistics in sorted(statistics, key=lambda s: s.max_time, reverse=True):
+        print(f"\t{bot_statistics}")
+        print(f"\t\t{bot_statistics.format_histogram()}")
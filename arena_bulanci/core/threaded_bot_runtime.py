@@ -0,0 +1,121 @@
+import time
+from threading import Thread, Lock, Event
+from typing import List, Optional
+
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.game_updates.game_update import GameUpdate
+from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
+
+
+class _Plan(object):
+    """
+    Requests published by the thinking thread, requests[i] is intended for tick start_tick + i.
+    """
+
+    def __init__(self, start_tick: int, requests: List[Optional[GameUpdateRequest]], queued_count: int):
+        self.start_tick = start_tick
+        self.requests = requests
+        self.queued_count = queued_count  # requests[1:queued_count + 1] are still enqueued in the bot
+
+
+class ThreadedBotRuntime(object):
+    """
+    Decouples thinking of the bot from the network I/O.
+
+    The network thread applies the updates and calls get_requests every tick, which replies on time
+    with the moves published by the bot (or the published future requests if the bot is still thinking).
+    The bot thinks on its own thread against a snapshot of the game and publishes its moves when ready,
+    so a slow _play only makes the bot play older plans instead of skipping ticks.
+    """
+
+    def __init__(self, bot):
+        self._bot = bot
+        self._L = Lock()
+        self._snapshot_ready = Event()
+        self._plan_published = Event()
+
+        self._snapshot: Optional[Game] = None
+        self._snapshot_updates: List[GameUpdate] = []
+        self._pending_updates: List[GameUpdate] = []
+        self._is_thinking = False
+        self._plan: Optional[_Plan] = None
+        self._is_stopped = False
+
+        Thread(target=self._think_worker, daemon=True).start()
+
+    def get_requests(self, game: Game, updates: List[GameUpdate]) -> List[Optional[GameUpdateRequest]]:
+        """
+        Called by the network thread after the updates were applied to the game.
+        Returns the request for the next tick followed by the future requests.
+        Waits for the thinking bot at most until its think deadline.
+        """
+        with self._L:
+            self._pending_updates.extend(updates)
+            has_started_thinking = not self._is_thinking
+            if has_started_thinking:
+                # the thinking thread is idle, so it gets the current state (otherwise it gets a newer one later)
+                self._snapshot = game.copy_without_internal_data()
+                self._snapshot_updates = self._pending_updates
+                self._pending_updates = []
+                self._is_thinking = True
+                self._plan_published.clear()
+                self._snapshot_ready.set()
+
+        if has_started_thinking:
+            self._plan_published.wait(max(0.0, self._bot._get_think_deadline() - time.time()))
+
+        with self._L:
+            plan = self._plan
+
+        if plan is None:
+            return [None]
+
+        index = game.tick + 1 - plan.start_tick
+        if index < 0 or index >= len(plan.requests):
+            return [None]
+
+        return plan.requests[index:]
+
+    def stop(self):
+        """
+        Stops the thinking thread (after the current thinking ends).
+        """
+        self._is_stopped = True
+        self._snapshot_ready.set()
+
+    def _think_worker(self):
+        while True:
+            self._snapshot_ready.wait()
+            if self._is_stopped:
+                return
+
+            with self._L:
+                self._snapshot_ready.clear()
+                game, updates = self._snapshot, self._snapshot_updates
+                self._snapshot, self._snapshot_updates = None, []
+
+            self._forget_played_requests(game.tick)
+            current_request = self._bot.pop_update_request(game, updates)
+            queued_count = len(self._bot._update_requests)
+            future_requests = self._bot.get_future_requests(current_request)
+
+            with self._L:
+                plan = _Plan(game.tick + 1, [current_request] + future_requests, queued_count)
+                self._plan = plan
+                self._is_thinking = False
+                self._plan_published.set()
+
+    def _forget_played_requests(self, tick: int):
+        """
+        Removes enqueued requests of the last plan which were intended for already answered ticks
+        (they were either sent or their ticks were missed during the thinking).
+        """
+        with self._L:
+            plan = self._plan
+
+        if plan is None:
+            return
+
+        played_count = min(max(0, tick - plan.start_tick), plan.queued_count)
+        if played_count:
+            del self._bot._update_requests[:played_count]
@@ -0,0 +1,50 @@
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from arena_bulanci.core.game import Game
+
+
+class TickCache(object):
+    """
+    Memoizes values derived from the game state for the duration of a single tick.
+    The values are dropped whenever the game or its tick changes
+    (so the values are correct also within forks, where simulate_step moves the tick).
+
+    NOTE: The cached values are shared, so they must not be mutated by the callers.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._game: Optional[Game] = None
+        self._tick: Optional[int] = None
+        self._values: Dict[Hashable, Any] = {}
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(1, self.hits + self.misses)
+
+    def get(self, game: Game, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Gets value of the key valid for current tick of the game, factory is called when there is no such value.
+        """
+        # (this is on the path of every cached accessor, so the tick is read directly)
+        if game is self._game and game._tick == self._tick:
+            values = self._values
+            if key in values:
+                self.hits += 1
+                return values[key]
+        else:
+            self.invalidate(game)
+
+        self.misses += 1
+        value = factory()
+        self._values[key] = value
+        return value
+
+    def invalidate(self, game: Optional[Game] = None):
+        self._values.clear()
+        self._game = game
+        self._tick = None if game is None else game.tick
+
+    def __repr__(self):
+        return f"hits: {self.hits}, misses: {self.misses} (hit rate {self.hit_rate * 100:.1f}%)"
@@ -0,0 +1,58 @@
+import time
+from typing import Optional
+
+DEFAULT_SAFETY_MARGIN = 0.005  # seconds
+
+
+class TickClock(object):
+    """
+    Client side estimate of the arena clock and of the deadline for requests of the next tick.
+
+    The clock offset is synchronized by an NTP-like exchange during the connection handshake.
+    The arena reports the expected time of its next tick in every update group,
+    requests have to arrive before it, so the deadline accounts for the one way latency.
+    All the times are `time.time()` based.
+    """
+
+    def __init__(self, safety_margin: float = DEFAULT_SAFETY_MARGIN):
+        self.safety_margin = safety_margin
+        self.offset: Optional[float] = None  # arena time - client time
+        self.roundtrip: Optional[float] = None
+        self._next_tick_time: Optional[float] = None  # in arena time
+
+    @property
+    def is_synchronized(self) -> bool:
+        return self.offset is not None
+
+    def synchronize(self, client_send_time: float, server_receive_time: float, server_send_time: float,
+                    client_receive_time: float):
+        """
+        Registers times of a request/response exchange, measured by the respective clocks.
+        """
+        roundtrip = (client_receive_time - client_send_time) - (server_send_time - server_receive_time)
+        offset = ((server_receive_time - client_send_time) + (server_send_time - client_receive_time)) / 2
+
+        if self.roundtrip is None or roundtrip <= self.roundtrip:
+            # the shortest exchange is the most precise one
+            self.roundtrip = max(0.0, roundtrip)
+            self.offset = offset
+
+    def register_next_tick_time(self, next_tick_time: Optional[float]):
+        self._next_tick_time = next_tick_time
+
+    def get_deadline(self) -> Optional[float]:
+        """
+        Gets time (of the client clock) until which the request has to be sent to be played in the next tick.
+        None if the arena doesn't report its tick times.
+        """
+        if not self.is_synchronized or self._next_tick_time is None:
+            return None
+
+        return self._next_tick_time - self.offset - self.roundtrip / 2 - self.safety_margin
+
+    def get_time_left(self) -> Optional[float]:
+        deadline = self.get_deadline()
+        if deadline is None:
+            return None
+
+        return deadline - time.time()
@@ -0,0 +1,169 @@
+import random
+from typing import List, Optional, Callable, Tuple
+
+import numpy as np
+
+from arena_bulanci.core.actions import create_request
+from arena_bulanci.core.config import MAP_WIDTH, MAP_HEIGHT
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.game_updates.game_update import GameUpdate
+from arena_bulanci.core.game_updates.player_spawn_request import PlayerSpawnRequest
+from arena_bulanci.core.game_updates.remove_bullet import RemoveBullet
+from arena_bulanci.core.utils import DIRECTION_DEFINITIONS
+
+KILL_REWARD = 1.0
+DEATH_REWARD = -1.0
+
+# (game, player_id) -> fixed shape observation of the player
+ObservationEncoder = Callable[[Game, str], np.ndarray]
+
+
+class VectorGameEnv(object):
+    """
+    Gym-style batch of independent games stepped together (intended for reinforcement learning rollouts).
+    Every game has the same controlled players, which are driven by (game_count, player_count) arrays
+    of action codes (see core.actions).
+
+    Players are respawned automatically as soon as the game rules allow (see MIN_RESPAWN_TICK_COUNT),
+    actions of dead players are ignored.
+    """
+
+    def __init__(self, game_count: int, player_count: int, observation_encoder: Optional[ObservationEncoder] = None,
+                 episode_tick_limit: Optional[int] = None, kill_reward: float = KILL_REWARD,
+                 death_reward: float = DEATH_REWARD, seed: Optional[int] = None):
+        self.game_count = game_count
+        self.player_count = player_count
+        self.player_ids = [f"player{i}" for i in range(player_count)]
+        self.episode_tick_limit = episode_tick_limit
+        self.kill_reward = kill_reward
+        self.death_reward = death_reward
+
+        self._observation_encoder = observation_encoder
+        if self._observation_encoder is None:
+            self._observation_encoder = self._encode_default_observation
+
+        self._player_indexes = {player_id: i for i, player_id in enumerate(self.player_ids)}
+        # seeds of the games are derived from the env seed, so the rollouts are reproducible
+        self._seeds = None if seed is None else random.Random(seed)
+        self.games: List[Game] = []
+        self.last_updates: List[List[GameUpdate]] = []
+
+    def reset(self) -> np.ndarray:
+        """
+        Creates new games (with all the players spawned) and returns the initial observations.
+        """
+        self.games = [None] * self.game_count
+        self.last_updates = [[] for _ in range(self.game_count)]
+        for i in range(self.game_count):
+            self._reset_game(i)
+
+        return self.get_observations()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Plays a single tick in all the games.
+        Returns (observations, rewards, dones) where dones indicate that the player got killed in the tick
+        (or that the game was restarted because of the episode tick limit).
+        """
+        actions = np.asarray(actions)
+        if actions.shape != (self.game_count, self.player_count):
+            expected_shape = (self.game_count, self.player_count)
+            raise ValueError(f"actions of shape {expected_shape} expected, but got {actions.shape}")
+
+        rewards = np.zeros((self.game_count, self.player_count), dtype=np.float32)
+        dones = np.zeros((self.game_count, self.player_count), dtype=np.bool_)
+        for i, game in enumerate(self.games):
+            requests = []
+            for player_id, action in zip(self.player_ids, actions[i]):
+                if game.player_is_spawned(player_id):
+                    request = create_request(player_id, action)
+                elif game.can_spawn(player_id):
+                    request = PlayerSpawnRequest(player_id, None)
+                else:
+                    request = None
+
+                if request is not None:
+                    requests.append(request)
+
+            game.accept(requests)
+            updates = game.step(report_errors=False)
+            self.last_updates[i] = updates
+            self._register_kills(updates, rewards[i], dones[i])
+
+            if self.episode_tick_limit is not None and game.tick >= self.episode_tick_limit:
+                dones[i] = True
+                self._reset_game(i)
+
+        return self.get_observations(), rewards, dones
+
+    def get_observations(self) -> np.ndarray:
+        """
+        Gets (game_count, player_count, ...) array of observations created by the observation encoder.
+        """
+        return np.stack([
+            np.stack([self._observation_encoder(game, player_id) for player_id in self.player_ids])
+            for game in self.games
+        ])
+
+    def get_alive_mask(self) -> np.ndarray:
+        """
+        Gets (game_count, player_count) mask of players which are spawned in the games.
+        """
+        return np.array([
+            [game.player_is_spawned(player_id) for player_id in self.player_ids] for game in self.games
+        ], dtype=np.bool_)
+
+    def _reset_game(self, index: int):
+        game = Game(seed=None if self._seeds is None else self._seeds.getrandbits(32))
+        game.accept([PlayerSpawnRequest(player_id, None) for player_id in self.player_ids])
+        self.last_updates[index] = game.step(report_errors=False)
+        self.games[index] = game
+
+    def _register_kills(self, updates: List[GameUpdate], rewards: np.ndarray, dones: np.ndarray):
+        for update in updates:
+            if not isinstance(update, RemoveBullet) or update.hit_player_id is None:
+                continue
+
+            killed_index = self._player_indexes.get(update.hit_player_id)
+            if killed_index is not None:
+                rewards[killed_index] += self.death_reward
+                dones[killed_index] = True
+
+            receiver_index = self._player_indexes.get(update.reward_receiver_id)
+            if receiver_index is not None and update.reward_receiver_id != update.hit_player_id:
+                rewards[receiver_index] += self.kill_reward
+
+    def _encode_default_observation(self, game: Game, player_id: str) -> np.ndarray:
+        """
+        Features of the player (alive, position, direction one-hot, ammo, can shoot)
+        followed by (alive, relative position) of each other player.
+        """
+        direction_count = len(DIRECTION_DEFINITIONS)
+        player_feature_count = 5 + direction_count
+        observation = np.zeros(player_feature_count + 3 * (self.player_count - 1), dtype=np.float32)
+        if not game.player_is_spawned(player_id):
+            return observation
+
+        player = game.get_player(player_id)
+        gun = player.gun
+        observation[0] = 1.0
+        observation[1] = player.position[0] / MAP_WIDTH
+        observation[2] = player.position[1] / MAP_HEIGHT
+        observation[3 + player.direction] = 1.0
+        observation[3 + direction_count] = gun.ammo_count / gun.full_ammo_count
+        observation[4 + direction_count] = gun.can_shoot(game)
+
+        i = player_feature_count
+        for other_id in self.player_ids:
+            if other_id == player_id:
+                continue
+
+            if game.player_is_spawned(other_id):
+                other = game.get_player(other_id)
+                observation[i] = 1.0
+                observation[i + 1] = (other.position[0] - player.position[0]) / MAP_WIDTH
+                observation[i + 2] = (other.position[1] - player.position[1]) / MAP_HEIGHT
+
+            i += 3
+
+        return observation
@@ -4,14 +4,16 @@ import os
 import sys
 from threading import Thread
 from time import sleep
-from typing import Dict
+from typing import Dict, Optional
 
-from flask import Flask, render_template
+from flask import Flask, render_template, jsonify, send_file, abort
 from flask_bootstrap import Bootstrap
 
 from arena_bulanci.core.config import REMOTE_ARENA_WEB_PORT, REMOTE_ARENA_GAME_UPDATES_PORT, TICKS_PER_SECOND, \
-    REMOTE_ARENA_RAW_UPDATES_PORT
+    REMOTE_ARENA_RAW_UPDATES_PORT, ARENA_MAP
 from arena_bulanci.core.game import Game
+from arena_bulanci.core.networking.traffic_capture import TrafficCapture
+from arena_bulanci.core.recording import MatchRecorder
 from arena_bulanci.core.utils import jsondumps, jsonloads, format_elapsed_time
 from arena_bulanci.core.web.game_update_server import GameUpdateServer
 from arena_bulanci.core.web.user_stats import UserStats
@@ -19,20 +21,32 @@ from arena_bulanci.core.web.user_stats import UserStats
 
 class ArenaApp(object):
     def __init__(self, game: Game, host: str, web_port: int, game_updates_port: int, raw_updates_port: int,
-                 arena_name: str):
+                 arena_name: str, recording_path: Optional[str] = None, traffic_capture_path: Optional[str] = None):
         self._game = game
         self._host = host
         self._web_port = web_port
         self._game_updates_port = game_updates_port
         self._raw_updates_port = raw_updates_port
         self._arena_name = arena_name
+        self._recording_path = recording_path
+        self._recorder: Optional[MatchRecorder] = None
 
         self._control_callback = None
         self._is_running = False
         self._user_statistics: Dict[str, UserStats] = {}
         self._arena_statistics = {"load": 0, "update_delay": 0}
+
+        traffic_capture = None
+        if traffic_capture_path is not None:
+            traffic_capture = TrafficCapture(traffic_capture_path)
+            print(f"CAPTURING TRAFFIC TO: {traffic_capture_path}")
+
         self._game_update_server = GameUpdateServer(self._game, self._host, self._game_updates_port,
-                                                    self._raw_updates_port)
+                                                    self._raw_updates_port, traffic_capture=traffic_capture)
+
+        # compile the map data at startup, so the first ticks are not delayed
+        Game.get_collision_map()
+        print(f"ARENA MAP: {ARENA_MAP}")
 
         self._arena_state_file = self._arena_name + ".state.json"
         if os.path.isfile(self._arena_state_file):
@@ -68,6 +82,10 @@ class ArenaApp(object):
 
         server.start()
 
+        if self._recording_path is not None:
+            self._recorder = MatchRecorder(self._game, self._recording_path)
+            print(f"RECORDING MATCH TO: {self._recording_path}")
+
     def _kill_handler(self, killer, victim):
         def _expected_win_probability(rating1, rating2):
             return 1.0 / (1.0 + pow(10, ((rating2 - rating1) / 400)))
@@ -121,9 +139,22 @@ class ArenaApp(object):
             return render_template(
                 "game.html",
                 game_updates_port=arena._game_updates_port,
-                add_controls=self._control_callback is not None
+                add_controls=self._control_callback is not None,
+                arena_map=ARENA_MAP.get_description()
             )
 
+        @app.route("/map.json")
+        def map_description():
+            return jsonify(ARENA_MAP.get_description())
+
+        @app.route("/map/<file_name>")
+        def map_file(file_name):
+            path = ARENA_MAP.get_file_path(file_name)
+            if path is None:
+                abort(404)
+
+            return send_file(path)
+
         @app.route("/")
         def index():
             return render_template(
@@ -176,7 +207,8 @@ if __name__ == "__main__":
 
     arena_app = ArenaApp(
         arena_game, '0.0.0.0', REMOTE_ARENA_WEB_PORT, REMOTE_ARENA_GAME_UPDATES_PORT, REMOTE_ARENA_RAW_UPDATES_PORT,
-        sys.argv[1]
+        sys.argv[1], recording_path=sys.argv[2] if len(sys.argv) > 2 else None,
+        traffic_capture_path=os.getenv("ARENA_BULANCI_TRAFFIC_CAPTURE")
     )
     arena_app.start_game_worker()
 
@@ -1,13 +1,14 @@
 import asyncio
 import socket
 import threading
+import time
 from datetime import datetime
 from threading import Thread, Lock
 from typing import List, Set, Dict, Any, Optional
 
 import websockets
 
-from arena_bulanci.core.config import MAX_FUTURE_UPDATE_REQUESTS
+from arena_bulanci.core.config import MAX_FUTURE_UPDATE_REQUESTS, ARENA_MAP, TICKS_PER_SECOND
 from arena_bulanci.core.game import Game
 from arena_bulanci.core.game_updates.add_bullet import AddBullet
 from arena_bulanci.core.game_updates.error import ErrorUpdate
@@ -15,8 +16,11 @@ from arena_bulanci.core.game_updates.game_update import GameUpdate
 from arena_bulanci.core.game_updates.game_update_request import GameUpdateRequest
 from arena_bulanci.core.game_updates.remove_bullet import RemoveBullet
 from arena_bulanci.core.networking.socket_client import SocketClient
+from arena_bulanci.core.networking.traffic_capture import TrafficCapture
 from arena_bulanci.core.utils import jsondumps, jsonloads, validate_email
 
+MAX_MULTIPLEXED_PLAYERS = 64  # players served by a single connection
+
 
 def log(message: str):
     now = datetime.now()
@@ -24,12 +28,15 @@ def log(message: str):
 
 
 class GameUpdateServer(object):
-    def __init__(self, game: Game, host: str, port: int, raw_updates_port: int):
+    def __init__(self, game: Game, host: str, port: int, raw_updates_port: int,
+                 traffic_capture: Optional[TrafficCapture] = None):
         self._game = game  # game which is played in the arena
         self._host = host
         self._port = port
         self._raw_updates_port = raw_updates_port
+        self._traffic_capture = traffic_capture
         self._update_roundtrip_start = None
+        self._pretick_time: Optional[float] = None
         self.roundtrip_update_time = 0
 
         self._full_state_subscribers: Set[websockets] = set()
@@ -48,7 +55,8 @@ class GameUpdateServer(object):
         self._L_game = Lock()
         self._raw_game_pulse_event = threading.Event()
         self._player_requests: Dict[str, Optional[List[GameUpdateRequest]]] = {}
-        self._is_future_request: Dict[str, bool] = {}
+        # requests played since the last updates were sent to the player (a late response skips as many requests)
+        self._player_future_counts: Dict[str, int] = {}
         self._player_updates: Dict[str, List[Dict[str, Any]]] = {}
 
     def start(self):
@@ -68,6 +76,7 @@ class GameUpdateServer(object):
 
     def _pretick_handler(self):
         self._update_roundtrip_start = datetime.now()
+        self._pretick_time = time.time()
         collected_requests = []
         with self._L_game:
             self._current_tick_update_ready_clients = list(self._update_ready_clients)
@@ -77,14 +86,15 @@ class GameUpdateServer(object):
                 if not requests:
                     continue
 
+                # following requests are future requests (sent in advance to hide the lag),
+                # they are played when the client doesn't respond in time (otherwise, they are replaced)
                 request = requests.pop(0)
+                self._player_future_counts[player_id] = self._player_future_counts.get(player_id, 0) + 1
                 if not request:
                     continue
 
                 request.player_id = player_id
-                if not self._is_future_request[player_id]:
-                    self._is_future_request[player_id] = True  # next request will be a future request if not replaced
-                    collected_requests.append(request)
+                collected_requests.append(request)
 
         self._game.accept(collected_requests)
 
@@ -103,6 +113,9 @@ class GameUpdateServer(object):
             "updates": game_updates,
             "tick": self._game.tick
         }
+        if self._pretick_time is not None:
+            # requests have to be received before the next tick starts (clients know the offset of our clock)
+            update_group["next_tick_time"] = self._pretick_time + 1.0 / TICKS_PER_SECOND
 
         # report updates
         for player_id, updates_group in list(self._player_updates.items()):
@@ -119,6 +132,9 @@ class GameUpdateServer(object):
             player_id = client.player_id
             try:
                 update_groups_str = jsondumps(self._player_updates[player_id])
+                for multiplexed_player_id in client.player_ids:
+                    self._player_future_counts[multiplexed_player_id] = 0
+
                 client.send_string(update_groups_str)
                 self._player_updates[player_id].clear()
 
@@ -175,14 +191,20 @@ class GameUpdateServer(object):
         finally:
             self._full_state_subscribers.discard(websocket)
 
-    def _get_full_state_data(self):
+    def _get_full_state_data(self, include_map: bool = False, clock_sync_receive_time: Optional[float] = None):
         # make a copy, so "uncommitted" updates are not leaking
         game_copy = self._game.copy_without_internal_data()
-        full_state_data = jsondumps({
+        full_state = {
             "tick": self._game.tick,
             "state": game_copy
-        })
-        return full_state_data
+        }
+        if include_map:
+            full_state["map"] = ARENA_MAP.get_description()
+
+        if clock_sync_receive_time is not None:
+            full_state["clock_sync"] = {"receive_time": clock_sync_receive_time, "send_time": time.time()}
+
+        return jsondumps(full_state)
 
     async def _connection_statistic_worker(self):
         while True:
@@ -222,18 +244,20 @@ class GameUpdateServer(object):
 
         with self._L_game:
             self._player_requests[player_id] = None
+            self._player_future_counts.pop(player_id, None)
             self._player_updates.pop(player_id, None)
-            self._is_future_request.pop(player_id, None)
 
         if self._player_to_client.get(player_id) == client:
             self._player_to_client[player_id] = None
 
     def _raw_game_play_handler(self, socket, addr):
         player_id = None
+        player_ids = []
         client = SocketClient(socket)
 
         try:
             initial_message_str = client.read_string()
+            receive_time = time.time()
             initial_message = jsonloads(initial_message_str)
             try:
                 player_id = initial_message["player_id"]
@@ -244,6 +268,18 @@ class GameUpdateServer(object):
                 if version is None:
                     raise ValueError("Version is not set. Please update your bot to current protocol.")
 
+                # multiplexed connections play more players, their requests are sent as player_id -> requests
+                is_multiplexed = "player_ids" in initial_message
+                player_ids = list(initial_message["player_ids"]) if is_multiplexed else [player_id]
+                if player_id not in player_ids or len(set(player_ids)) != len(player_ids):
+                    raise ValueError("Player ids have to be unique and contain the player_id.")
+
+                if len(player_ids) > MAX_MULTIPLEXED_PLAYERS:
+                    raise ValueError(f"Too many players multiplexed, with count {len(player_ids)}")
+
+                for multiplexed_player_id in player_ids:
+                    validate_email(multiplexed_player_id)
+
             except Exception as e:
                 log(f"player validation {repr(e)}")
                 client.send_string(
@@ -252,15 +288,18 @@ class GameUpdateServer(object):
                 client.send_string("disconnected")
                 return
 
-            client.player_id = player_id
+            client.player_id = player_id  # updates of multiplexed connections are kept under the first player
+            client.player_ids = player_ids
 
             with self._L_game:
-                self._is_future_request[player_id] = False
-                self._player_requests[player_id] = None
+                for multiplexed_player_id in player_ids:
+                    self._player_requests[multiplexed_player_id] = None
+                    self._player_future_counts[multiplexed_player_id] = 0
                 self._player_updates[player_id] = []
 
-            client.send_string(self._get_full_state_data())
-            self._raw_handle_player_connection(player_id, version, client)
+            client.send_string(self._get_full_state_data(include_map=True, clock_sync_receive_time=receive_time))
+            for multiplexed_player_id in player_ids:
+                self._raw_handle_player_connection(multiplexed_player_id, version, client)
 
             ping_start = datetime.now()
             while client.is_connected:
@@ -268,25 +307,38 @@ class GameUpdateServer(object):
                 if message is None:
                     break  # client disconnected
 
+                if self._traffic_capture:
+                    response_time = (datetime.now() - ping_start).total_seconds()
+                    self._traffic_capture.record(player_id, self._game.tick, response_time, message)
+
                 update_request = jsonloads(message)
+                if is_multiplexed:
+                    if update_request is None:
+                        update_request = {}  # the first (empty) update
+
+                    if not isinstance(update_request, dict) or not set(update_request).issubset(player_ids):
+                        raise ValueError("Multiplexed update request has to map player ids of the connection")
 
-                if isinstance(update_request, list):
-                    if len(update_request) > MAX_FUTURE_UPDATE_REQUESTS + 1:
-                        raise ValueError(f"Too long update request sent, with length {len(update_request)}")
+                    player_requests = {
+                        p: self._raw_parse_update_request(update_request.get(p)) for p in player_ids
+                    }
                 else:
-                    update_request = [update_request]
+                    player_requests = {player_id: self._raw_parse_update_request(update_request)}
 
                 with self._L_game:
-                    self._is_future_request[player_id] = False
-                    self._player_requests[player_id] = update_request
+                    for multiplexed_player_id, requests in player_requests.items():
+                        # the ticks played by future requests (while the response was late) are not played again
+                        future_count = self._player_future_counts.get(multiplexed_player_id, 0)
+                        self._player_requests[multiplexed_player_id] = requests[future_count:]
                     self._update_ready_clients.append(client)
 
                 ping_end = datetime.now()
                 ping_time = (ping_end - ping_start).total_seconds()
-                if player_id not in self._pings:
-                    self._pings[player_id] = ping_time
+                for multiplexed_player_id in player_ids:
+                    if multiplexed_player_id not in self._pings:
+                        self._pings[multiplexed_player_id] = ping_time
 
-                self._pings[player_id] = self._pings[player_id] * 0.95 + 0.05 * ping_time
+                    self._pings[multiplexed_player_id] = self._pings[multiplexed_player_id] * 0.95 + 0.05 * ping_time
                 self._raw_game_pulse_event.wait()  # wait for pulse - meaning, updates were sent
                 ping_start = datetime.now()
 
@@ -295,5 +347,14 @@ class GameUpdateServer(object):
             log(f"_raw_game_play_handler: {repr(e)}")
 
         finally:
-            if player_id:
-                self._raw_handle_player_disconnection(player_id, client)
+            for disconnected_player_id in player_ids:
+                self._raw_handle_player_disconnection(disconnected_player_id, client)
+
+    def _raw_parse_update_request(self, update_request) -> List[Optional[GameUpdateRequest]]:
+        if isinstance(update_request, list):
+            if len(update_request) > MAX_FUTURE_UPDATE_REQUESTS + 1:
+                raise ValueError(f"Too long update request sent, with length {len(update_request)}")
+
+            return update_request
+
+        return [update_request]
@@ -0,0 +1,264 @@
+import argparse
+import datetime
+import gc
+import json
+import multiprocessing
+import random
+import time
+from threading import Thread
+from typing import List, Optional, Tuple, Dict, Any
+
+from arena_bulanci.core.actions import ACTION_COUNT, WAIT_ACTION, STEP_ACTION, create_request
+from arena_bulanci.core.config import TICKS_PER_SECOND, MIN_RESPAWN_TICK_COUNT, LOCAL_ARENA_GAME_UPDATES_PORT
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.game_updates.player_spawn_request import PlayerSpawnRequest
+from arena_bulanci.core.networking.socket_client import SocketClient
+from arena_bulanci.core.networking.traffic_capture import load_traffic, TrafficCapture
+from arena_bulanci.core.utils import jsondumps
+from arena_bulanci.core.web.game_update_server import GameUpdateServer
+
+# client messages are sent as they are, so the load generator doesn't need to serialize anything while running
+_Message = Tuple[float, str]
+
+CLIENT_READ_TIMEOUT = 2.0  # seconds, the server stops ticking when the test ends
+
+
+class LoadTestClient(object):
+    """
+    Lightweight client speaking the raw arena protocol without any game logic (updates are not even deserialized).
+    It either replays a captured request stream (with the captured response times)
+    or plays random moves and respawns whenever killed.
+    """
+
+    def __init__(self, player_id: str, host: str, port: int, messages: Optional[List[_Message]] = None,
+                 seed: Optional[int] = None):
+        self.player_id = player_id
+        self.ticks = 0
+        self.skipped_ticks = 0
+
+        self._host = host
+        self._port = port
+        self._messages = messages
+        self._message_index = 0
+        self._random = random.Random(seed)
+
+        self._is_alive = False
+        self._dead_ticks = MIN_RESPAWN_TICK_COUNT
+        self._spawn_message = jsondumps(PlayerSpawnRequest(player_id, None))
+        self._action_messages = [jsondumps(create_request(player_id, action)) for action in range(ACTION_COUNT)]
+
+    def run(self, stop_time: float):
+        client = SocketClient()
+        while True:
+            try:
+                client.connect(self._host, self._port)
+                break
+            except ConnectionRefusedError:
+                if time.time() > stop_time:
+                    return
+
+                time.sleep(0.1)  # server is not ready yet
+
+        client.send_string(jsondumps({"player_id": self.player_id, "version": "1.0.5", "bot": "load_test"}))
+        if client.read_string() is None:
+            return
+
+        client.send_string(jsondumps(None))
+        while client.is_connected and time.time() < stop_time:
+            data = client.read_string(timeout=CLIENT_READ_TIMEOUT)
+            if data is None or data == "disconnected":
+                break
+
+            received_time = time.perf_counter()
+            update_groups = json.loads(data)
+            self.ticks += 1
+            self.skipped_ticks += len(update_groups) - 1
+            self._observe(update_groups)
+
+            response_time, message = self._next_message()
+            delay = response_time - (time.perf_counter() - received_time)
+            if delay > 0:
+                time.sleep(delay)
+
+            client.send_string(message)
+
+        client.disconnect()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "player_id": self.player_id,
+            "ticks": self.ticks,
+            "skipped_ticks": self.skipped_ticks,
+        }
+
+    def _observe(self, update_groups: List[Dict[str, Any]]):
+        for update_group in update_groups:
+            self._dead_ticks += 1
+            for update in update_group["updates"]:
+                if update.get("player_id") != self.player_id or update.get("_is_alive") is None:
+                    continue
+
+                self._is_alive = update["_is_alive"]
+                self._dead_ticks = 0
+
+    def _next_message(self) -> _Message:
+        if self._messages:
+            message = self._messages[self._message_index % len(self._messages)]
+            self._message_index += 1
+            return message
+
+        if not self._is_alive:
+            if self._dead_ticks < MIN_RESPAWN_TICK_COUNT:
+                return 0.0, self._action_messages[WAIT_ACTION]
+
+            self._dead_ticks = 0  # don't flood the server with spawn requests until the spawn is confirmed
+            return 0.0, self._spawn_message
+
+        # prefer moving, so the players meet each other
+        if self._random.random() < 0.5:
+            return 0.0, self._action_messages[STEP_ACTION]
+
+        return 0.0, self._action_messages[self._random.randrange(ACTION_COUNT)]
+
+
+def _run_clients(clients: List[LoadTestClient], stop_time: float, results: multiprocessing.Queue):
+    cpu_start = time.process_time()
+    threads = [Thread(target=client.run, args=[stop_time], daemon=True) for client in clients]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    results.put({
+        "clients": [client.get_statistics() for client in clients],
+        "cpu_time": time.process_time() - cpu_start
+    })
+
+
+def run_load_test(client_count: int, duration: float, traffic_path: Optional[str] = None,
+                  port: int = LOCAL_ARENA_GAME_UPDATES_PORT, client_processes: int = 1,
+                  connect_timeout: float = 10.0, seed: int = 0, capture_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs a local GameUpdateServer and measures it under load of client_count clients connected over loopback.
+    Clients replay streams captured by TrafficCapture (if traffic_path is given) or play randomly.
+    Clients run in separate processes, so the server CPU time is measured without the load generator.
+    Traffic of the test itself can be captured to capture_path.
+    """
+    streams = list(load_traffic(traffic_path).values()) if traffic_path else []
+    clients = []
+    for i in range(client_count):
+        messages = streams[i % len(streams)] if streams else None
+        clients.append(LoadTestClient(f"load_test_{i}@arena.local", "127.0.0.1", port + 1, messages, seed=seed + i))
+
+    game = Game(seed=seed)
+    traffic_capture = TrafficCapture(capture_path) if capture_path else None
+    server = GameUpdateServer(game, "127.0.0.1", port, port + 1, traffic_capture=traffic_capture)
+    server.start()
+
+    start_time = time.time()
+    stop_time = start_time + connect_timeout + duration
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = []
+    for i in range(client_processes):
+        process = context.Process(target=_run_clients, args=[clients[i::client_processes], stop_time, results],
+                                  daemon=True)
+        process.start()
+        processes.append(process)
+
+    # the measurement starts when all clients are connected
+    is_measuring = False
+    cpu_start = measurement_start = None
+    tick_loads = []
+    roundtrips = []
+    while time.time() < stop_time and not (is_measuring and time.time() > measurement_start + duration):
+        if not is_measuring:
+            connected_count = sum(1 for client in server._player_to_client.values() if client is not None)
+            is_measuring = connected_count >= client_count or time.time() > start_time + connect_timeout
+            if is_measuring:
+                cpu_start = time.process_time()
+                measurement_start = time.time()
+                print(f"INFO: Measuring with {connected_count} connected clients")
+
+        start = datetime.datetime.now()
+        gc.collect()  # the same as in the arena
+
+        game.step(catch_exceptions=True)
+        duration_so_far = (datetime.datetime.now() - start).total_seconds()
+        if is_measuring:
+            tick_loads.append(duration_so_far * TICKS_PER_SECOND)
+            roundtrips.append(server.roundtrip_update_time)
+
+        time.sleep(max(0.01, 1.0 / TICKS_PER_SECOND - duration_so_far))
+
+    end_time = time.time()
+    server_cpu_time = time.process_time() - cpu_start if cpu_start is not None else 0.0
+    measured_time = time.time() - measurement_start if measurement_start is not None else 0.0
+
+    client_statistics = []
+    client_cpu_time = 0.0
+    for _ in processes:
+        process_results = results.get(timeout=connect_timeout + CLIENT_READ_TIMEOUT)
+        client_statistics.extend(process_results["clients"])
+        client_cpu_time += process_results["cpu_time"]
+
+    for process in processes:
+        process.join()
+
+    if traffic_capture:
+        traffic_capture.close()
+
+    ticks = sum(client["ticks"] for client in client_statistics)
+    skipped_ticks = sum(client["skipped_ticks"] for client in client_statistics)
+    return {
+        "clients": client_count,
+        "mode": "replay" if streams else "synthetic",
+        "measured_time": measured_time,
+        "game_ticks": len(tick_loads),
+        "tick_load_mean": sum(tick_loads) / max(1, len(tick_loads)),
+        "tick_load_max": max(tick_loads, default=0.0),
+        "roundtrip_mean": sum(roundtrips) / max(1, len(roundtrips)),
+        "roundtrip_p95": _percentile(roundtrips, 0.95),
+        "skipped_tick_ratio": skipped_ticks / max(1, ticks + skipped_ticks),
+        "server_cpu": server_cpu_time / max(1e-9, measured_time),
+        "server_cpu_per_client": server_cpu_time / max(1e-9, measured_time) / max(1, client_count),
+        "load_generator_cpu": client_cpu_time / max(1e-9, end_time - start_time),
+    }
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    if not values:
+        return 0.0
+
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"LOAD TEST: {report['clients']} {report['mode']} clients, "
+          f"{report['game_ticks']} ticks in {report['measured_time']:.1f}s")
+    print(f"\ttick load: {report['tick_load_mean'] * 100:.1f}% (max {report['tick_load_max'] * 100:.1f}%)")
+    print(f"\troundtrip: {report['roundtrip_mean'] * 1000:.2f}ms (p95 {report['roundtrip_p95'] * 1000:.2f}ms)")
+    print(f"\tskipped ticks: {report['skipped_tick_ratio'] * 100:.2f}%")
+    print(f"\tserver CPU: {report['server_cpu'] * 100:.1f}% ({report['server_cpu_per_client'] * 100:.2f}% per client), "
+          f"load generator CPU: {report['load_generator_cpu'] * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures GameUpdateServer under load of many clients.")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured time in seconds")
+    parser.add_argument("--traffic", help="traffic captured by the arena (ARENA_BULANCI_TRAFFIC_CAPTURE) to replay")
+    parser.add_argument("--capture", help="path where traffic of the test is captured")
+    parser.add_argument("--port", type=int, default=LOCAL_ARENA_GAME_UPDATES_PORT)
+    parser.add_argument("--processes", type=int, default=1, help="count of load generating processes")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    load_test_report = run_load_test(args.clients, args.duration, traffic_path=args.traffic, port=args.port,
+                                     client_processes=args.processes, capture_path=args.capture)
+    if args.json:
+        print(json.dumps(load_test_report, indent=2))
+    else:
+        print_report(load_test_report)
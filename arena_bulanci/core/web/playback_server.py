@@ -0,0 +1,172 @@
+import asyncio
+import sys
+from threading import Thread
+from typing import Set, Optional, Iterator, Tuple, List
+
+import websockets
+from flask import Flask, render_template, send_file, abort
+from flask_bootstrap import Bootstrap
+
+from arena_bulanci.core.config import ARENA_MAP, TICKS_PER_SECOND, LOCAL_ARENA_WEB_PORT, \
+    LOCAL_ARENA_GAME_UPDATES_PORT
+from arena_bulanci.core.game import Game
+from arena_bulanci.core.game_updates.game_update import GameUpdate
+from arena_bulanci.core.recording import MatchRecording
+from arena_bulanci.core.utils import jsondumps
+from arena_bulanci.core.web.game_update_server import log
+
+MAX_PLAYBACK_SPEED = 32.0
+
+
+class PlaybackServer(object):
+    """
+    Serves a match recorded by MatchRecorder to the /observer page, the same way as the arena serves a live game.
+    Observers control the playback by messages: `pause`, `play`, `speed:<multiplier>`, `seek:<tick>`.
+    """
+
+    def __init__(self, recording_path: str, host: str, web_port: int, game_updates_port: int):
+        self._recording = MatchRecording(recording_path)
+        self._host = host
+        self._web_port = web_port
+        self._game_updates_port = game_updates_port
+
+        if self._recording.first_tick is None:
+            raise ValueError(f"{recording_path} contains no recorded ticks")
+
+        if self._recording.map_hash != ARENA_MAP.hash:
+            raise ValueError(f"The match was recorded on a different map ({self._recording.map_hash}), "
+                             f"current: {ARENA_MAP}")
+
+        self._observers: Set[websockets] = set()
+        self._speed = 1.0
+        self._is_paused = False
+        self._game: Optional[Game] = None
+        self._states: Optional[Iterator[Tuple[Game, List[GameUpdate]]]] = None
+        self._seek(self._recording.first_tick)
+
+        self._loop = asyncio.new_event_loop()
+
+    def run_blocking(self):
+        Thread(target=self._run_server, daemon=True).start()
+        self._block_on_web_server()
+
+    def _run_server(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.create_task(self._playback_worker())
+        self._loop.run_until_complete(websockets.serve(self._client_handler, self._host, self._game_updates_port))
+        self._loop.run_forever()
+
+    async def _playback_worker(self):
+        while True:
+            if self._is_paused or not self._observers:
+                await asyncio.sleep(0.05)
+                continue
+
+            # high speeds skip frames instead of sending every state
+            frame_ticks = max(1, int(self._speed))
+            for _ in range(frame_ticks):
+                self._advance()
+
+            await self._send_state()
+            await asyncio.sleep(frame_ticks / (TICKS_PER_SECOND * self._speed))
+
+    def _advance(self):
+        if self._is_paused:
+            return
+
+        try:
+            self._game, _ = next(self._states)
+        except StopIteration:
+            log(f"Playback reached end of the recording (tick {self._game.tick})")
+            self._is_paused = True
+
+    def _seek(self, tick: int):
+        tick = min(max(tick, self._recording.first_tick), self._recording.last_tick)
+        self._states = self._recording.iterate(tick)
+        self._game, _ = next(self._states)
+
+    def _handle_control(self, control_data: str) -> bool:
+        try:
+            if control_data == "pause":
+                self._is_paused = True
+            elif control_data == "play":
+                self._is_paused = False
+            elif control_data.startswith("speed:"):
+                speed = float(control_data[len("speed:"):])
+                self._speed = min(max(speed, 1.0 / TICKS_PER_SECOND), MAX_PLAYBACK_SPEED)
+            elif control_data.startswith("seek:"):
+                self._seek(int(control_data[len("seek:"):]))
+                return True
+        except ValueError as e:
+            log(f"Invalid playback control {control_data}: {repr(e)}")
+
+        return False
+
+    def _get_full_state_data(self) -> str:
+        return jsondumps({
+            "tick": self._game.tick,
+            "state": self._game,
+            "playback": {"speed": self._speed, "is_paused": self._is_paused}
+        })
+
+    async def _send_state(self):
+        full_state_data = self._get_full_state_data()
+        for observer in list(self._observers):
+            try:
+                await observer.send(full_state_data)
+            except Exception as e:
+                log(f"_send_state {observer} {repr(e)}")
+                self._observers.discard(observer)
+
+    async def _client_handler(self, websocket, path):
+        if path != "/observer":
+            return
+
+        try:
+            self._observers.add(websocket)
+            await websocket.send(self._get_full_state_data())
+
+            async for control_data in websocket:
+                if self._handle_control(control_data):
+                    await self._send_state()  # show the seek result even when paused
+
+        except Exception as e:
+            log(f"_client_handler: {repr(e)}")
+        finally:
+            self._observers.discard(websocket)
+
+    def _block_on_web_server(self):
+        app = Flask(__name__)
+        Bootstrap(app)
+
+        recording = self._recording
+
+        @app.route("/")
+        @app.route("/game")
+        def game():
+            return render_template(
+                "game.html",
+                game_updates_port=self._game_updates_port,
+                add_controls=False,
+                arena_map=ARENA_MAP.get_description(),
+                playback={"first_tick": recording.first_tick, "last_tick": recording.last_tick}
+            )
+
+        @app.route("/map/<file_name>")
+        def map_file(file_name):
+            path = ARENA_MAP.get_file_path(file_name)
+            if path is None:
+                abort(404)
+
+            return send_file(path)
+
+        import logging
+        werkzeug_log = logging.getLogger('werkzeug')
+        werkzeug_log.setLevel(logging.ERROR)
+
+        print(f"PLAYBACK ON: http://{self._host}:{self._web_port}/game")
+        app.run(debug=True, use_reloader=False, host=self._host, port=self._web_port)
+
+
+if __name__ == "__main__":
+    PlaybackServer(sys.argv[1], "0.0.0.0", LOCAL_ARENA_WEB_PORT, LOCAL_ARENA_GAME_UPDATES_PORT).run_blocking()
@@ -7,28 +7,17 @@ const AMMO_BAR_LEN = 1.0;
 const AMMO_BAR_FILL_LEN = 0.7;
 const AMMO_BAR_HEIGHT = 0.2;
 
-let mapWidth = 160;
-let mapHeight = 90;
-
-let obstacleBoxes = [
-    [120.5, 12.3, 3.5],
-    [91, 40, 7],
-    [83.5, 41.5, 4],
-    [89, 76, 4.5],
-    [135, 59, 4.5],
-    [40, 53, 3.7],
-    [36, 55.5, 3.7],
-    [31.5, 59, 3.7],
-    [21, 41, 4],
-    [15, 15, 4.5],
-    [57, 22, 13]
-];
+// ARENA_MAP is the map package description provided by the arena (see /map.json)
+let mapWidth = ARENA_MAP.width;
+let mapHeight = ARENA_MAP.height;
+
+let obstacleBoxes = ARENA_MAP.obstacles;
 
 let PLAYER_SPRITES = getSpriteSet();
 let MAP_BACKGROUND = new Image();
-MAP_BACKGROUND.src = "/static/na_dobrou_noc.png";
+if (ARENA_MAP.background) MAP_BACKGROUND.src = "/map/" + ARENA_MAP.background;
 let MAP_BACKGROUND_MASK = new Image();
-MAP_BACKGROUND_MASK.src = "/static/na_dobrou_noc_mask.png";
+if (ARENA_MAP.background_mask) MAP_BACKGROUND_MASK.src = "/map/" + ARENA_MAP.background_mask;
 
 let ANIMATION_OFFSETS = {};
 let DEAD_PLAYERS = {};